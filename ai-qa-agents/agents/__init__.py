@@ -1,12 +1,17 @@
 """
 Agents package initialization
 """
-from .test_case_generator import TestCaseGeneratorAgent
-from .bug_analyzer import BugAnalyzerAgent
+from .test_case_generator import TestCaseGeneratorAgent, BatchGenerationResult, GeneratedTestCase
+from .bug_analyzer import BugAnalyzerAgent, BugAnalysis, DuplicateCluster, DuplicatePair
 from .test_execution_assistant import TestExecutionAssistant
 
 __all__ = [
     "TestCaseGeneratorAgent",
+    "BatchGenerationResult",
+    "GeneratedTestCase",
     "BugAnalyzerAgent", 
+    "BugAnalysis",
+    "DuplicateCluster",
+    "DuplicatePair",
     "TestExecutionAssistant",
 ]
@@ -0,0 +1,186 @@
+"""
+Base Agent
+Shared agent construction and prompt execution for all QA agents
+"""
+import time
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from agent_framework import ChatAgent
+
+from cache import ResponseCache, get_response_cache, make_cache_key
+from coalescing import get_single_flight
+from client_pool import get_async_client, get_chat_client
+from config import ModelConfig
+from router import ModelRouter, get_model_router
+from scheduler import estimate_tokens, get_scheduler
+
+
+class BaseQAAgent:
+    """
+    Common behaviour for QA agents.
+    Subclasses set AGENT_NAME, SYSTEM_INSTRUCTIONS and TOOLS.
+    """
+
+    AGENT_NAME: str = "QAAgent"
+    SYSTEM_INSTRUCTIONS: str = ""
+    TOOLS: List[Callable] = []
+
+    def __init__(
+        self,
+        config: Optional[ModelConfig] = None,
+        cache: Optional[ResponseCache] = None,
+        router: Optional[ModelRouter] = None
+    ):
+        self.config = config or ModelConfig()
+        self.cache = cache if cache is not None else get_response_cache()
+        self.router = router if router is not None else get_model_router()
+        self._agents: Dict[str, ChatAgent] = {}
+        self._client = None
+
+    async def _get_agent(self, model_id: Optional[str] = None) -> ChatAgent:
+        """Get or create the agent instance for a model (default: config.model_id)."""
+        model_id = model_id or self.config.model_id
+        agent = self._agents.get(model_id)
+        if agent is None:
+            # Clients come from the process-wide pool so agents share connections
+            self._client = get_async_client(self.config)
+            chat_client = get_chat_client(self.config, model_id)
+
+            agent = ChatAgent(
+                chat_client=chat_client,
+                name=self.AGENT_NAME,
+                instructions=self.SYSTEM_INSTRUCTIONS,
+                tools=list(self.TOOLS)
+            )
+            self._agents[model_id] = agent
+
+        return agent
+
+    def _tools_state(self) -> str:
+        """Version of the data the agent's tools read; agents with stateful tools override it."""
+        return ""
+
+    def _cache_key(self, prompt: str, model_id: Optional[str] = None) -> str:
+        return make_cache_key(
+            model_id or self.config.model_id,
+            self.SYSTEM_INSTRUCTIONS,
+            self.TOOLS,
+            prompt,
+            self._tools_state()
+        )
+
+    async def _run_stream(
+        self,
+        agent: ChatAgent,
+        prompt: str,
+        thread=None,
+        model_id: Optional[str] = None,
+        first_chunk_timeout: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """
+        Send a prompt through the model's request scheduler.
+
+        Each attempt runs on ``thread`` (or a fresh thread when None), so
+        rate limits, retries and adaptive concurrency apply to every call.
+        ``first_chunk_timeout`` only starts once an attempt is dispatched.
+        """
+        scheduler = get_scheduler(model_id or self.config.model_id)
+
+        async def attempt() -> AsyncIterator[str]:
+            async for chunk in agent.run_stream(prompt, thread=thread or agent.get_new_thread()):
+                if chunk.text:
+                    yield chunk.text
+
+        async for text in scheduler.stream(
+            attempt, estimate_tokens(self.SYSTEM_INSTRUCTIONS + prompt), first_chunk_timeout
+        ):
+            yield text
+
+    async def _route_stream(self, models: List[str], prompt: str) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Stream a prompt from the first model in ``models`` that answers.
+
+        A model that fails, or produces nothing within the router's
+        first-chunk timeout of its request being dispatched, is recorded
+        and the next model is tried. The last model has no first-chunk
+        timeout, as there is nothing left to fall back to. Failures after
+        output has started are raised.
+
+        Yields:
+            (model that served the answer, text chunk) pairs
+        """
+        timeout = self.router.config.first_chunk_timeout
+        for position, model_id in enumerate(models):
+            last = position == len(models) - 1
+            agent = await self._get_agent(model_id)
+            # The timeout runs in this task: the HTTP stream must not change tasks
+            stream = self._run_stream(
+                agent, prompt, model_id=model_id, first_chunk_timeout=None if last else timeout
+            ).__aiter__()
+            started = time.monotonic()
+            try:
+                first = await stream.__anext__()
+            except StopAsyncIteration:
+                self.router.record(model_id, time.monotonic() - started, ok=True)
+                return
+            except Exception:
+                self.router.record(model_id, None, ok=False)
+                await stream.aclose()
+                if last:
+                    raise
+                continue
+
+            self.router.record(model_id, time.monotonic() - started, ok=True)
+            yield model_id, first
+            async for text in stream:
+                yield model_id, text
+            return
+
+    async def _stream(
+        self,
+        prompt: str,
+        task: str = "default",
+        cancel_when_idle: bool = False
+    ) -> AsyncIterator[str]:
+        """
+        Stream a one-shot prompt on a fresh thread, yielding text chunks.
+
+        The model is chosen by the router for ``task``. Responses are served
+        from the response cache when the same model, instructions, tools,
+        tool data version and prompt have been seen before; a cache hit is
+        yielded as a single chunk. Identical requests already in flight are
+        joined rather than sent again. Only complete responses are cached, under the model
+        that actually produced them.
+
+        With ``cancel_when_idle`` the request is cancelled when the caller
+        stops reading early (unless another caller shares it), so an early
+        stop also stops token generation.
+        """
+        models = self.router.route(
+            f"{self.AGENT_NAME}.{task}",
+            estimate_tokens(self.SYSTEM_INSTRUCTIONS + prompt),
+            self.config.model_id
+        )
+        key = self._cache_key(prompt, models[0])
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        async def fetch() -> AsyncIterator[str]:
+            result = []
+            served = models[0]
+            async for served, text in self._route_stream(models, prompt):
+                result.append(text)
+                yield text
+
+            text = "".join(result)
+            if text:
+                self.cache.set(key if served == models[0] else self._cache_key(prompt, served), text)
+
+        async for text in get_single_flight().stream(key, fetch, cancel_when_idle):
+            yield text
+
+    async def _run(self, prompt: str, task: str = "default") -> str:
+        """Run a one-shot prompt and return the complete response."""
+        return "".join([chunk async for chunk in self._stream(prompt, task)])
@@ -3,16 +3,20 @@ Bug Analyzer Agent
 Analyzes bug reports, suggests severity, finds duplicates, and recommends fixes
 """
 import asyncio
-from typing import Annotated, Optional, List, Dict
+from typing import Annotated, Optional, List, Dict, AsyncIterator, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 import json
+import re
 
-from agent_framework import ChatAgent
-from agent_framework.openai import OpenAIChatClient
-from openai import AsyncOpenAI
-
-from config import QAConfig, ModelConfig
+from analysis.corpus import normalize_severity
+from analysis.dedup import candidate_pairs, cluster_pairs
+from analysis.keywords import SEVERITY_CRITERIA, TEST_CATEGORIES, scan_keywords
+from analysis.search import bug_summary_text, get_bug_index
+from analysis.stacktrace import get_crash_index, parse_stack_trace
+from analysis.triage import TriageResult, get_triage_engine
+from .base import BaseQAAgent
+from .structured import extract_json, from_json, schema_instructions
 
 
 @dataclass
@@ -27,6 +31,85 @@ class BugAnalysis:
     duplicate_candidates: List[str]
     recommended_actions: List[str]
     test_coverage_gaps: List[str]
+    
+    def to_markdown(self) -> str:
+        """Render the analysis as a markdown report."""
+        def bullets(items: List[str]) -> str:
+            return "\n".join(f"- {item}" for item in items) or "- None"
+        
+        return f"""# Bug Analysis: {self.bug_id}
+
+| Field | Value |
+|-------|-------|
+| **Severity** | {self.severity} |
+| **Priority** | {self.priority} |
+| **Category** | {self.category} |
+
+## Root Cause Hypothesis
+{self.root_cause_hypothesis}
+
+## Affected Areas
+{bullets(self.affected_areas)}
+
+## Duplicate Candidates
+{bullets(self.duplicate_candidates)}
+
+## Recommended Actions
+{bullets(self.recommended_actions)}
+
+## Test Coverage Gaps
+{bullets(self.test_coverage_gaps)}
+"""
+
+
+# JSON schema requested in structured mode; mirrors BugAnalysis
+BUG_ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "bug_id": {"type": "string"},
+        "severity": {"enum": ["Critical", "High", "Medium", "Low"]},
+        "priority": {"enum": ["P1", "P2", "P3", "P4"]},
+        "category": {"type": "string"},
+        "root_cause_hypothesis": {"type": "string"},
+        "affected_areas": {"type": "array", "items": {"type": "string"}},
+        "duplicate_candidates": {"type": "array", "items": {"type": "string"}},
+        "recommended_actions": {"type": "array", "items": {"type": "string"}},
+        "test_coverage_gaps": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["severity", "priority", "category", "root_cause_hypothesis", "recommended_actions"],
+}
+
+
+@dataclass
+class BugScore:
+    """Numeric priority score for one bug in a backlog"""
+    bug: int
+    score: float
+    severity: str
+    reason: str
+
+
+@dataclass
+class DuplicatePair:
+    """Verdict on one candidate pair of bugs"""
+    bug1: str
+    bug2: str
+    verdict: str  # "duplicate", "related", "distinct" or "candidate" when unconfirmed
+    similarity: float  # 0-1; model estimate, or MinHash estimate when unconfirmed
+    reason: str = ""
+    error: Optional[str] = None  # Why the model could not confirm the pair
+
+
+@dataclass
+class DuplicateCluster:
+    """Bugs that duplicate each other"""
+    bug_ids: List[str]
+    pairs: List[DuplicatePair]
+
+
+def _summary_line(bug: str) -> str:
+    """First non-empty line of a bug, without markdown heading marks."""
+    return next((l.strip().lstrip("#").strip() for l in bug.splitlines() if l.strip()), "")[:80]
 
 
 # Tools for Bug Analyzer Agent
@@ -35,30 +118,12 @@ def classify_severity(
     user_impact: Annotated[str, "How the bug affects users"]
 ) -> str:
     """Classify bug severity based on impact analysis."""
-    severity_criteria = {
-        "Critical": [
-            "data loss", "security breach", "system crash", "production down",
-            "payment failure", "authentication bypass", "data corruption"
-        ],
-        "High": [
-            "feature broken", "major functionality", "blocks workflow",
-            "affects many users", "no workaround", "performance degradation"
-        ],
-        "Medium": [
-            "partial functionality", "workaround available", "affects some users",
-            "minor data issue", "ui glitch with impact"
-        ],
-        "Low": [
-            "cosmetic", "typo", "minor ui", "edge case", "rare occurrence",
-            "enhancement", "documentation"
-        ]
-    }
+    hits = scan_keywords(bug_description + " " + user_impact)
     
-    description_lower = (bug_description + " " + user_impact).lower()
-    
-    for severity, keywords in severity_criteria.items():
-        if any(kw in description_lower for kw in keywords):
-            return f"Recommended Severity: {severity}\nMatched criteria: {[kw for kw in keywords if kw in description_lower]}"
+    for severity, keywords in SEVERITY_CRITERIA.items():
+        matched = hits[f"severity.{severity}"]
+        if matched:
+            return f"Recommended Severity: {severity}\nMatched criteria: {[kw for kw in keywords if kw in matched]}"
     
     return "Recommended Severity: Medium\nNo specific criteria matched - defaulting to Medium"
 
@@ -66,61 +131,48 @@ def classify_severity(
 def analyze_stack_trace(
     stack_trace: Annotated[str, "Error stack trace or console logs"]
 ) -> str:
-    """Analyze stack trace to identify error source."""
-    lines = stack_trace.split('\n')
-    analysis = {
-        "error_type": None,
-        "source_file": None,
-        "line_number": None,
-        "key_frames": []
-    }
-    
-    for line in lines:
-        line = line.strip()
-        if 'Error:' in line or 'Exception:' in line:
-            analysis["error_type"] = line
-        elif 'at ' in line and ('.ts' in line or '.js' in line or '.py' in line):
-            analysis["key_frames"].append(line)
-            if analysis["source_file"] is None:
-                # Extract file info
-                if ':' in line:
-                    parts = line.split(':')
-                    analysis["source_file"] = parts[0].split('at ')[-1].strip()
-                    if len(parts) > 1:
-                        analysis["line_number"] = parts[1].split(')')[0]
+    """Analyze stack trace to identify error source and known bugs with the same crash signature."""
+    trace = parse_stack_trace(stack_trace)
+    top = trace.top_frame
+    error = f"{trace.exception_type}: {trace.message}" if trace.message else trace.exception_type
+    known_bugs = get_crash_index().lookup(trace.fingerprint)
+    key_frames = [f"{frame.function or '<anonymous>'} ({frame.file}:{frame.line})" for frame in trace.frames[:5]]
     
     return f"""
 Stack Trace Analysis:
-- Error Type: {analysis['error_type'] or 'Unknown'}
-- Source File: {analysis['source_file'] or 'Not identified'}
-- Line Number: {analysis['line_number'] or 'Not identified'}
-- Key Stack Frames: {analysis['key_frames'][:5]}
+- Language: {trace.language}
+- Error Type: {error or 'Unknown'}
+- Source File: {top.file if top else 'Not identified'}
+- Line Number: {top.line if top and top.line else 'Not identified'}
+- Function: {top.function if top else 'Not identified'}
+- Fingerprint: {trace.fingerprint}
+- Known Bugs With This Signature: {', '.join(known_bugs) if known_bugs else 'None (new crash)'}
+- Key Stack Frames: {key_frames}
 """
 
 
 def find_related_bugs(
     bug_title: Annotated[str, "Title of the bug to check"],
-    bug_component: Annotated[str, "Component where bug was found"]
+    bug_component: Annotated[str, "Component where bug was found"],
+    details: Annotated[str, "Steps to reproduce or error messages, if known"] = ""
 ) -> str:
     """Find potentially related or duplicate bugs."""
-    # In a real implementation, this would search a bug database
-    # For demo, return simulated related bugs
+    matches = get_bug_index().search(f"{bug_title}\n{details}", component=bug_component, k=5)
+    if not matches:
+        return f'\nNo related bugs found for "{bug_title}" in {bug_component}.\n'
+    
+    related = "\n\n".join(
+        f"""{rank}. {match.bug_id}: {match.title} (Score: {match.score:.1f})
+   - Component: {match.component or 'Unknown'}
+   - Status: {match.status or 'Unknown'}"""
+        for rank, match in enumerate(matches, 1)
+    )
     return f"""
 Potentially Related Bugs for "{bug_title}" in {bug_component}:
 
-1. BUG-001: Login timeout after password reset (Similarity: 75%)
-   - Component: Authentication
-   - Status: Open
-   
-2. BUG-002: Search XSS vulnerability (Similarity: 30%)
-   - Component: Search
-   - Status: Resolved
-   
-3. BUG-003: Cart quantity negative value (Similarity: 15%)
-   - Component: Cart
-   - Status: In Progress
-
-Recommendation: Review BUG-001 for potential duplicate.
+{related}
+
+Recommendation: Review {matches[0].bug_id} for potential duplicate.
 """
 
 
@@ -194,12 +246,14 @@ Considerations:
 """
 
 
-class BugAnalyzerAgent:
+class BugAnalyzerAgent(BaseQAAgent):
     """
     AI Agent for analyzing bug reports and providing insights.
     Uses Microsoft Agent Framework with GitHub Models.
     """
     
+    AGENT_NAME = "BugAnalyzer"
+    
     SYSTEM_INSTRUCTIONS = """You are an expert Bug Analyst with deep experience in software quality assurance.
 
 Your responsibilities:
@@ -224,57 +278,24 @@ Severity Definitions:
 - Low: Minor issue, cosmetic, edge case
 """
 
-    def __init__(self, config: Optional[ModelConfig] = None):
-        self.config = config or ModelConfig()
-        self._agent = None
-        self._client = None
-    
-    async def _get_agent(self) -> ChatAgent:
-        """Get or create the agent instance."""
-        if self._agent is None:
-            self._client = AsyncOpenAI(
-                base_url=self.config.base_url,
-                api_key=self.config.api_key,
-            )
-            
-            chat_client = OpenAIChatClient(
-                async_client=self._client,
-                model_id=self.config.model_id
-            )
-            
-            self._agent = ChatAgent(
-                chat_client=chat_client,
-                name="BugAnalyzer",
-                instructions=self.SYSTEM_INSTRUCTIONS,
-                tools=[
-                    classify_severity,
-                    analyze_stack_trace,
-                    find_related_bugs,
-                    suggest_reproduction_steps,
-                    estimate_fix_effort,
-                ]
-            )
-        
-        return self._agent
+    TOOLS = [
+        classify_severity,
+        analyze_stack_trace,
+        find_related_bugs,
+        suggest_reproduction_steps,
+        estimate_fix_effort,
+    ]
     
-    async def analyze_bug(
+    def _tools_state(self) -> str:
+        """Bug corpus version: related-bug and crash lookups answer from the live corpus."""
+        return get_bug_index().version
+    
+    def _analyze_bug_prompt(
         self,
         bug_report: str,
         include_fix_suggestions: bool = True
     ) -> str:
-        """
-        Analyze a bug report comprehensively.
-        
-        Args:
-            bug_report: The full bug report content
-            include_fix_suggestions: Whether to include fix recommendations
-            
-        Returns:
-            Detailed analysis of the bug
-        """
-        agent = await self._get_agent()
-        thread = agent.get_new_thread()
-        
+        """Build the analyze_bug prompt."""
         prompt = f"""Analyze this bug report comprehensively:
 
 {bug_report}
@@ -290,32 +311,96 @@ Please provide:
 8. **Test Coverage Gaps** - What tests should be added
 9. **Related Bugs** - Check for potential duplicates
 """
-        
-        result = []
-        async for chunk in agent.run_stream(prompt, thread=thread):
-            if chunk.text:
-                result.append(chunk.text)
-        
-        return "".join(result)
+        return prompt
     
-    async def compare_bugs(
+    async def analyze_bug(
         self,
-        bug1: str,
-        bug2: str
+        bug_report: str,
+        include_fix_suggestions: bool = True
     ) -> str:
         """
-        Compare two bug reports to check if they're duplicates.
+        Analyze a bug report comprehensively.
         
         Args:
-            bug1: First bug report
-            bug2: Second bug report
+            bug_report: The full bug report content
+            include_fix_suggestions: Whether to include fix recommendations
             
         Returns:
-            Comparison analysis and duplicate probability
+            Detailed analysis of the bug
         """
-        agent = await self._get_agent()
-        thread = agent.get_new_thread()
+        return await self._run(self._analyze_bug_prompt(
+            bug_report=bug_report,
+            include_fix_suggestions=include_fix_suggestions
+        ), task="analyze_bug")
+    
+    async def analyze_bug_stream(
+        self,
+        bug_report: str,
+        include_fix_suggestions: bool = True
+    ) -> AsyncIterator[str]:
+        """Stream the analyze_bug response chunk by chunk as it is generated."""
+        async for chunk in self._stream(self._analyze_bug_prompt(
+            bug_report=bug_report,
+            include_fix_suggestions=include_fix_suggestions
+        ), task="analyze_bug"):
+            yield chunk
+    
+    def _analyze_bug_structured_prompt(
+        self,
+        bug_report: str,
+        include_fix_suggestions: bool = True
+    ) -> str:
+        """Build the structured analyze_bug prompt."""
+        prompt = f"""Analyze this bug report:
+
+{bug_report}
+
+Assess severity and priority by user impact, classify the category (Security,
+Functional, Performance, UI, ...), hypothesize the root cause, list affected
+areas, possible duplicates and missing tests.
+{"Include fix approaches in recommended_actions." if include_fix_suggestions else ""}
+
+{schema_instructions(BUG_ANALYSIS_SCHEMA)}"""
+        return prompt
+    
+    async def analyze_bug_structured(
+        self,
+        bug_report: str,
+        bug_id: str = "",
+        include_fix_suggestions: bool = True
+    ) -> BugAnalysis:
+        """
+        Analyze a bug report into a typed BugAnalysis.
+        
+        The model answers in compact JSON instead of markdown, which cuts
+        output tokens; render with BugAnalysis.to_markdown() if needed.
         
+        Args:
+            bug_report: The full bug report content
+            bug_id: Identifier used when the model does not return one
+            include_fix_suggestions: Whether to include fix recommendations
+            
+        Returns:
+            Structured analysis
+            
+        Raises:
+            ValueError: If the response is not valid JSON
+        """
+        response = await self._run(self._analyze_bug_structured_prompt(
+            bug_report=bug_report,
+            include_fix_suggestions=include_fix_suggestions
+        ), task="analyze_bug_structured")
+        analysis = from_json(BugAnalysis, extract_json(response))
+        analysis.bug_id = analysis.bug_id or bug_id or "UNKNOWN"
+        analysis.severity = normalize_severity(analysis.severity) or "Medium"
+        return analysis
+    
+    def _compare_bugs_prompt(
+        self,
+        bug1: str,
+        bug2: str
+    ) -> str:
+        """Build the compare_bugs prompt."""
         prompt = f"""Compare these two bug reports and determine if they might be duplicates:
 
 **Bug Report 1:**
@@ -332,34 +417,133 @@ Please analyze:
 5. Recommendation: Duplicate / Related / Distinct
 6. If related, should they be linked or merged?
 """
+        return prompt
+    
+    async def compare_bugs(
+        self,
+        bug1: str,
+        bug2: str
+    ) -> str:
+        """
+        Compare two bug reports to check if they're duplicates.
         
-        result = []
-        async for chunk in agent.run_stream(prompt, thread=thread):
-            if chunk.text:
-                result.append(chunk.text)
-        
-        return "".join(result)
+        Args:
+            bug1: First bug report
+            bug2: Second bug report
+            
+        Returns:
+            Comparison analysis and duplicate probability
+        """
+        return await self._run(self._compare_bugs_prompt(bug1=bug1, bug2=bug2), task="compare_bugs")
     
-    async def generate_bug_report(
+    async def compare_bugs_stream(
         self,
-        description: str,
-        steps_to_reproduce: str,
-        environment: str
+        bug1: str,
+        bug2: str
+    ) -> AsyncIterator[str]:
+        """Stream the compare_bugs response chunk by chunk as it is generated."""
+        async for chunk in self._stream(self._compare_bugs_prompt(bug1=bug1, bug2=bug2), task="compare_bugs"):
+            yield chunk
+    
+    def _confirm_duplicate_prompt(
+        self,
+        bug1: str,
+        bug2: str
     ) -> str:
+        """Build the prompt confirming one candidate duplicate pair."""
+        prompt = f"""Are these two bug reports duplicates (same defect and root cause)?
+
+**Bug Report 1:**
+{bug1}
+
+**Bug Report 2:**
+{bug2}
+
+Respond with a single JSON object and nothing else:
+{{"verdict": "<duplicate|related|distinct>", "similarity": <0-100>, "reason": "<one short sentence>"}}
+"""
+        return prompt
+    
+    async def find_duplicates(
+        self,
+        bugs: List[str],
+        bug_ids: Optional[List[str]] = None,
+        threshold: float = 0.3,
+        concurrency: int = 4,
+        max_pairs: Optional[int] = None,
+        confirm: bool = True
+    ) -> Tuple[List[DuplicateCluster], List[DuplicatePair]]:
         """
-        Generate a complete bug report from basic information.
+        Find duplicate clusters in a set of bugs.
+        
+        Candidate pairs are found locally with MinHash LSH, so only pairs
+        with overlapping wording reach the model, instead of all N² pairs.
+        Each candidate is then confirmed by the model concurrently, and
+        confirmed duplicates are grouped into clusters. A pair whose
+        confirmation fails stays an unconfirmed candidate with its MinHash
+        estimate and the error, and is left out of the clusters.
         
         Args:
-            description: Brief description of the issue
-            steps_to_reproduce: How to reproduce the bug
-            environment: Browser/OS/device information
+            bugs: Bug reports
+            bug_ids: Identifiers for the reports (defaults to positions)
+            threshold: Minimum estimated word-overlap (Jaccard) for a candidate
+            concurrency: Maximum confirmations in flight at once
+            max_pairs: Confirm at most this many of the most similar candidates
+            confirm: Ask the model; if False, every candidate counts as a duplicate
             
         Returns:
-            Formatted bug report ready for submission
+            Duplicate clusters, and the verdict on every candidate pair
         """
-        agent = await self._get_agent()
-        thread = agent.get_new_thread()
+        bug_ids = bug_ids or [str(i + 1) for i in range(len(bugs))]
+        candidates = candidate_pairs([bug_summary_text(bug) for bug in bugs], threshold=threshold)
+        if max_pairs is not None:
+            candidates = candidates[:max_pairs]
+        
+        semaphore = asyncio.Semaphore(max(1, concurrency))
         
+        async def confirm_pair(i: int, j: int, estimate: float) -> DuplicatePair:
+            pair = DuplicatePair(bug_ids[i], bug_ids[j], "candidate", estimate)
+            if not confirm:
+                return pair
+            async with semaphore:
+                try:
+                    response = await self._run(
+                        self._confirm_duplicate_prompt(bugs[i], bugs[j]), task="confirm_duplicate"
+                    )
+                except Exception as e:
+                    pair.error = str(e)
+                    return pair
+            try:
+                data = extract_json(response)
+                pair.verdict = str(data.get("verdict", "")).strip().lower() or "distinct"
+                pair.similarity = float(data.get("similarity", estimate * 100)) / 100
+                pair.reason = str(data.get("reason", ""))
+            except (ValueError, TypeError, AttributeError):
+                pair.verdict = "distinct"
+                pair.reason = "Unparseable model response"
+            return pair
+        
+        pairs = list(await asyncio.gather(*(confirm_pair(i, j, est) for i, j, est in candidates)))
+        duplicates = {
+            (i, j): pair for (i, j, _), pair in zip(candidates, pairs)
+            if pair.verdict in ("duplicate", "candidate") and pair.error is None
+        }
+        clusters = [
+            DuplicateCluster(
+                bug_ids=[bug_ids[i] for i in members],
+                pairs=[pair for (i, j), pair in duplicates.items() if i in members and j in members],
+            )
+            for members in cluster_pairs(duplicates)
+        ]
+        return clusters, pairs
+    
+    def _generate_bug_report_prompt(
+        self,
+        description: str,
+        steps_to_reproduce: str,
+        environment: str
+    ) -> str:
+        """Build the generate_bug_report prompt."""
         prompt = f"""Generate a complete, professional bug report from this information:
 
 **Description:** {description}
@@ -378,30 +562,50 @@ Please create a detailed bug report following best practices including:
 - Screenshots/evidence placeholders
 - Related test cases
 """
-        
-        result = []
-        async for chunk in agent.run_stream(prompt, thread=thread):
-            if chunk.text:
-                result.append(chunk.text)
-        
-        return "".join(result)
+        return prompt
     
-    async def prioritize_bugs(
+    async def generate_bug_report(
         self,
-        bugs: List[str]
+        description: str,
+        steps_to_reproduce: str,
+        environment: str
     ) -> str:
         """
-        Prioritize a list of bugs for the development team.
+        Generate a complete bug report from basic information.
         
         Args:
-            bugs: List of bug descriptions or reports
+            description: Brief description of the issue
+            steps_to_reproduce: How to reproduce the bug
+            environment: Browser/OS/device information
             
         Returns:
-            Prioritized list with justification
+            Formatted bug report ready for submission
         """
-        agent = await self._get_agent()
-        thread = agent.get_new_thread()
-        
+        return await self._run(self._generate_bug_report_prompt(
+            description=description,
+            steps_to_reproduce=steps_to_reproduce,
+            environment=environment
+        ), task="generate_bug_report")
+    
+    async def generate_bug_report_stream(
+        self,
+        description: str,
+        steps_to_reproduce: str,
+        environment: str
+    ) -> AsyncIterator[str]:
+        """Stream the generate_bug_report response chunk by chunk as it is generated."""
+        async for chunk in self._stream(self._generate_bug_report_prompt(
+            description=description,
+            steps_to_reproduce=steps_to_reproduce,
+            environment=environment
+        ), task="generate_bug_report"):
+            yield chunk
+    
+    def _prioritize_bugs_prompt(
+        self,
+        bugs: List[str]
+    ) -> str:
+        """Build the prioritize_bugs prompt."""
         bugs_formatted = "\n\n".join([f"**Bug {i+1}:**\n{bug}" for i, bug in enumerate(bugs)])
         
         prompt = f"""Prioritize these bugs for the development team:
@@ -416,13 +620,255 @@ Please provide:
 5. Dependencies between bugs (if any)
 6. Quick wins that could be fixed first
 """
+        return prompt
+    
+    def _score_bugs_prompt(
+        self,
+        bugs: List[str],
+        offset: int
+    ) -> str:
+        """Build the map-phase prompt scoring one chunk of a large backlog."""
+        bugs_formatted = "\n\n".join(
+            [f"**Bug {offset + i + 1}:**\n{bug}" for i, bug in enumerate(bugs)]
+        )
+        
+        prompt = f"""Score each of these bugs for release prioritization:
+
+{bugs_formatted}
+
+Respond with one JSON object per line and nothing else, one line per bug:
+{{"bug": <bug number>, "score": <0-100, higher is more urgent>, "severity": "<Critical|High|Medium|Low>", "reason": "<one short sentence>"}}
+"""
+        return prompt
+    
+    def _merge_bug_rankings_prompt(
+        self,
+        scores: List[BugScore],
+        unparsed: List[str]
+    ) -> str:
+        """Build the reduce-phase prompt merging partial rankings."""
+        ranked = "\n".join(
+            f"- Bug {s.bug}: score {s.score:g}, {s.severity} - {s.reason}" for s in scores
+        )
+        partials = "\n\n---\n\n".join(unparsed)
+        
+        prompt = f"""Merge these partial bug rankings into one prioritized list for the development team.
+
+**Scored bugs:**
+{ranked or "None"}
+
+**Unstructured partial rankings:**
+{partials or "None"}
+
+Please provide:
+1. Prioritized list (highest to lowest priority)
+2. Severity rating for each
+3. Recommended sprint allocation
+4. Quick wins that could be fixed first
+"""
+        return prompt
+    
+    async def _score_bug_chunks(
+        self,
+        bugs: List[str],
+        chunk_size: int,
+        concurrency: int
+    ) -> Tuple[List[BugScore], List[str]]:
+        """
+        Map phase: score chunks of bugs in parallel.
         
-        result = []
-        async for chunk in agent.run_stream(prompt, thread=thread):
-            if chunk.text:
-                result.append(chunk.text)
+        Returns:
+            Numeric scores for every chunk that parsed cleanly, and the raw
+            responses of chunks that did not. A chunk whose model call
+            failed is returned as unparsed: the error and a one-line summary
+            of each of its bugs.
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
         
-        return "".join(result)
+        async def score_chunk(offset: int) -> Tuple[List[BugScore], Optional[str]]:
+            chunk = bugs[offset:offset + chunk_size]
+            async with semaphore:
+                try:
+                    response = await self._run(self._score_bugs_prompt(chunk, offset), task="score_bugs")
+                except Exception as e:
+                    summaries = "\n".join(
+                        f"- Bug {offset + i + 1}: {_summary_line(bug)}" for i, bug in enumerate(chunk)
+                    )
+                    return [], f"Bugs {offset + 1}-{offset + len(chunk)} could not be scored ({e}):\n{summaries}"
+            
+            expected = set(range(offset + 1, offset + len(chunk) + 1))
+            scores = {}
+            for line in response.splitlines():
+                line = line.strip().strip("`").strip()
+                if not line.startswith("{"):
+                    continue
+                try:
+                    item = json.loads(line)
+                    score = BugScore(
+                        bug=int(item["bug"]),
+                        score=float(item["score"]),
+                        severity=str(item.get("severity", "Medium")),
+                        reason=str(item.get("reason", "")),
+                    )
+                except (ValueError, KeyError, TypeError):
+                    continue
+                if score.bug in expected:
+                    scores[score.bug] = score
+            
+            if set(scores) == expected:
+                return list(scores.values()), None
+            return list(scores.values()), response
+        
+        results = await asyncio.gather(
+            *(score_chunk(offset) for offset in range(0, len(bugs), chunk_size))
+        )
+        scores = [score for chunk_scores, _ in results for score in chunk_scores]
+        unparsed = [raw for _, raw in results if raw is not None]
+        scores.sort(key=lambda s: (-s.score, s.bug))
+        return scores, unparsed
+    
+    @staticmethod
+    def _format_bug_ranking(bugs: List[str], scores: List[BugScore]) -> str:
+        """Render a locally merged ranking as markdown."""
+        lines = [
+            f"# Bug Prioritization ({len(bugs)} bugs)",
+            "",
+            "| Rank | Bug | Severity | Score | Summary | Reason |",
+            "|------|-----|----------|-------|---------|--------|",
+        ]
+        for rank, score in enumerate(scores, 1):
+            summary = _summary_line(bugs[score.bug - 1]).replace("|", "\\|")
+            reason = score.reason.replace("|", "\\|")
+            lines.append(
+                f"| {rank} | Bug {score.bug} | {score.severity} | {score.score:g} | {summary} | {reason} |"
+            )
+        return "\n".join(lines) + "\n"
+    
+    async def prioritize_bugs(
+        self,
+        bugs: List[str],
+        chunk_size: int = 25,
+        concurrency: int = 4
+    ) -> str:
+        """
+        Prioritize a list of bugs for the development team.
+        
+        Backlogs larger than ``chunk_size`` are prioritized map-reduce style:
+        chunks are scored in parallel, then merged locally when every score
+        parsed, or in a final LLM reduce pass otherwise.
+        
+        Args:
+            bugs: List of bug descriptions or reports
+            chunk_size: Maximum bugs per prompt
+            concurrency: Maximum chunk prompts in flight at once
+            
+        Returns:
+            Prioritized list with justification
+        """
+        return "".join([
+            chunk async for chunk in self.prioritize_bugs_stream(bugs, chunk_size, concurrency)
+        ])
+    
+    async def prioritize_bugs_stream(
+        self,
+        bugs: List[str],
+        chunk_size: int = 25,
+        concurrency: int = 4
+    ) -> AsyncIterator[str]:
+        """Stream the prioritize_bugs response chunk by chunk as it is generated."""
+        if len(bugs) <= chunk_size:
+            async for chunk in self._stream(self._prioritize_bugs_prompt(bugs=bugs), task="prioritize_bugs"):
+                yield chunk
+            return
+        
+        scores, unparsed = await self._score_bug_chunks(bugs, chunk_size, concurrency)
+        if not unparsed:
+            yield self._format_bug_ranking(bugs, scores)
+            return
+        
+        async for chunk in self._stream(
+            self._merge_bug_rankings_prompt(scores, unparsed), task="merge_bug_rankings"
+        ):
+            yield chunk
+    
+    def quick_triage(self, bug_report: str, bug_id: str = "") -> TriageResult:
+        """
+        Classify severity and category locally, without a model call.
+
+        Args:
+            bug_report: Bug report or crash description
+            bug_id: Identifier echoed back in the result
+
+        Returns:
+            Local triage result; check needs_escalation for low confidence
+        """
+        return get_triage_engine().triage(bug_report, bug_id)
+
+    def _triage_prompt(self, bug_report: str) -> str:
+        """Build the triage escalation prompt."""
+        categories = ", ".join(TEST_CATEGORIES)
+        prompt = f"""Classify the severity and category of this bug:
+
+{bug_report}
+
+Respond with a single JSON object and nothing else:
+{{"severity": "<Critical|High|Medium|Low>", "category": "<one of: {categories}>"}}
+"""
+        return prompt
+
+    async def triage_bugs(
+        self,
+        bug_reports: List[str],
+        bug_ids: Optional[List[str]] = None,
+        escalate: bool = True,
+        concurrency: int = 4
+    ) -> List[TriageResult]:
+        """
+        Triage many bugs locally, escalating only low-confidence ones.
+
+        Args:
+            bug_reports: Bug report texts
+            bug_ids: Identifiers for the reports (defaults to positions)
+            escalate: Send low-confidence items to the model
+            concurrency: Maximum escalations in flight at once
+
+        Returns:
+            One result per report, in input order. Items whose escalation
+            fails keep their local result, with needs_escalation still set.
+        """
+        bug_ids = bug_ids or [str(i + 1) for i in range(len(bug_reports))]
+        results = [
+            self.quick_triage(report, bug_id) for report, bug_id in zip(bug_reports, bug_ids)
+        ]
+        if not escalate:
+            return results
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def escalate_one(index: int):
+            async with semaphore:
+                try:
+                    response = await self._run(self._triage_prompt(bug_reports[index]), task="triage")
+                except Exception:
+                    return
+            match = re.search(r"\{.*?\}", response, re.S)
+            try:
+                data = json.loads(match.group(0)) if match else {}
+            except ValueError:
+                data = {}
+            severity = normalize_severity(str(data.get("severity", "")))
+            category = str(data.get("category", "")).lower()
+            if severity and category in TEST_CATEGORIES:
+                result = results[index]
+                result.severity, result.severity_confidence = severity, 1.0
+                result.category, result.category_confidence = category, 1.0
+                result.needs_escalation = False
+                result.source = "llm"
+
+        await asyncio.gather(
+            *(escalate_one(i) for i, result in enumerate(results) if result.needs_escalation)
+        )
+        return results
 
 
 async def main():
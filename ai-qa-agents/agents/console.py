@@ -0,0 +1,55 @@
+"""
+Async Console Input
+Line reader that keeps the event loop running while waiting for the user
+"""
+import asyncio
+import sys
+import threading
+from typing import Optional
+
+
+class AsyncLineReader:
+    """
+    Reads stdin lines on a daemon thread and hands them to the event loop.
+
+    Unlike calling ``input()`` inside a coroutine, awaiting ``readline()``
+    lets other tasks (background analyses, cache writes, telemetry export)
+    keep running while the user is typing. The daemon thread never blocks
+    interpreter shutdown.
+    """
+
+    def __init__(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    def _deliver(self, line: Optional[str]) -> bool:
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, line)
+            return True
+        except RuntimeError:
+            # Event loop already closed; stop reading
+            return False
+
+    def _pump(self):
+        while True:
+            line = sys.stdin.readline()
+            if not line:
+                self._deliver(None)
+                return
+            if not self._deliver(line.rstrip("\r\n")):
+                return
+
+    async def readline(self, prompt: str = "") -> Optional[str]:
+        """
+        Wait for the next line of input.
+
+        Returns:
+            The line without its newline, or None at end of input
+        """
+        if prompt:
+            print(prompt, end="", flush=True)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._pump, name="stdin-reader", daemon=True)
+            self._thread.start()
+        return await self._queue.get()
@@ -0,0 +1,77 @@
+"""
+Conversation Memory
+Bounded chat history: recent turns verbatim plus a rolling summary
+"""
+from dataclasses import dataclass
+from typing import List
+
+
+@dataclass
+class Turn:
+    """One user/assistant exchange"""
+    user: str
+    assistant: str
+
+
+class ConversationMemory:
+    """
+    Windowed conversation memory for long chat sessions.
+
+    The last ``max_turns`` turns are replayed verbatim; once the window
+    overflows, the oldest ``fold_size`` turns are folded into a rolling
+    summary. Prompt size therefore stays bounded instead of growing with
+    the whole session.
+    """
+
+    def __init__(self, max_turns: int = 6, fold_size: int = 3):
+        self.max_turns = max(1, max_turns)
+        self.fold_size = max(1, fold_size)
+        self.summary = ""
+        self.turns: List[Turn] = []
+        self.prompt_tokens: List[int] = []  # Estimated prompt size of every turn sent
+
+    def build_prompt(self, user_input: str) -> str:
+        """Build the prompt for the next turn from the summary and recent turns."""
+        sections = []
+        if self.summary:
+            sections.append(f"**Session summary so far:**\n{self.summary}")
+        if self.turns:
+            recent = "\n\n".join(f"User: {t.user}\nAssistant: {t.assistant}" for t in self.turns)
+            sections.append(f"**Recent conversation:**\n{recent}")
+        if not sections:
+            return user_input
+
+        sections.append(f"**Current message:**\nUser: {user_input}")
+        return "\n\n".join(sections)
+
+    def add_turn(self, user_input: str, response: str):
+        """Record a completed exchange."""
+        self.turns.append(Turn(user_input, response))
+
+    @property
+    def needs_folding(self) -> bool:
+        return len(self.turns) > self.max_turns
+
+    def oldest_turns(self) -> List[Turn]:
+        """Turns to fold into the summary next."""
+        return self.turns[:self.fold_size]
+
+    def apply_fold(self, summary: str, count: int):
+        """Replace the summary and drop the ``count`` oldest turns it now covers."""
+        self.summary = summary
+        self.turns = self.turns[count:]
+
+    def summary_prompt(self, summary: str, turns: List[Turn]) -> str:
+        """Build the prompt that folds ``turns`` into ``summary``."""
+        transcript = "\n\n".join(f"User: {t.user}\nAssistant: {t.assistant}" for t in turns)
+        return f"""Update the running summary of this testing session with the new turns.
+
+**Current summary:**
+{summary or "None yet"}
+
+**New turns:**
+{transcript}
+
+Keep the test plan, tests executed and their results, defects found, blockers,
+decisions and open questions. Reply with the updated summary only, under 200 words.
+"""
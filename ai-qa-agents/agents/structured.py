@@ -0,0 +1,199 @@
+"""
+Structured Output Helpers
+JSON-schema prompts and tolerant parsing of model JSON into dataclasses
+"""
+import json
+import re
+import typing
+from dataclasses import fields, is_dataclass
+from typing import Any, Dict, List, Optional, Type, TypeVar
+
+T = TypeVar("T")
+
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+
+
+def schema_instructions(schema: Dict[str, Any]) -> str:
+    """Prompt suffix asking for compact JSON matching ``schema``."""
+    return (
+        "Respond with compact JSON only (no markdown, no commentary) matching this JSON schema:\n"
+        f"{json.dumps(schema, separators=(',', ':'))}\n"
+    )
+
+
+def extract_json(text: str) -> Any:
+    """
+    Parse the JSON document in a model response.
+
+    Tolerates markdown code fences and prose around the document.
+
+    Raises:
+        ValueError: If no JSON document can be parsed
+    """
+    text = _FENCE_RE.sub("", text.strip())
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+
+    starts = [i for i in (text.find("["), text.find("{")) if i != -1]
+    if starts:
+        start = min(starts)
+        end = text.rfind("]" if text[start] == "[" else "}")
+        if end > start:
+            try:
+                return json.loads(text[start:end + 1])
+            except ValueError:
+                pass
+    raise ValueError(f"Model response is not valid JSON: {text[:120]!r}")
+
+
+def unwrap_items(data: Any) -> List[Any]:
+    """
+    Items of a JSON array response.
+
+    Models sometimes wrap the requested array in an object such as
+    ``{"test_cases": [...]}``; an object whose only value is a list is
+    unwrapped to that list. Any other value is a single item.
+    """
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict) and len(data) == 1:
+        (value,) = data.values()
+        if isinstance(value, list):
+            return value
+    return [data]
+
+
+def _coerce(value: Any, annotation: Any) -> Any:
+    origin = typing.get_origin(annotation)
+    if origin in (list, typing.List):
+        (item_type,) = typing.get_args(annotation) or (Any,)
+        if value is None or value == "":
+            return []
+        items = value if isinstance(value, list) else [value]
+        return [_coerce(item, item_type) for item in items]
+    if annotation is str:
+        if value is None:
+            return ""
+        return value if isinstance(value, str) else json.dumps(value)
+    return value
+
+
+def from_json(cls: Type[T], data: Dict[str, Any]) -> T:
+    """
+    Build a dataclass from parsed JSON, coercing field types.
+
+    Missing strings become "", missing lists become [] and scalars are
+    wrapped where a list is expected, so a slightly off-schema response
+    still yields a usable object.
+    """
+    if not is_dataclass(cls):
+        raise TypeError(f"{cls!r} is not a dataclass")
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected a JSON object for {cls.__name__}, got {type(data).__name__}")
+
+    hints = typing.get_type_hints(cls)
+    return cls(**{f.name: _coerce(data.get(f.name), hints[f.name]) for f in fields(cls)})
+
+
+class JsonObjectScanner:
+    """
+    Incrementally extracts complete JSON objects from streamed text.
+
+    Objects are the items of a top-level array, or top-level objects when
+    the model emits one per line. A top-level object whose first value is
+    an array of objects, such as ``{"test_cases": [...]}``, is a wrapper:
+    the array's items are extracted instead. Text outside JSON (prose,
+    code fences) is skipped, and each object is returned as soon as it
+    closes.
+    """
+
+    def __init__(self):
+        self._depth = 0
+        self._item_depth: Optional[int] = None
+        self._in_string = False
+        self._escape = False
+        self._current: List[str] = []
+        self._first_value = False  # Still in the first member of a top-level object
+        self._wrapped = False  # Opened an array as that first value; "{" next makes it a wrapper
+
+    def feed(self, text: str) -> List[Any]:
+        """Consume a chunk and return the objects it completed."""
+        objects = []
+        capturing = bool(self._current)
+        for ch in text:
+            if capturing:
+                self._current.append(ch)
+            if self._wrapped and ch != "{" and not ch.isspace():
+                self._wrapped = False
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "[{":
+                if self._item_depth is None:
+                    self._item_depth = 1 if ch == "[" else 0
+                    self._first_value = ch == "{"
+                elif self._wrapped:
+                    # Stream the wrapped array's items instead of the whole object
+                    self._item_depth = 2
+                    self._current = []
+                    capturing = self._wrapped = False
+                elif ch == "[" and self._depth == 1 and self._first_value:
+                    self._wrapped = True
+                if ch == "{" and self._depth == self._item_depth and not capturing:
+                    self._current = ["{"]
+                    capturing = True
+                self._depth += 1
+            elif ch in "]}" and self._depth:
+                self._depth -= 1
+                if capturing and self._depth == self._item_depth:
+                    try:
+                        obj = json.loads("".join(self._current))
+                    except ValueError:
+                        pass
+                    else:
+                        objects.extend(unwrap_items(obj) if self._item_depth == 0 else [obj])
+                    self._current = []
+                    capturing = False
+                if self._depth == 0:
+                    self._item_depth = None
+            elif ch == "," and self._depth == 1:
+                self._first_value = False
+        return objects
+
+
+class MarkdownBlockSplitter:
+    """
+    Splits streamed markdown into blocks that start at matching headings.
+
+    A block is complete once the next matching heading begins; the last
+    block is returned by close().
+    """
+
+    def __init__(self, heading: "re.Pattern[str]"):
+        self._heading = heading
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Consume a chunk and return the blocks it completed."""
+        self._buffer += text
+        starts = [match.start() for match in self._heading.finditer(self._buffer)]
+        if len(starts) < 2:
+            return []
+        blocks = [self._buffer[a:b] for a, b in zip(starts, starts[1:])]
+        self._buffer = self._buffer[starts[-1]:]
+        return blocks
+
+    def close(self) -> List[str]:
+        """Return the final block, if the buffer holds one."""
+        buffer, self._buffer = self._buffer, ""
+        return [buffer] if self._heading.match(buffer) else []
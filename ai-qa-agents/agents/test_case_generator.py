@@ -3,15 +3,22 @@ Test Case Generator Agent
 Generates comprehensive test cases from requirements or user stories
 """
 import asyncio
-from typing import Annotated, Optional, List
+import re
+import time
+from typing import Annotated, Callable, Optional, List, Union, AsyncIterator
 from dataclasses import dataclass
 from datetime import datetime
 
-from agent_framework import ChatAgent
-from agent_framework.openai import OpenAIChatClient
-from openai import AsyncOpenAI
-
-from config import QAConfig, ModelConfig
+from analysis.keywords import TEST_CATEGORIES, scan_keywords
+from .base import BaseQAAgent
+from .structured import (
+    JsonObjectScanner,
+    MarkdownBlockSplitter,
+    extract_json,
+    from_json,
+    schema_instructions,
+    unwrap_items,
+)
 
 
 @dataclass
@@ -26,6 +33,236 @@ class GeneratedTestCase:
     steps: List[dict]
     expected_results: List[str]
     notes: List[str]
+    
+    def to_markdown(self) -> str:
+        """Render in the standard test case template format."""
+        test_id = self.id if self.id.upper().startswith("TC-") else f"TC-{self.id}"
+        steps = "\n".join(
+            f"| {i} | {_cell(step.get('action', ''))} | {_cell(step.get('test_data', ''))} |"
+            for i, step in enumerate(self.steps, 1)
+        )
+        return f"""# {test_id}: {self.title}
+
+**Priority:** {self.priority}  
+**Type:** {self.type}  
+**Component:** {self.component}
+
+## Preconditions
+{_bullets(self.preconditions)}
+
+## Test Steps
+| Step | Action | Test Data |
+|------|--------|-----------|
+{steps}
+
+## Expected Result
+{_bullets(self.expected_results)}
+
+## Notes
+{_bullets(self.notes)}
+"""
+
+
+# JSON schema requested in structured mode; mirrors GeneratedTestCase
+TEST_CASE_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "id": {"type": "string"},
+            "title": {"type": "string"},
+            "priority": {"enum": ["Critical", "High", "Medium", "Low"]},
+            "type": {"type": "string"},
+            "component": {"type": "string"},
+            "preconditions": {"type": "array", "items": {"type": "string"}},
+            "steps": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {"action": {"type": "string"}, "test_data": {"type": "string"}},
+                },
+            },
+            "expected_results": {"type": "array", "items": {"type": "string"}},
+            "notes": {"type": "array", "items": {"type": "string"}},
+        },
+        "required": ["id", "title", "priority", "type", "steps", "expected_results"],
+    },
+}
+
+
+def _cell(value) -> str:
+    """Escape a value for a markdown table cell."""
+    return str(value).replace("|", "\\|").replace("\n", " ")
+
+
+def _bullets(items: List[str]) -> str:
+    return "\n".join(f"- {item}" for item in items) or "- None"
+
+
+def _build_test_case(item, component: str) -> Optional[GeneratedTestCase]:
+    """Build one test case from a JSON object, or None if it is not a titled test case."""
+    if not isinstance(item, dict):
+        return None
+    test_case = from_json(GeneratedTestCase, item)
+    if not test_case.title.strip():
+        return None
+    test_case.component = test_case.component or component
+    test_case.steps = [
+        step if isinstance(step, dict) else {"action": str(step), "test_data": ""}
+        for step in test_case.steps
+    ]
+    return test_case
+
+
+def parse_test_cases(data, component: str = "General") -> List[GeneratedTestCase]:
+    """
+    Build GeneratedTestCase objects from parsed structured output.
+    
+    Items without a title are skipped.
+    
+    Args:
+        data: A JSON array of test case objects, an object wrapping one
+            (e.g. ``{"test_cases": [...]}``), or a single test case object
+        component: Default for test cases that omit it
+        
+    Raises:
+        ValueError: If no item is a test case with a title
+    """
+    cases = (_build_test_case(item, component) for item in unwrap_items(data))
+    test_cases = [case for case in cases if case is not None]
+    if not test_cases:
+        raise ValueError(f"Structured response has no test case with a title: {repr(data)[:120]}")
+    return test_cases
+
+
+_TC_HEADING_RE = re.compile(r"^#{1,4}\s*(?:\*\*)?TC-", re.M)
+_TC_TITLE_RE = re.compile(r"^#{1,4}\s*(?:\*\*)?(?P<id>TC-[\w-]+)\**\s*[:\-\u2013\u2014]?\s*(?P<title>.*?)\**\s*$", re.M)
+_TC_FIELD_RE = re.compile(r"\*\*(?P<name>Priority|Type|Component):?\*\*:?\s*\|?\s*(?P<value>[^|\n]*?)\s*(?:\||$)", re.M | re.I)
+_SECTION_RE = re.compile(r"^#{2,5}\s+(?P<name>.+?)\s*$", re.M)
+_LIST_MARKER_RE = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+")
+
+
+def _list_items(text: str) -> List[str]:
+    """Bullet/numbered items (or plain lines) of a markdown section."""
+    items = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line == "---":
+            continue
+        items.append(_LIST_MARKER_RE.sub("", line))
+    return items
+
+
+def _table_steps(text: str) -> List[dict]:
+    """Steps from a ``| Step | Action | Test Data |`` table, or a numbered list."""
+    steps = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line.startswith("|"):
+            continue
+        cells = [cell.strip() for cell in line.strip("|").split("|")]
+        if not cells or set(cells[0]) <= set("-: ") or cells[0].lower() == "step":
+            continue
+        step = {"action": cells[1] if len(cells) > 1 else cells[0], "test_data": cells[2] if len(cells) > 2 else ""}
+        if len(cells) > 3:
+            step["expected"] = cells[3]
+        steps.append(step)
+    return steps or [{"action": item, "test_data": ""} for item in _list_items(text)]
+
+
+def parse_test_case_markdown(block: str, component: str = "General") -> Optional[GeneratedTestCase]:
+    """
+    Parse one ``# TC-...`` markdown block into a GeneratedTestCase.
+    
+    Args:
+        block: Markdown from a test case heading up to the next one
+        component: Default when the block has no Component field
+        
+    Returns:
+        The test case, or None if the block has no TC heading
+    """
+    heading = _TC_TITLE_RE.search(block)
+    if heading is None:
+        return None
+    
+    fields = {m.group("name").lower(): m.group("value").strip() for m in _TC_FIELD_RE.finditer(block)}
+    sections = {}
+    matches = list(_SECTION_RE.finditer(block))
+    for match, following in zip(matches, matches[1:] + [None]):
+        end = following.start() if following else len(block)
+        sections[match.group("name").lower()] = block[match.end():end]
+    
+    def section(*names: str) -> str:
+        return next((body for title, body in sections.items() if any(n in title for n in names)), "")
+    
+    return GeneratedTestCase(
+        id=heading.group("id"),
+        title=heading.group("title").strip(),
+        priority=fields.get("priority", ""),
+        type=fields.get("type", ""),
+        component=fields.get("component") or component,
+        preconditions=_list_items(section("precondition")),
+        steps=_table_steps(section("step")),
+        expected_results=_list_items(section("expected")),
+        notes=_list_items(section("note")),
+    )
+
+
+class TestCaseStreamParser:
+    """
+    Incremental parser turning a streamed response into test cases.
+    
+    In markdown mode each ``# TC-...`` block is emitted once the next one
+    starts; in structured mode each JSON object is emitted as soon as it
+    closes, skipping objects without a title. Feed chunks as they arrive
+    and call close() at the end.
+    """
+    
+    def __init__(self, structured: bool = False, component: str = "General"):
+        self.structured = structured
+        self.component = component
+        self._json = JsonObjectScanner()
+        self._markdown = MarkdownBlockSplitter(_TC_HEADING_RE)
+        self._produced = 0
+    
+    def _convert_blocks(self, blocks: List[str]) -> List[GeneratedTestCase]:
+        cases = (parse_test_case_markdown(block, self.component) for block in blocks)
+        return [case for case in cases if case is not None]
+    
+    def feed(self, chunk: str) -> List[GeneratedTestCase]:
+        """Consume a chunk and return the test cases it completed."""
+        if self.structured:
+            cases = (_build_test_case(item, self.component) for item in self._json.feed(chunk))
+            test_cases = [case for case in cases if case is not None]
+            self._produced += len(test_cases)
+            return test_cases
+        return self._convert_blocks(self._markdown.feed(chunk))
+    
+    def close(self) -> List[GeneratedTestCase]:
+        """
+        Return the test case still buffered at the end of the stream.
+        
+        Raises:
+            ValueError: In structured mode, if the stream held no test case
+                with a title
+        """
+        if self.structured:
+            if not self._produced:
+                raise ValueError("Structured response has no test case with a title")
+            return []
+        return self._convert_blocks(self._markdown.close())
+
+
+@dataclass
+class BatchGenerationResult:
+    """Result of generating test cases for one requirement in a batch"""
+    index: int
+    item_id: str
+    requirement: str
+    component: str
+    content: str
+    latency_seconds: float
+    error: Optional[str] = None
 
 
 # Tools for Test Case Generator Agent
@@ -117,29 +354,23 @@ def categorize_test_case(
     description: Annotated[str, "Test case description"]
 ) -> str:
     """Categorize a test case by type and priority."""
-    categories = {
-        "security": ["sql injection", "xss", "authentication", "authorization", "password", "token"],
-        "performance": ["load", "response time", "timeout", "concurrent", "stress"],
-        "functional": ["login", "submit", "create", "update", "delete", "search"],
-        "usability": ["accessibility", "navigation", "responsive", "error message"],
-        "integration": ["api", "database", "third-party", "webhook"]
-    }
-    
-    description_lower = description.lower()
-    for category, keywords in categories.items():
-        if any(kw in description_lower for kw in keywords):
+    hits = scan_keywords(description)
+    for category in TEST_CATEGORIES:
+        if hits[f"category.{category}"]:
             priority = "High" if category in ["security", "functional"] else "Medium"
             return f"Category: {category.title()}, Suggested Priority: {priority}"
     
     return "Category: Functional, Suggested Priority: Medium"
 
 
-class TestCaseGeneratorAgent:
+class TestCaseGeneratorAgent(BaseQAAgent):
     """
     AI Agent for generating comprehensive test cases.
     Uses Microsoft Agent Framework with GitHub Models.
     """
     
+    AGENT_NAME = "TestCaseGenerator"
+    
     SYSTEM_INSTRUCTIONS = """You are an expert QA Test Engineer specializing in creating comprehensive test cases.
 
 Your responsibilities:
@@ -165,37 +396,39 @@ Categories to consider:
 - Usability (accessibility, responsive design)
 """
 
-    def __init__(self, config: Optional[ModelConfig] = None):
-        self.config = config or ModelConfig()
-        self._agent = None
-        self._client = None
-    
-    async def _get_agent(self) -> ChatAgent:
-        """Get or create the agent instance."""
-        if self._agent is None:
-            self._client = AsyncOpenAI(
-                base_url=self.config.base_url,
-                api_key=self.config.api_key,
-            )
-            
-            chat_client = OpenAIChatClient(
-                async_client=self._client,
-                model_id=self.config.model_id
-            )
-            
-            self._agent = ChatAgent(
-                chat_client=chat_client,
-                name="TestCaseGenerator",
-                instructions=self.SYSTEM_INSTRUCTIONS,
-                tools=[
-                    analyze_requirements,
-                    get_test_case_template,
-                    suggest_test_data,
-                    categorize_test_case,
-                ]
-            )
-        
-        return self._agent
+    TOOLS = [
+        analyze_requirements,
+        get_test_case_template,
+        suggest_test_data,
+        categorize_test_case,
+    ]
+    
+    def _generate_test_cases_prompt(
+        self,
+        requirement: str,
+        component: str = "General",
+        count: int = 5,
+        include_negative: bool = True,
+        include_security: bool = True
+    ) -> str:
+        """Build the generate_test_cases prompt."""
+        prompt = f"""Generate {count} comprehensive test cases for the following requirement:
+
+**Component:** {component}
+**Requirement:** {requirement}
+
+Requirements:
+- Include positive/happy path test cases
+{"- Include negative/error handling test cases" if include_negative else ""}
+{"- Include security-focused test cases" if include_security else ""}
+- Use the standard test case template format
+- Start each test case with a "# TC-<number>: <title>" heading
+- Suggest specific test data values
+- Prioritize by risk level
+
+Please generate the test cases in markdown format, ready to save as individual files.
+"""
+        return prompt
     
     async def generate_test_cases(
         self,
@@ -218,10 +451,42 @@ Categories to consider:
         Returns:
             Generated test cases in markdown format
         """
-        agent = await self._get_agent()
-        thread = agent.get_new_thread()
-        
-        prompt = f"""Generate {count} comprehensive test cases for the following requirement:
+        return await self._run(self._generate_test_cases_prompt(
+            requirement=requirement,
+            component=component,
+            count=count,
+            include_negative=include_negative,
+            include_security=include_security
+        ), task="generate_test_cases")
+    
+    async def generate_test_cases_stream(
+        self,
+        requirement: str,
+        component: str = "General",
+        count: int = 5,
+        include_negative: bool = True,
+        include_security: bool = True
+    ) -> AsyncIterator[str]:
+        """Stream the generate_test_cases response chunk by chunk as it is generated."""
+        async for chunk in self._stream(self._generate_test_cases_prompt(
+            requirement=requirement,
+            component=component,
+            count=count,
+            include_negative=include_negative,
+            include_security=include_security
+        ), task="generate_test_cases"):
+            yield chunk
+    
+    def _generate_test_cases_structured_prompt(
+        self,
+        requirement: str,
+        component: str = "General",
+        count: int = 5,
+        include_negative: bool = True,
+        include_security: bool = True
+    ) -> str:
+        """Build the structured generate_test_cases prompt."""
+        prompt = f"""Generate {count} test cases for the following requirement:
 
 **Component:** {component}
 **Requirement:** {requirement}
@@ -230,38 +495,179 @@ Requirements:
 - Include positive/happy path test cases
 {"- Include negative/error handling test cases" if include_negative else ""}
 {"- Include security-focused test cases" if include_security else ""}
-- Use the standard test case template format
-- Suggest specific test data values
+- Use specific test data values
 - Prioritize by risk level
+- Number ids TC-001, TC-002, ...
 
-Please generate the test cases in markdown format, ready to save as individual files.
-"""
+{schema_instructions(TEST_CASE_SCHEMA)}"""
+        return prompt
+    
+    async def generate_test_cases_structured(
+        self,
+        requirement: str,
+        component: str = "General",
+        count: int = 5,
+        include_negative: bool = True,
+        include_security: bool = True
+    ) -> List[GeneratedTestCase]:
+        """
+        Generate test cases as typed objects.
         
-        result = []
-        async for chunk in agent.run_stream(prompt, thread=thread):
-            if chunk.text:
-                result.append(chunk.text)
+        The model answers in compact JSON instead of markdown, which cuts
+        output tokens; render with GeneratedTestCase.to_markdown() if needed.
         
-        return "".join(result)
+        Args:
+            requirement: The requirement or user story text
+            component: Component/module being tested
+            count: Number of test cases to generate
+            include_negative: Include negative test cases
+            include_security: Include security test cases
+            
+        Returns:
+            Generated test cases
+            
+        Raises:
+            ValueError: If the response is not valid JSON or holds no test
+                case with a title
+        """
+        response = await self._run(self._generate_test_cases_structured_prompt(
+            requirement=requirement,
+            component=component,
+            count=count,
+            include_negative=include_negative,
+            include_security=include_security
+        ), task="generate_test_cases_structured")
+        return parse_test_cases(extract_json(response), component)
     
-    async def enhance_test_case(
+    async def generate_test_cases_iter(
         self,
-        existing_test_case: str,
-        enhancement_type: str = "all"
-    ) -> str:
+        requirement: str,
+        component: str = "General",
+        count: int = 5,
+        include_negative: bool = True,
+        include_security: bool = True,
+        structured: bool = False,
+        stop_at_count: bool = True
+    ) -> AsyncIterator[GeneratedTestCase]:
         """
-        Enhance an existing test case with additional scenarios.
+        Yield test cases one by one while the response is still streaming.
+        
+        Downstream work (evaluation, file writing, de-duplication) can start
+        on the first test case instead of waiting for the whole response.
         
         Args:
-            existing_test_case: The current test case content
-            enhancement_type: Type of enhancement (edge_cases, security, performance, all)
+            requirement: The requirement or user story text
+            component: Component/module being tested
+            count: Number of test cases to generate
+            include_negative: Include negative test cases
+            include_security: Include security test cases
+            structured: Request compact JSON instead of markdown
+            stop_at_count: Stop (and cancel generation) once ``count`` test
+                cases have been parsed
+            
+        Yields:
+            Each test case as soon as it is complete
+            
+        Raises:
+            ValueError: In structured mode, if the response holds no test
+                case with a title
+        """
+        build_prompt = (
+            self._generate_test_cases_structured_prompt if structured
+            else self._generate_test_cases_prompt
+        )
+        prompt = build_prompt(
+            requirement=requirement,
+            component=component,
+            count=count,
+            include_negative=include_negative,
+            include_security=include_security
+        )
+        task = "generate_test_cases_structured" if structured else "generate_test_cases"
+        parser = TestCaseStreamParser(structured, component)
+        stream = self._stream(prompt, task=task, cancel_when_idle=stop_at_count)
+        produced = 0
+        try:
+            async for chunk in stream:
+                for test_case in parser.feed(chunk):
+                    yield test_case
+                    produced += 1
+                    if stop_at_count and produced >= count:
+                        return
+            for test_case in parser.close():
+                yield test_case
+                produced += 1
+                if stop_at_count and produced >= count:
+                    return
+        finally:
+            await stream.aclose()
+    
+    async def generate_test_cases_batch(
+        self,
+        requirements: List[Union[str, dict]],
+        concurrency: int = 4,
+        count: int = 5,
+        include_negative: bool = True,
+        include_security: bool = True,
+        on_result: Optional[Callable[[BatchGenerationResult], None]] = None
+    ) -> List[BatchGenerationResult]:
+        """
+        Generate test cases for many requirements concurrently.
+        
+        Args:
+            requirements: Requirement strings, or dicts with a "requirement" key
+                and optional "id", "component" and "count" keys
+            concurrency: Maximum number of requirements in flight at once
+            count: Default number of test cases per requirement
+            include_negative: Include negative test cases
+            include_security: Include security test cases
+            on_result: Called with each result as soon as it completes
             
         Returns:
-            Enhanced test case or additional related test cases
+            Results in input order; failed items carry an error message
         """
-        agent = await self._get_agent()
-        thread = agent.get_new_thread()
+        semaphore = asyncio.Semaphore(max(1, concurrency))
         
+        async def generate_one(index: int, item: Union[str, dict]) -> BatchGenerationResult:
+            if isinstance(item, str):
+                item = {"requirement": item}
+            result = BatchGenerationResult(
+                index=index,
+                item_id=str(item.get("id") or f"REQ-{index + 1:04d}"),
+                requirement=item["requirement"],
+                component=item.get("component") or "General",
+                content="",
+                latency_seconds=0.0,
+            )
+            
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    result.content = await self.generate_test_cases(
+                        requirement=result.requirement,
+                        component=result.component,
+                        count=int(item.get("count") or count),
+                        include_negative=include_negative,
+                        include_security=include_security
+                    )
+                except Exception as e:
+                    result.error = str(e)
+                result.latency_seconds = time.perf_counter() - started
+            
+            if on_result is not None:
+                on_result(result)
+            return result
+        
+        return list(await asyncio.gather(
+            *(generate_one(i, item) for i, item in enumerate(requirements))
+        ))
+    
+    def _enhance_test_case_prompt(
+        self,
+        existing_test_case: str,
+        enhancement_type: str = "all"
+    ) -> str:
+        """Build the enhance_test_case prompt."""
         prompt = f"""Review and enhance this existing test case:
 
 {existing_test_case}
@@ -275,32 +681,46 @@ Please:
 4. Recommend additional test data variations
 5. Generate complementary test cases if appropriate
 """
-        
-        result = []
-        async for chunk in agent.run_stream(prompt, thread=thread):
-            if chunk.text:
-                result.append(chunk.text)
-        
-        return "".join(result)
+        return prompt
     
-    async def generate_from_code(
+    async def enhance_test_case(
         self,
-        code_snippet: str,
-        language: str = "typescript"
+        existing_test_case: str,
+        enhancement_type: str = "all"
     ) -> str:
         """
-        Generate test cases by analyzing code.
+        Enhance an existing test case with additional scenarios.
         
         Args:
-            code_snippet: Source code to analyze
-            language: Programming language
+            existing_test_case: The current test case content
+            enhancement_type: Type of enhancement (edge_cases, security, performance, all)
             
         Returns:
-            Generated test cases based on code analysis
+            Enhanced test case or additional related test cases
         """
-        agent = await self._get_agent()
-        thread = agent.get_new_thread()
-        
+        return await self._run(self._enhance_test_case_prompt(
+            existing_test_case=existing_test_case,
+            enhancement_type=enhancement_type
+        ), task="enhance_test_case")
+    
+    async def enhance_test_case_stream(
+        self,
+        existing_test_case: str,
+        enhancement_type: str = "all"
+    ) -> AsyncIterator[str]:
+        """Stream the enhance_test_case response chunk by chunk as it is generated."""
+        async for chunk in self._stream(self._enhance_test_case_prompt(
+            existing_test_case=existing_test_case,
+            enhancement_type=enhancement_type
+        ), task="enhance_test_case"):
+            yield chunk
+    
+    def _generate_from_code_prompt(
+        self,
+        code_snippet: str,
+        language: str = "typescript"
+    ) -> str:
+        """Build the generate_from_code prompt."""
         prompt = f"""Analyze this {language} code and generate test cases:
 
 ```{language}
@@ -314,13 +734,39 @@ Please:
 4. Add error handling scenarios
 5. Consider any async/promise handling if applicable
 """
+        return prompt
+    
+    async def generate_from_code(
+        self,
+        code_snippet: str,
+        language: str = "typescript"
+    ) -> str:
+        """
+        Generate test cases by analyzing code.
         
-        result = []
-        async for chunk in agent.run_stream(prompt, thread=thread):
-            if chunk.text:
-                result.append(chunk.text)
-        
-        return "".join(result)
+        Args:
+            code_snippet: Source code to analyze
+            language: Programming language
+            
+        Returns:
+            Generated test cases based on code analysis
+        """
+        return await self._run(
+            self._generate_from_code_prompt(code_snippet=code_snippet, language=language),
+            task="generate_from_code"
+        )
+    
+    async def generate_from_code_stream(
+        self,
+        code_snippet: str,
+        language: str = "typescript"
+    ) -> AsyncIterator[str]:
+        """Stream the generate_from_code response chunk by chunk as it is generated."""
+        async for chunk in self._stream(
+            self._generate_from_code_prompt(code_snippet=code_snippet, language=language),
+            task="generate_from_code"
+        ):
+            yield chunk
 
 
 async def main():
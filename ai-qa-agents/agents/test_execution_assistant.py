@@ -3,16 +3,19 @@ Test Execution Assistant Agent
 Helps manage and track manual test execution, generates reports
 """
 import asyncio
-from typing import Annotated, Optional, List, Dict
+import signal
+from typing import Annotated, Optional, List, Dict, AsyncIterator
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+from pathlib import Path
 
-from agent_framework import ChatAgent
-from agent_framework.openai import OpenAIChatClient
-from openai import AsyncOpenAI
-
-from config import ModelConfig
+from analysis.logs import excerpt_log, excerpt_text
+from config import LogConfig
+from scheduler import estimate_tokens
+from .base import BaseQAAgent
+from .console import AsyncLineReader
+from .memory import ConversationMemory
 
 
 class TestStatus(Enum):
@@ -181,12 +184,14 @@ Tip: Run Bug Analyzer agent for severity assessment
 """
 
 
-class TestExecutionAssistant:
+class TestExecutionAssistant(BaseQAAgent):
     """
     AI Agent for assisting with test execution and reporting.
     Uses Microsoft Agent Framework with GitHub Models.
     """
     
+    AGENT_NAME = "TestExecutionAssistant"
+    
     SYSTEM_INSTRUCTIONS = """You are a Test Execution Assistant helping QA teams manage their testing activities.
 
 Your responsibilities:
@@ -212,59 +217,24 @@ Testing Best Practices to Encourage:
 - Track execution time for planning
 """
 
-    def __init__(self, config: Optional[ModelConfig] = None):
-        self.config = config or ModelConfig()
-        self._agent = None
-        self._client = None
+    TOOLS = [
+        get_test_execution_status,
+        calculate_test_coverage,
+        suggest_next_test,
+        generate_test_summary,
+        track_defect,
+    ]
     
-    async def _get_agent(self) -> ChatAgent:
-        """Get or create the agent instance."""
-        if self._agent is None:
-            self._client = AsyncOpenAI(
-                base_url=self.config.base_url,
-                api_key=self.config.api_key,
-            )
-            
-            chat_client = OpenAIChatClient(
-                async_client=self._client,
-                model_id=self.config.model_id
-            )
-            
-            self._agent = ChatAgent(
-                chat_client=chat_client,
-                name="TestExecutionAssistant",
-                instructions=self.SYSTEM_INSTRUCTIONS,
-                tools=[
-                    get_test_execution_status,
-                    calculate_test_coverage,
-                    suggest_next_test,
-                    generate_test_summary,
-                    track_defect,
-                ]
-            )
-        
-        return self._agent
+    # Budget for logs sent for analysis; larger logs are excerpted around their errors
+    LOG_CONFIG = LogConfig()
     
-    async def get_execution_guidance(
+    def _get_execution_guidance_prompt(
         self,
         test_plan: str,
         time_available: str,
         priorities: str
     ) -> str:
-        """
-        Get guidance on test execution based on constraints.
-        
-        Args:
-            test_plan: Test plan identifier or description
-            time_available: How much time is available for testing
-            priorities: Current priority areas
-            
-        Returns:
-            Recommended execution approach
-        """
-        agent = await self._get_agent()
-        thread = agent.get_new_thread()
-        
+        """Build the get_execution_guidance prompt."""
         prompt = f"""Help me plan my test execution session:
 
 **Test Plan:** {test_plan}
@@ -278,34 +248,52 @@ Please provide:
 4. What to skip if time runs short
 5. Key areas that must be covered
 """
-        
-        result = []
-        async for chunk in agent.run_stream(prompt, thread=thread):
-            if chunk.text:
-                result.append(chunk.text)
-        
-        return "".join(result)
+        return prompt
     
-    async def generate_daily_report(
+    async def get_execution_guidance(
         self,
-        tests_executed: List[dict],
-        defects_found: List[str],
-        blockers: List[str]
+        test_plan: str,
+        time_available: str,
+        priorities: str
     ) -> str:
         """
-        Generate a daily test execution report.
+        Get guidance on test execution based on constraints.
         
         Args:
-            tests_executed: List of tests run today with results
-            defects_found: List of defects found
-            blockers: List of blocking issues
+            test_plan: Test plan identifier or description
+            time_available: How much time is available for testing
+            priorities: Current priority areas
             
         Returns:
-            Formatted daily report
+            Recommended execution approach
         """
-        agent = await self._get_agent()
-        thread = agent.get_new_thread()
-        
+        return await self._run(self._get_execution_guidance_prompt(
+            test_plan=test_plan,
+            time_available=time_available,
+            priorities=priorities
+        ), task="get_execution_guidance")
+    
+    async def get_execution_guidance_stream(
+        self,
+        test_plan: str,
+        time_available: str,
+        priorities: str
+    ) -> AsyncIterator[str]:
+        """Stream the get_execution_guidance response chunk by chunk as it is generated."""
+        async for chunk in self._stream(self._get_execution_guidance_prompt(
+            test_plan=test_plan,
+            time_available=time_available,
+            priorities=priorities
+        ), task="get_execution_guidance"):
+            yield chunk
+    
+    def _generate_daily_report_prompt(
+        self,
+        tests_executed: List[dict],
+        defects_found: List[str],
+        blockers: List[str]
+    ) -> str:
+        """Build the generate_daily_report prompt."""
         prompt = f"""Generate a daily test execution report:
 
 **Tests Executed Today:**
@@ -325,36 +313,53 @@ Please create a comprehensive daily report including:
 5. Tomorrow's priorities
 6. Risks and recommendations
 """
-        
-        result = []
-        async for chunk in agent.run_stream(prompt, thread=thread):
-            if chunk.text:
-                result.append(chunk.text)
-        
-        return "".join(result)
+        return prompt
     
-    async def analyze_failure(
+    async def generate_daily_report(
         self,
-        test_case: str,
-        expected_result: str,
-        actual_result: str,
-        error_logs: str = ""
+        tests_executed: List[dict],
+        defects_found: List[str],
+        blockers: List[str]
     ) -> str:
         """
-        Analyze a test failure and suggest next steps.
+        Generate a daily test execution report.
         
         Args:
-            test_case: The test case that failed
-            expected_result: What was expected
-            actual_result: What actually happened
-            error_logs: Any error messages or logs
+            tests_executed: List of tests run today with results
+            defects_found: List of defects found
+            blockers: List of blocking issues
             
         Returns:
-            Analysis and recommended actions
+            Formatted daily report
         """
-        agent = await self._get_agent()
-        thread = agent.get_new_thread()
-        
+        return await self._run(self._generate_daily_report_prompt(
+            tests_executed=tests_executed,
+            defects_found=defects_found,
+            blockers=blockers
+        ), task="generate_daily_report")
+    
+    async def generate_daily_report_stream(
+        self,
+        tests_executed: List[dict],
+        defects_found: List[str],
+        blockers: List[str]
+    ) -> AsyncIterator[str]:
+        """Stream the generate_daily_report response chunk by chunk as it is generated."""
+        async for chunk in self._stream(self._generate_daily_report_prompt(
+            tests_executed=tests_executed,
+            defects_found=defects_found,
+            blockers=blockers
+        ), task="generate_daily_report"):
+            yield chunk
+    
+    def _analyze_failure_prompt(
+        self,
+        test_case: str,
+        expected_result: str,
+        actual_result: str,
+        error_logs: str = ""
+    ) -> str:
+        """Build the analyze_failure prompt."""
         prompt = f"""Analyze this test failure:
 
 **Test Case:** {test_case}
@@ -376,54 +381,213 @@ Please provide:
 5. Should this block the release?
 6. Suggested workaround if any
 """
+        return prompt
+    
+    async def _failure_logs(self, error_logs: str, log_file: Optional[str]) -> str:
+        """Error logs for the prompt, with oversized logs reduced to a budgeted excerpt."""
+        parts = []
+        if error_logs:
+            parts.append(excerpt_text(error_logs, self.LOG_CONFIG).text)
+        if log_file:
+            excerpt = await asyncio.to_thread(excerpt_log, log_file, self.LOG_CONFIG)
+            parts.append(excerpt.text)
+        return "\n\n".join(parts)
+    
+    async def analyze_failure(
+        self,
+        test_case: str,
+        expected_result: str,
+        actual_result: str,
+        error_logs: str = "",
+        log_file: Optional[str] = None
+    ) -> str:
+        """
+        Analyze a test failure and suggest next steps.
+        
+        Args:
+            test_case: The test case that failed
+            expected_result: What was expected
+            actual_result: What actually happened
+            error_logs: Any error messages or logs
+            log_file: Log file to attach; large logs are excerpted around their errors
+            
+        Returns:
+            Analysis and recommended actions
+        """
+        return await self._run(self._analyze_failure_prompt(
+            test_case=test_case,
+            expected_result=expected_result,
+            actual_result=actual_result,
+            error_logs=await self._failure_logs(error_logs, log_file)
+        ), task="analyze_failure")
+    
+    async def analyze_failure_stream(
+        self,
+        test_case: str,
+        expected_result: str,
+        actual_result: str,
+        error_logs: str = "",
+        log_file: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Stream the analyze_failure response chunk by chunk as it is generated."""
+        async for chunk in self._stream(self._analyze_failure_prompt(
+            test_case=test_case,
+            expected_result=expected_result,
+            actual_result=actual_result,
+            error_logs=await self._failure_logs(error_logs, log_file)
+        ), task="analyze_failure"):
+            yield chunk
+    
+    async def _session_turn(self, agent, memory: ConversationMemory, user_input: str, echo: bool = True) -> str:
+        """Send one chat turn with bounded history and record it in memory."""
+        prompt = memory.build_prompt(user_input)
+        memory.prompt_tokens.append(estimate_tokens(self.SYSTEM_INSTRUCTIONS + prompt))
         
-        result = []
-        async for chunk in agent.run_stream(prompt, thread=thread):
-            if chunk.text:
-                result.append(chunk.text)
+        response = []
+        async for text in self._run_stream(agent, prompt):
+            if echo:
+                print(text, end="", flush=True)
+            response.append(text)
         
-        return "".join(result)
+        reply = "".join(response)
+        memory.add_turn(user_input, reply)
+        return reply
+    
+    async def _fold_memory(self, memory: ConversationMemory):
+        """Fold the oldest turns into the rolling summary."""
+        turns = memory.oldest_turns()
+        summary = await self._run(memory.summary_prompt(memory.summary, turns), task="summarize_session")
+        memory.apply_fold(summary, len(turns))
     
-    async def interactive_session(self):
+    async def _analyze_attachment(self, path: str) -> str:
+        """Analyze an attached log file as a test failure."""
+        log_path = Path(path).expanduser()
+        return await self.analyze_failure(
+            test_case=f"Attached log: {log_path.name}",
+            expected_result="Test run completes without errors",
+            actual_result="See error logs",
+            log_file=str(log_path)
+        )
+    
+    async def interactive_session(self, max_turns: int = 6, show_tokens: bool = False):
         """
         Start an interactive test execution session.
+        
+        Each turn is sent on a fresh thread with only the last ``max_turns``
+        exchanges verbatim; older turns are folded into a rolling summary so
+        per-turn prompt size stays bounded over long sessions.
+        
+        Input is read without blocking the event loop. Ctrl-C cancels the
+        reply in progress and keeps the session open; ``/analyze <log>``
+        runs in the background and its result is printed when ready.
+        
+        Args:
+            max_turns: Recent turns replayed verbatim
+            show_tokens: Print the estimated prompt tokens of each turn
         """
         agent = await self._get_agent()
-        thread = agent.get_new_thread()
+        memory = ConversationMemory(max_turns=max_turns)
+        reader = AsyncLineReader()
+        loop = asyncio.get_running_loop()
+        background: Dict[asyncio.Task, str] = {}
+        fold_task: Optional[asyncio.Task] = None
+        current_turn: Optional[asyncio.Task] = None
+        
+        def on_interrupt():
+            if current_turn is not None and not current_turn.done():
+                current_turn.cancel()
+            else:
+                print("\n(Type 'quit' to exit)\nYou: ", end="", flush=True)
+        
+        def on_background_done(task: asyncio.Task):
+            label = background.pop(task)
+            if task.cancelled():
+                return
+            if task.exception() is not None:
+                print(f"\n❌ {label} failed: {task.exception()}\n")
+            else:
+                print(f"\n📎 {label} ready:\n{task.result()}\n")
+        
+        async def run_turn(text: str) -> bool:
+            """Run one turn as a cancellable task; False if it was interrupted."""
+            nonlocal current_turn
+            print("Assistant: ", end="", flush=True)
+            current_turn = asyncio.create_task(self._session_turn(agent, memory, text))
+            try:
+                await current_turn
+            except asyncio.CancelledError:
+                if not current_turn.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                print("\n⏹️  Reply cancelled\n")
+                return False
+            finally:
+                current_turn = None
+            print("\n")
+            return True
+        
+        try:
+            loop.add_signal_handler(signal.SIGINT, on_interrupt)
+            handles_interrupt = True
+        except (NotImplementedError, RuntimeError):
+            # No loop signal handlers (e.g. Windows): Ctrl-C ends the session
+            handles_interrupt = False
         
         print("\n🧪 Test Execution Assistant")
         print("=" * 50)
         print("I'll help you manage your testing session.")
+        print("Commands: /analyze <log file>, /tasks. Ctrl-C cancels a reply.")
         print("Type 'quit' to exit.\n")
         
-        # Initial greeting
-        greeting = []
-        async for chunk in agent.run_stream(
-            "Hello! I'm starting a new testing session. What test plan are we working on today?",
-            thread=thread
-        ):
-            if chunk.text:
-                greeting.append(chunk.text)
-        print(f"Assistant: {''.join(greeting)}\n")
-        
-        while True:
-            user_input = input("You: ").strip()
-            
-            if user_input.lower() == 'quit':
-                print("\n👋 Session ended. Good testing!")
-                break
-            
-            if not user_input:
-                continue
+        try:
+            # Initial greeting
+            await run_turn("Hello! I'm starting a new testing session. What test plan are we working on today?")
             
-            response = []
-            print("Assistant: ", end="", flush=True)
-            async for chunk in agent.run_stream(user_input, thread=thread):
-                if chunk.text:
-                    print(chunk.text, end="", flush=True)
-                    response.append(chunk.text)
-            print("\n")
-
+            while True:
+                user_input = await reader.readline("You: ")
+                if user_input is None:
+                    print()
+                    break
+                user_input = user_input.strip()
+                
+                if user_input.lower() == 'quit':
+                    break
+                
+                if not user_input:
+                    continue
+                
+                if user_input.startswith("/analyze"):
+                    path = user_input[len("/analyze"):].strip()
+                    if not path:
+                        print("Usage: /analyze <log file>\n")
+                        continue
+                    task = asyncio.create_task(self._analyze_attachment(path))
+                    background[task] = f"Analysis of {path}"
+                    task.add_done_callback(on_background_done)
+                    print(f"⏳ Analyzing {path} in the background...\n")
+                    continue
+                
+                if user_input == "/tasks":
+                    running = list(background.values())
+                    print("\n".join(f"⏳ {label}" for label in running) if running else "No background tasks")
+                    print()
+                    continue
+                
+                if not await run_turn(user_input):
+                    continue
+                if show_tokens:
+                    print(f"[prompt ≈ {memory.prompt_tokens[-1]:,} tokens]\n")
+                if memory.needs_folding and (fold_task is None or fold_task.done()):
+                    # Summarize off the critical path; the next prompt keeps
+                    # the unfolded turns until the new summary lands
+                    fold_task = asyncio.create_task(self._fold_memory(memory))
+        finally:
+            if handles_interrupt:
+                loop.remove_signal_handler(signal.SIGINT)
+            for task in [*background, fold_task]:
+                if task is not None and not task.done():
+                    task.cancel()
+        
+        print("\n👋 Session ended. Good testing!")
 
 async def main():
     """Demo the Test Execution Assistant."""
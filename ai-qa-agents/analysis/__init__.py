@@ -0,0 +1,42 @@
+"""
+Analysis package initialization
+Local (LLM-free) analysis engines over the bug-reports and test-cases corpora
+"""
+from .corpus import BugRecord, parse_bug_report, load_bug_reports, tokenize
+from .dedup import DedupResult, MinHasher, MinHashLSH, TestCaseDeduplicator, candidate_pairs, cluster_pairs
+from .logs import LogExcerpt, excerpt_log, excerpt_text
+from .search import BugIndex, BugMatch, get_bug_index
+from .stacktrace import CrashBucketIndex, CrashGroup, StackTrace, get_crash_index, parse_stack_trace
+from .vectors import HashingVectorizer, VectorIndex, VectorMatch, get_vector_index
+from .triage import TriageEngine, TriageResult, get_triage_engine
+
+__all__ = [
+    "BugRecord",
+    "parse_bug_report",
+    "load_bug_reports",
+    "tokenize",
+    "DedupResult",
+    "MinHasher",
+    "MinHashLSH",
+    "TestCaseDeduplicator",
+    "candidate_pairs",
+    "cluster_pairs",
+    "LogExcerpt",
+    "excerpt_log",
+    "excerpt_text",
+    "BugIndex",
+    "BugMatch",
+    "get_bug_index",
+    "CrashBucketIndex",
+    "CrashGroup",
+    "StackTrace",
+    "get_crash_index",
+    "parse_stack_trace",
+    "HashingVectorizer",
+    "VectorIndex",
+    "VectorMatch",
+    "get_vector_index",
+    "TriageEngine",
+    "TriageResult",
+    "get_triage_engine",
+]
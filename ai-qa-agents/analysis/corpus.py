@@ -0,0 +1,198 @@
+"""
+QA Corpus
+Parsing and tokenization of markdown bug reports and test cases for local analysis
+"""
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:['_-][a-z0-9]+)*")
+_TABLE_FIELD_RE = re.compile(r"^\|\s*\*\*(?P<name>[^*|]+)\*\*\s*\|\s*(?P<value>[^|]*?)\s*\|", re.M)
+_INLINE_FIELD_RE = re.compile(r"\*\*(?P<name>[A-Za-z][A-Za-z ]*):\*\*\s*(?P<value>[^|*\n]+)")
+_BUG_ID_RE = re.compile(r"\bBUG-[A-Za-z0-9-]*\d\b")
+_TC_HEADING_RE = re.compile(r"^#{1,4}\s*(?:\*\*)?(?P<id>TC-[\w-]+)", re.M)
+_SECTION_HEADING_RE = re.compile(r"^##\s+(?P<title>[^\n]+)$", re.M)
+_ERROR_LINE_RE = re.compile(
+    r"\b(?:\w*(?:Error|Exception)|error|fail(?:s|ed|ure)?|denied|unauthorized|forbidden|"
+    r"timeout|timed out|[45]\d\d)\b",
+    re.I
+)
+
+# Hidden directory inside a corpus directory holding its local indexes
+INDEX_DIRNAME = ".index"
+
+SEVERITIES = ["Critical", "High", "Medium", "Low"]
+
+
+@dataclass
+class BugRecord:
+    """Fields extracted from a markdown bug report"""
+    bug_id: str
+    title: str
+    text: str
+    severity: Optional[str] = None
+    priority: Optional[str] = None
+    type: Optional[str] = None
+    component: Optional[str] = None
+    status: Optional[str] = None
+    path: Optional[str] = None
+    fields: Dict[str, str] = field(default_factory=dict)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens used by every local analysis engine."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def normalize_severity(value: Optional[str]) -> Optional[str]:
+    """Map free text such as "critical (P1)" onto one of SEVERITIES."""
+    if not value:
+        return None
+    for severity in SEVERITIES:
+        if severity.lower() in value.lower():
+            return severity
+    return None
+
+
+def parse_bug_report(text: str, path: Optional[str] = None) -> BugRecord:
+    """
+    Extract the structured fields of a markdown bug report.
+
+    Understands both the summary-table layout (``| **Severity** | High |``)
+    and inline fields (``**Severity:** High``).
+
+    Args:
+        text: Markdown content
+        path: Source file, used as a fallback bug ID
+
+    Returns:
+        Parsed bug record
+    """
+    fields: Dict[str, str] = {}
+    for regex in (_TABLE_FIELD_RE, _INLINE_FIELD_RE):
+        for match in regex.finditer(text):
+            name = match.group("name").strip().lower()
+            value = match.group("value").strip()
+            if value and name not in fields:
+                fields[name] = value
+
+    heading = next(
+        (line.lstrip("#").strip() for line in text.splitlines() if line.startswith("# ")),
+        ""
+    )
+    id_match = _BUG_ID_RE.search(fields.get("bug id", "") or heading)
+    if id_match:
+        bug_id = id_match.group(0)
+    elif path:
+        bug_id = Path(path).stem
+    else:
+        bug_id = heading[:40] or "UNKNOWN"
+
+    title = fields.get("title") or re.sub(r"^BUG-[\w-]*\d:\s*", "", heading)
+
+    return BugRecord(
+        bug_id=bug_id,
+        title=title,
+        text=text,
+        severity=normalize_severity(fields.get("severity")),
+        priority=fields.get("priority"),
+        type=fields.get("type"),
+        component=fields.get("component"),
+        status=fields.get("status"),
+        path=path,
+        fields=fields,
+    )
+
+
+def extract_section(text: str, name: str) -> str:
+    """
+    Body of the first ``## ...`` section whose heading contains ``name``.
+
+    Headings are matched case-insensitively, ignoring emoji and other
+    decoration (``## 🔍 Steps to Reproduce`` matches "steps to reproduce").
+    """
+    headings = list(_SECTION_HEADING_RE.finditer(text))
+    for heading, following in zip(headings, headings[1:] + [None]):
+        if name.lower() in heading.group("title").lower():
+            end = following.start() if following else len(text)
+            return text[heading.end():end].strip()
+    return ""
+
+
+def extract_error_lines(text: str, limit: int = 20) -> List[str]:
+    """
+    Error messages, status codes and exception lines in a bug report.
+
+    Looks in the Actual Result and Evidence sections when present, else in
+    the whole text.
+    """
+    scope = "\n".join(
+        section for section in (extract_section(text, "actual result"), extract_section(text, "evidence"))
+        if section
+    ) or text
+    lines = []
+    for line in scope.splitlines():
+        line = line.strip().strip("`*- ").strip()
+        if line and _ERROR_LINE_RE.search(line) and line not in lines:
+            lines.append(line[:200])
+            if len(lines) >= limit:
+                break
+    return lines
+
+
+def resolve_repo_path(path: str) -> Path:
+    """
+    Resolve a QAConfig path such as ``bug-reports``.
+
+    Paths are tried relative to the working directory first, then relative
+    to the repository root, so commands work from either location.
+    """
+    candidate = Path(path)
+    if candidate.is_absolute() or candidate.exists():
+        return candidate
+    return Path(__file__).resolve().parents[2] / path
+
+
+def iter_bug_files(directory: str) -> List[Path]:
+    """List markdown bug reports in a directory (README and templates excluded)."""
+    return sorted(
+        path for path in Path(directory).glob("*.md")
+        if path.name.lower() != "readme.md" and "template" not in path.name.lower()
+    )
+
+
+def load_bug_reports(directory: str) -> List[BugRecord]:
+    """Parse every bug report in a directory."""
+    return [
+        parse_bug_report(path.read_text(encoding="utf-8"), str(path))
+        for path in iter_bug_files(directory)
+    ]
+
+
+def index_path(directory: str, name: str) -> Path:
+    """Location of a local index file kept alongside a corpus directory."""
+    return Path(directory) / INDEX_DIRNAME / name
+
+
+def iter_test_case_files(directory: str) -> List[Path]:
+    """List markdown test case files under a directory (README files excluded)."""
+    return sorted(
+        path for path in Path(directory).rglob("*.md")
+        if path.name.lower() != "readme.md" and INDEX_DIRNAME not in path.parts
+    )
+
+
+def split_test_cases(text: str) -> List[Tuple[str, str]]:
+    """
+    Split markdown into its ``# TC-...`` test cases.
+
+    Returns:
+        (test case id, markdown block) pairs; text without TC headings is
+        returned as a single block with an empty id
+    """
+    matches = list(_TC_HEADING_RE.finditer(text))
+    if not matches:
+        return [("", text)] if text.strip() else []
+    ends = [m.start() for m in matches[1:]] + [len(text)]
+    return [(m.group("id"), text[m.start():end]) for m, end in zip(matches, ends)]
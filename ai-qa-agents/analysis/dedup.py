@@ -0,0 +1,414 @@
+"""
+Near-Duplicate Detection
+MinHash signatures with LSH banding for sub-linear near-duplicate lookup
+"""
+import json
+import os
+import random
+import re
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from config import QAConfig
+
+from .corpus import index_path, iter_test_case_files, resolve_repo_path, split_test_cases, tokenize
+
+try:
+    import numpy as np
+except ImportError:  # Pure-Python signatures are identical, just slower
+    np = None
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MASK_64 = (1 << 64) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Template vocabulary shared by every test case; ignored so boilerplate
+# does not make unrelated cases look alike
+TEMPLATE_WORDS = {
+    "priority", "type", "component", "preconditions", "precondition", "test", "steps", "step",
+    "action", "data", "expected", "result", "results", "notes", "high", "medium", "low", "critical",
+    "positive", "negative", "functional",
+}
+_TC_ID_RE = re.compile(r"^tc-[\w-]+$")
+
+INDEX_FILENAME = "minhash.json"
+INDEX_VERSION = 1
+
+
+def shingles(text: str, k: int = 3) -> Set[int]:
+    """
+    Hashed word k-shingles of a test case, ignoring template boilerplate.
+
+    Args:
+        text: Test case markdown or plain text
+        k: Words per shingle
+
+    Returns:
+        32-bit shingle hashes
+    """
+    tokens = [
+        t for t in tokenize(text)
+        if t not in TEMPLATE_WORDS and not _TC_ID_RE.match(t)
+    ]
+    if len(tokens) < k:
+        return {zlib.crc32(" ".join(tokens).encode())} if tokens else set()
+    return {
+        zlib.crc32(" ".join(tokens[i:i + k]).encode())
+        for i in range(len(tokens) - k + 1)
+    }
+
+
+class MinHasher:
+    """
+    MinHash signatures over shingle sets.
+
+    Uses ``num_perm`` universal hash functions ``(a*x + b) mod p``; the
+    fraction of equal signature slots estimates Jaccard similarity.
+    """
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        self.num_perm = num_perm
+        self.seed = seed
+        rng = random.Random(seed)
+        self._a = [rng.randrange(1, _MERSENNE_PRIME) for _ in range(num_perm)]
+        self._b = [rng.randrange(0, _MERSENNE_PRIME) for _ in range(num_perm)]
+        if np is not None:
+            self._a_np = np.array(self._a, dtype=np.uint64)[:, None]
+            self._b_np = np.array(self._b, dtype=np.uint64)[:, None]
+
+    def signature(self, shingle_set: Iterable[int]) -> Tuple[int, ...]:
+        """MinHash signature of a shingle set (all slots max for an empty set)."""
+        values = list(shingle_set)
+        if not values:
+            return (_MAX_HASH,) * self.num_perm
+        if np is not None:
+            x = np.array(values, dtype=np.uint64)[None, :]
+            with np.errstate(over="ignore"):
+                hashed = (self._a_np * x + self._b_np) % np.uint64(_MERSENNE_PRIME)
+            return tuple(int(v) for v in (hashed & np.uint64(_MAX_HASH)).min(axis=1))
+        return tuple(
+            min((((a * x + b) & _MASK_64) % _MERSENNE_PRIME) & _MAX_HASH for x in values)
+            for a, b in zip(self._a, self._b)
+        )
+
+
+def estimate_jaccard(a: Sequence[int], b: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    if not a:
+        return 0.0
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+class MinHashLSH:
+    """
+    Locality-sensitive hashing index over MinHash signatures.
+
+    Signatures are cut into ``bands`` bands; keys sharing any band bucket
+    become candidates, which are then verified against ``threshold``. A
+    lookup touches only matching buckets, not the whole corpus.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 16, threshold: float = 0.8):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.signatures: Dict[str, Tuple[int, ...]] = {}
+        self._buckets: List[Dict[Tuple[int, ...], Set[str]]] = [defaultdict(set) for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.signatures
+
+    def _bands(self, signature: Sequence[int]):
+        for band in range(self.bands):
+            yield band, tuple(signature[band * self.rows:(band + 1) * self.rows])
+
+    def add(self, key: str, signature: Sequence[int]):
+        """Index a signature under ``key`` (replacing any previous one)."""
+        if key in self.signatures:
+            self.remove(key)
+        signature = tuple(signature)
+        self.signatures[key] = signature
+        for band, bucket in self._bands(signature):
+            self._buckets[band][bucket].add(key)
+
+    def remove(self, key: str):
+        """Drop ``key`` from the index."""
+        signature = self.signatures.pop(key, None)
+        if signature is None:
+            return
+        for band, bucket in self._bands(signature):
+            keys = self._buckets[band].get(bucket)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._buckets[band][bucket]
+
+    def query(self, signature: Sequence[int], threshold: Optional[float] = None) -> List[Tuple[str, float]]:
+        """
+        Find indexed near-duplicates of a signature.
+
+        Returns:
+            (key, estimated similarity) pairs at or above the threshold,
+            most similar first
+        """
+        threshold = self.threshold if threshold is None else threshold
+        candidates: Set[str] = set()
+        for band, bucket in self._bands(signature):
+            candidates.update(self._buckets[band].get(bucket, ()))
+        matches = [(key, estimate_jaccard(signature, self.signatures[key])) for key in candidates]
+        return sorted(
+            (match for match in matches if match[1] >= threshold),
+            key=lambda match: (-match[1], match[0])
+        )
+
+
+def candidate_pairs(
+    texts: Sequence[str],
+    threshold: float = 0.3,
+    num_perm: int = 128,
+    bands: int = 32,
+    k: int = 2,
+    seed: int = 1
+) -> List[Tuple[int, int, float]]:
+    """
+    Likely near-duplicate pairs among documents, without comparing every pair.
+
+    Each document is checked only against the earlier documents that share
+    an LSH bucket with it. The defaults (32 bands of 4 rows, word bigrams)
+    are looser than test case de-duplication, so reworded duplicates still
+    become candidates for a closer look.
+
+    Args:
+        texts: Documents to pair up
+        threshold: Minimum estimated Jaccard similarity of a candidate pair
+        num_perm: MinHash signature length
+        bands: LSH bands (more bands find less similar pairs)
+        k: Words per shingle
+        seed: Hash seed
+
+    Returns:
+        (earlier index, later index, estimated similarity), most similar first
+    """
+    hasher = MinHasher(num_perm, seed)
+    index = MinHashLSH(num_perm, bands, threshold)
+    pairs = []
+    for i, text in enumerate(texts):
+        shingle_set = shingles(text, k)
+        if not shingle_set:
+            continue
+        signature = hasher.signature(shingle_set)
+        pairs.extend((int(key), i, similarity) for key, similarity in index.query(signature))
+        index.add(str(i), signature)
+    return sorted(pairs, key=lambda pair: (-pair[2], pair[0], pair[1]))
+
+
+def cluster_pairs(pairs: Iterable[Tuple[int, int]]) -> List[List[int]]:
+    """
+    Group linked items into clusters (connected components).
+
+    Returns:
+        Sorted member lists of every cluster with two or more members,
+        ordered by their first member
+    """
+    parent: Dict[int, int] = {}
+
+    def find(item: int) -> int:
+        parent.setdefault(item, item)
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    for a, b in pairs:
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    clusters: Dict[int, List[int]] = defaultdict(list)
+    for item in parent:
+        clusters[find(item)].append(item)
+    return sorted((sorted(members) for members in clusters.values() if len(members) > 1), key=lambda c: c[0])
+
+
+@dataclass
+class DedupResult:
+    """Outcome of checking one test case"""
+    key: str
+    duplicate_of: Optional[str] = None
+    similarity: float = 0.0
+
+    @property
+    def is_duplicate(self) -> bool:
+        return self.duplicate_of is not None
+
+
+class TestCaseDeduplicator:
+    """
+    Near-duplicate filter for generated test cases.
+
+    Holds an LSH index of the existing test case corpus, persisted as
+    ``<test-cases>/.index/minhash.json`` and refreshed incrementally by file
+    modification time, plus every case accepted from the current batch.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        bands: int = 16,
+        seed: int = 1,
+        directory: Optional[str] = None
+    ):
+        self.hasher = MinHasher(num_perm, seed)
+        self.index = MinHashLSH(num_perm, bands, threshold)
+        self.directory = directory
+        self._files: Dict[str, Dict[str, object]] = {}  # Relative path -> mtime, size, keys
+
+    @classmethod
+    def from_corpus(cls, directory: Optional[str] = None, threshold: float = 0.8) -> "TestCaseDeduplicator":
+        """Load the persisted index of a test case directory and bring it up to date."""
+        path = resolve_repo_path(directory or QAConfig.test_cases_dir)
+        dedup = cls(threshold=threshold, directory=str(path))
+        dedup.load()
+        if dedup.refresh():
+            dedup.save()
+        return dedup
+
+    # ---- Persistence ----
+
+    @property
+    def index_file(self) -> Optional[Path]:
+        return index_path(self.directory, INDEX_FILENAME) if self.directory else None
+
+    def load(self):
+        """Read the persisted index; ignored if missing or built with other parameters."""
+        if self.index_file is None or not self.index_file.exists():
+            return
+        try:
+            data = json.loads(self.index_file.read_text(encoding="utf-8"))
+        except ValueError:
+            return
+        expected = (INDEX_VERSION, self.hasher.num_perm, self.index.bands, self.hasher.seed)
+        if (data.get("version"), data.get("num_perm"), data.get("bands"), data.get("seed")) != expected:
+            return
+        self._files = data.get("files", {})
+        for key, signature in data.get("signatures", {}).items():
+            self.index.add(key, signature)
+
+    def save(self):
+        """Write the corpus part of the index (batch entries are not persisted)."""
+        if self.index_file is None:
+            return
+        corpus_keys = {key for info in self._files.values() for key in info["keys"]}
+        data = {
+            "version": INDEX_VERSION,
+            "num_perm": self.hasher.num_perm,
+            "bands": self.index.bands,
+            "seed": self.hasher.seed,
+            "files": self._files,
+            "signatures": {k: list(v) for k, v in self.index.signatures.items() if k in corpus_keys},
+        }
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.index_file)
+
+    def refresh(self) -> bool:
+        """
+        Re-index corpus files added, changed or deleted since the last run.
+
+        Returns:
+            Whether the index changed
+        """
+        if self.directory is None or not Path(self.directory).is_dir():
+            return False
+        root = Path(self.directory)
+        seen = set()
+        changed = False
+        for path in iter_test_case_files(self.directory):
+            relative = path.relative_to(root).as_posix()
+            seen.add(relative)
+            stat = path.stat()
+            info = self._files.get(relative)
+            if info and info["mtime"] == stat.st_mtime and info["size"] == stat.st_size:
+                continue
+            for key in info["keys"] if info else []:
+                self.index.remove(key)
+            keys = []
+            for case_id, block in split_test_cases(path.read_text(encoding="utf-8")):
+                key = f"{relative}#{case_id}" if case_id else relative
+                self.index.add(key, self.signature(block))
+                keys.append(key)
+            self._files[relative] = {"mtime": stat.st_mtime, "size": stat.st_size, "keys": keys}
+            changed = True
+
+        for relative in set(self._files) - seen:
+            for key in self._files.pop(relative)["keys"]:
+                self.index.remove(key)
+            changed = True
+        return changed
+
+    # ---- Checking ----
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        """MinHash signature of a test case."""
+        return self.hasher.signature(shingles(text))
+
+    def check(self, text: str, key: str = "", add: bool = True) -> DedupResult:
+        """
+        Check one test case against the corpus and the batch so far.
+
+        Args:
+            text: Test case markdown
+            key: Identifier recorded in the index
+            add: Index the case when it is not a duplicate
+
+        Returns:
+            The closest near-duplicate, if any
+        """
+        signature = self.signature(text)
+        matches = [m for m in self.index.query(signature) if m[0] != key]
+        if matches:
+            return DedupResult(key, matches[0][0], matches[0][1])
+        if add and key:
+            self.index.add(key, signature)
+        return DedupResult(key)
+
+    def filter_markdown(self, content: str, source: str = "", flag: bool = False) -> Tuple[str, List[DedupResult]]:
+        """
+        Remove (or flag) near-duplicate test cases in generated markdown.
+
+        Args:
+            content: Markdown holding one or more ``# TC-...`` test cases
+            source: Prefix for the keys of accepted cases (e.g. a file name)
+            flag: Keep duplicates with a warning instead of dropping them
+
+        Returns:
+            The filtered markdown and the duplicates found
+        """
+        cases = split_test_cases(content)
+        # Keep any introduction before the first test case
+        kept = [content[:content.find(cases[0][1])]] if cases and cases[0][0] else []
+        duplicates = []
+        for case_id, block in cases:
+            result = self.check(block, f"{source}#{case_id or len(kept)}")
+            if not result.is_duplicate:
+                kept.append(block)
+                continue
+            duplicates.append(result)
+            if flag:
+                heading, _, rest = block.partition("\n")
+                kept.append(
+                    f"{heading}\n\n> ⚠️ Possible duplicate of {result.duplicate_of} "
+                    f"(similarity {result.similarity:.0%})\n{rest}"
+                )
+        return "".join(kept), duplicates
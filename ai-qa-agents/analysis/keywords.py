@@ -0,0 +1,174 @@
+"""
+Keyword Tables
+Shared keyword criteria used by agent tools, evaluators and local analysis engines
+"""
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, FrozenSet, Iterable, List, Sequence
+
+try:
+    import ahocorasick
+except ImportError:  # Falls back to one substring check per distinct keyword
+    ahocorasick = None
+
+try:
+    import numpy as np
+except ImportError:  # Only needed by KeywordScanner.keyword_matrix
+    np = None
+
+# Bug severity criteria, checked from most to least severe
+SEVERITY_CRITERIA = {
+    "Critical": [
+        "data loss", "security breach", "system crash", "production down",
+        "payment failure", "authentication bypass", "data corruption"
+    ],
+    "High": [
+        "feature broken", "major functionality", "blocks workflow",
+        "affects many users", "no workaround", "performance degradation"
+    ],
+    "Medium": [
+        "partial functionality", "workaround available", "affects some users",
+        "minor data issue", "ui glitch with impact"
+    ],
+    "Low": [
+        "cosmetic", "typo", "minor ui", "edge case", "rare occurrence",
+        "enhancement", "documentation"
+    ]
+}
+
+# Test case / defect categories, checked in order
+TEST_CATEGORIES = {
+    "security": ["sql injection", "xss", "authentication", "authorization", "password", "token"],
+    "performance": ["load", "response time", "timeout", "concurrent", "stress"],
+    "functional": ["login", "submit", "create", "update", "delete", "search"],
+    "usability": ["accessibility", "navigation", "responsive", "error message"],
+    "integration": ["api", "database", "third-party", "webhook"]
+}
+
+# Test case quality criteria (evaluation.TestCaseQualityEvaluator)
+TEST_CASE_SECTIONS = ["title", "priority", "preconditions", "steps", "expected", "test_data"]
+ACTION_VERBS = ["click", "enter", "verify", "navigate", "select", "check", "wait", "scroll"]
+EMAIL_INDICATORS = ["@", ".com"]  # All must be present; matched case-sensitively, outside SCANNER
+COVERAGE_INDICATORS = {
+    "positive": ["valid", "correct", "success", "happy path"],
+    "negative": ["invalid", "error", "fail", "incorrect", "wrong"],
+    "edge": ["boundary", "edge", "limit", "maximum", "minimum", "empty"],
+    "security": ["injection", "xss", "security", "authentication"],
+}
+
+# Bug report quality criteria (evaluation.BugReportQualityEvaluator)
+BUG_REPORT_FIELDS = ["title", "steps", "expected", "actual", "environment", "severity"]
+BUG_REPORT_ACTIONS = ["click", "enter", "navigate", "select", "submit"]
+URL_INDICATORS = ["http", "url"]
+TEST_DATA_INDICATORS = ["@", "password"]
+EVIDENCE_INDICATORS = {
+    "screenshot": ["screenshot", "image", ".png", ".jpg", "attached"],
+    "logs": ["console", "error:", "stack trace", "log", "```"],
+    "network": ["network", "request"],
+}
+
+# Every table above as one set of named keyword groups, matched together by SCANNER
+KEYWORD_GROUPS = {
+    **{f"severity.{name}": keywords for name, keywords in SEVERITY_CRITERIA.items()},
+    **{f"category.{name}": keywords for name, keywords in TEST_CATEGORIES.items()},
+    "test_case.sections": TEST_CASE_SECTIONS,
+    "test_case.actions": ACTION_VERBS,
+    **{f"coverage.{name}": keywords for name, keywords in COVERAGE_INDICATORS.items()},
+    "bug_report.fields": BUG_REPORT_FIELDS,
+    "bug_report.actions": BUG_REPORT_ACTIONS,
+    "bug_report.url": URL_INDICATORS,
+    "bug_report.test_data": TEST_DATA_INDICATORS,
+    **{f"evidence.{name}": keywords for name, keywords in EVIDENCE_INDICATORS.items()},
+}
+
+
+class KeywordHits:
+    """Keywords found in a document, read per group; groups without a match read as empty"""
+
+    __slots__ = ("keywords", "_groups")
+
+    def __init__(self, keywords: FrozenSet[str], groups: Dict[str, FrozenSet[str]]):
+        self.keywords = keywords
+        self._groups = groups
+
+    def __getitem__(self, group: str) -> FrozenSet[str]:
+        return self.keywords & self._groups.get(group, frozenset())
+
+
+class KeywordScanner:
+    """
+    Case-insensitive multi-pattern matcher over named keyword groups.
+
+    With pyahocorasick installed, all keywords are compiled into one
+    Aho-Corasick automaton and a document is matched in a single pass.
+    Otherwise the document is lowercased once and each distinct keyword is
+    checked once, however many groups share it.
+    """
+
+    def __init__(self, groups: Dict[str, Iterable[str]]):
+        self._groups = {group: frozenset(keyword.lower() for keyword in keywords) for group, keywords in groups.items()}
+        self.keywords: List[str] = sorted(frozenset().union(*self._groups.values()))
+        self._columns = {keyword: column for column, keyword in enumerate(self.keywords)}
+        self._automaton = None
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+
+    def columns(self, group: str) -> List[int]:
+        """Positions of a group's keywords in ``keywords`` (the keyword_matrix columns)."""
+        return sorted(self._columns[keyword] for keyword in self._groups.get(group, ()))
+
+    def scan(self, text: str) -> KeywordHits:
+        """Match every keyword group against a document."""
+        lowered = text.lower()
+        if self._automaton is not None:
+            found = frozenset(map(itemgetter(1), self._automaton.iter(lowered)))
+        else:
+            found = frozenset(keyword for keyword in self.keywords if keyword in lowered)
+        return KeywordHits(found, self._groups)
+
+    def keyword_matrix(self, texts: Sequence[str]) -> "np.ndarray":
+        """
+        Which keywords occur in each of many documents.
+
+        With the automaton, the documents are joined and matched in one
+        pass, and matches are mapped back to documents by offset.
+
+        Returns:
+            Boolean matrix of documents x ``keywords``
+        """
+        if np is None:
+            raise ImportError("Keyword matrices need numpy: pip install numpy")
+        lowered = [text.lower() for text in texts]
+        matrix = np.zeros((len(lowered), len(self.keywords)), dtype=bool)
+        if self._automaton is None:
+            for column, keyword in enumerate(self.keywords):
+                matrix[:, column] = [keyword in text for text in lowered]
+            return matrix
+
+        # No keyword contains NUL, so no match can span two documents
+        matches = list(self._automaton.iter("\0".join(lowered)))
+        if matches:
+            ends = np.fromiter(map(itemgetter(0), matches), dtype=np.int64, count=len(matches))
+            columns = np.fromiter(
+                map(self._columns.__getitem__, map(itemgetter(1), matches)), dtype=np.int64, count=len(matches)
+            )
+            starts = np.cumsum([0] + [len(text) + 1 for text in lowered[:-1]])
+            matrix[np.searchsorted(starts, ends, side="right") - 1, columns] = True
+        return matrix
+
+
+SCANNER = KeywordScanner(KEYWORD_GROUPS)
+
+
+@lru_cache(maxsize=64)
+def scan_keywords(text: str) -> KeywordHits:
+    """
+    Match all shared keyword groups against a document.
+
+    Results are cached for recently seen documents, so evaluators and tools
+    looking at the same text share one scan.
+    """
+    return SCANNER.scan(text)
@@ -0,0 +1,276 @@
+"""
+Log Excerpts
+Streaming extraction of error regions from large logs within a fixed byte budget
+"""
+import mmap
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from config import LogConfig
+
+# Substrings that make a line a candidate; each candidate is confirmed with _ERROR_RE
+_ERROR_NEEDLES = (
+    b"error", b"exception", b"fatal", b"panic", b"traceback", b"critical",
+    b"severe", b"unhandled", b"fail", b"timed out",
+)
+_ERROR_RE = re.compile(
+    rb"(?i)(?:\b|[a-z])(?:error|exception)s?\b"
+    rb"|\b(?:fatal|panic(?:ked)?|traceback|critical|severe|unhandled|fail(?:s|ed|ure)?|timed out)\b"
+)
+# Leading timestamps/levels and volatile values are ignored when grouping error lines
+_LINE_PREFIX_RE = re.compile(rb"^[\s\[]*(?:\d[\d\-/T:.,Z+ ]{7,}\]?\s*)?")
+_VOLATILE_RE = re.compile(rb"0x[0-9a-fA-F]+|\b[0-9a-fA-F]{8}-[0-9a-fA-F-]{27}\b|\d+")
+
+_SCAN_CHUNK = 16 * 1024 * 1024  # Bytes of the mapped log examined at a time
+_SCAN_OVERLAP = 16  # Bytes re-read between pieces of an over-long line, longer than any error match
+
+Buffer = Union[bytes, mmap.mmap]
+
+
+@dataclass
+class _ErrorPattern:
+    """Occurrences of one normalized error line"""
+    count: int
+    first: int  # Byte offset of the first occurrence's line
+    first_line: int
+    last: int
+    last_line: int
+
+
+@dataclass
+class LogExcerpt:
+    """What of a log is sent to a model"""
+    source: str
+    size: int  # Bytes in the full log
+    error_lines: int
+    patterns: int  # Distinct error patterns
+    text: str
+    truncated: bool  # Whether anything was left out
+
+    def __str__(self) -> str:
+        return self.text
+
+
+def _line_end(buf: Buffer, offset: int) -> int:
+    end = buf.find(b"\n", offset)
+    return len(buf) if end == -1 else end
+
+
+def _window(buf: Buffer, offset: int, before: int, after: int, max_line_bytes: int) -> bytes:
+    """The line at ``offset`` with up to ``before``/``after`` surrounding lines, each truncated."""
+    start = offset
+    for _ in range(before):
+        if start == 0:
+            break
+        start = buf.rfind(b"\n", 0, start - 1) + 1
+    last = _line_end(buf, offset)
+    for _ in range(after):
+        if last >= len(buf):
+            break
+        last = _line_end(buf, last + 1)
+    lines = []
+    while True:
+        end = _line_end(buf, start)
+        # Slice only the kept prefix, so an over-long line is never copied whole
+        lines.append(buf[start:min(end, start + max_line_bytes)])
+        if end >= last:
+            return b"\n".join(lines)
+        start = end + 1
+
+
+def _candidate_lines(chunk: bytes) -> List[int]:
+    """Start offsets of the lines in a lowercased chunk that contain an error needle."""
+    starts = set()
+    for needle in _ERROR_NEEDLES:
+        position = chunk.find(needle)
+        while position != -1:
+            start = chunk.rfind(b"\n", 0, position) + 1
+            starts.add(start)
+            end = chunk.find(b"\n", position)
+            if end == -1:
+                break
+            position = chunk.find(needle, end)
+    return sorted(starts)
+
+
+def _long_line_is_error(buf: Buffer, start: int) -> Tuple[int, bool]:
+    """
+    End of a line longer than a scan chunk, and whether it is an error line.
+
+    The line is read one chunk at a time, each piece overlapping the
+    previous one by _SCAN_OVERLAP bytes so matches across a boundary are
+    still found.
+    """
+    size = len(buf)
+    position = start
+    while True:
+        end = min(position + _SCAN_CHUNK, size)
+        piece = buf[position:end].lower()
+        newline = piece.find(b"\n")
+        stop = len(piece) if newline == -1 else newline
+        final = newline != -1 or end == size
+        # The first byte of a continuation piece is only there as \b context
+        low = 1 if position > start else 0
+        for needle in _ERROR_NEEDLES:
+            found = piece.find(needle, low, stop)
+            while found != -1:
+                # Matches start at the needle or one letter before it
+                for begin in (found - 1, found):
+                    match = _ERROR_RE.match(piece, begin, stop) if begin >= low else None
+                    # A match touching the piece end may continue past it; the next piece rechecks it
+                    if match and (final or match.end() < len(piece)):
+                        return _line_end(buf, position + stop), True
+                found = piece.find(needle, found + 1, stop)
+        if final:
+            return position + stop, False
+        position = end - _SCAN_OVERLAP
+
+
+def _scan(buf: Buffer, config: LogConfig):
+    """
+    One pass over the buffer, grouping error lines by normalized pattern.
+
+    The buffer is examined in line-aligned chunks of at most _SCAN_CHUNK
+    bytes; a partial last line is carried over to the next chunk, and a
+    line longer than a chunk is examined piece by piece. Only one chunk is
+    copied at a time however large the log or its lines are.
+    """
+    patterns: Dict[bytes, _ErrorPattern] = {}
+    error_lines = 0
+    line_number = 1  # Of the first line of the current chunk
+
+    def record(start: int, stop: int, number: int):
+        line = buf[start:min(stop, start + config.max_line_bytes)]
+        key = _VOLATILE_RE.sub(b"#", _LINE_PREFIX_RE.sub(b"", line))[:200]
+        pattern = patterns.get(key)
+        if pattern is not None:
+            pattern.count += 1
+            pattern.last, pattern.last_line = start, number
+        elif len(patterns) < config.max_patterns:
+            patterns[key] = _ErrorPattern(1, start, number, start, number)
+
+    offset = 0
+    size = len(buf)
+    while offset < size:
+        end = min(offset + _SCAN_CHUNK, size)
+        if end < size:
+            newline = buf.rfind(b"\n", offset, end)
+            if newline == -1:
+                stop, is_error = _long_line_is_error(buf, offset)
+                if is_error:
+                    error_lines += 1
+                    record(offset, stop, line_number)
+                line_number += 1
+                offset = stop + 1
+                continue
+            end = newline + 1
+        lowered = buf[offset:end].lower()
+        counted_to, lines_before = 0, 0
+        for start in _candidate_lines(lowered):
+            stop = lowered.find(b"\n", start)
+            stop = len(lowered) if stop == -1 else stop
+            if not _ERROR_RE.search(lowered, start, stop):
+                continue
+            lines_before += lowered.count(b"\n", counted_to, start)
+            counted_to = start
+            error_lines += 1
+            record(offset + start, offset + stop, line_number + lines_before)
+        line_number += lowered.count(b"\n")
+        offset = end
+    return patterns, error_lines
+
+
+def _head(buf: Buffer, budget: int) -> bytes:
+    head = buf[:budget]
+    cut = head.rfind(b"\n")
+    return head[:cut + 1] if 0 < cut < len(head) - 1 else head
+
+
+def _tail(buf: Buffer, budget: int) -> bytes:
+    tail = buf[max(0, len(buf) - budget):]
+    cut = tail.find(b"\n")
+    return tail[cut + 1:] if len(tail) < len(buf) and cut != -1 else tail
+
+
+def _format_size(size: float) -> str:
+    if size < 1024:
+        return f"{size:.0f} B"
+    for unit in ("KB", "MB"):
+        size /= 1024
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+    return f"{size / 1024:.1f} GB"
+
+
+def _excerpt(buf: Buffer, source: str, config: LogConfig) -> LogExcerpt:
+    size = len(buf)
+    budget = config.budget_bytes
+    patterns, error_lines = _scan(buf, config)
+    if size <= budget:
+        return LogExcerpt(source, size, error_lines, len(patterns), buf[:].decode("utf-8", "replace"), False)
+
+    head = _head(buf, budget // 20)
+    tail = _tail(buf, budget // 5)
+    remaining = budget - len(head) - len(tail)
+    sections: List[bytes] = []
+    omitted = 0
+    for pattern in sorted(patterns.values(), key=lambda p: p.first):
+        occurrences = f"first of {pattern.count}" if pattern.count > 1 else "once"
+        block = (
+            f"--- line {pattern.first_line} ({occurrences}) ---\n".encode()
+            + _window(buf, pattern.first, config.context_lines, config.context_lines, config.max_line_bytes)
+        )
+        if pattern.count > 1:
+            block += (
+                f"\n--- line {pattern.last_line} (last) ---\n".encode()
+                + _window(buf, pattern.last, 0, 0, config.max_line_bytes)
+            )
+        if len(block) + 1 > remaining:
+            omitted += 1
+            continue
+        sections.append(block)
+        remaining -= len(block) + 1
+
+    summary = (
+        f"[{source}: {_format_size(size)}, {error_lines} error lines in {len(patterns)} patterns"
+        f"{f', {omitted} patterns omitted' if omitted else ''}; excerpt below]"
+    )
+    parts = [summary, "--- start of log ---", head.decode("utf-8", "replace").rstrip("\n")]
+    parts += [section.decode("utf-8", "replace") for section in sections]
+    parts += ["--- end of log ---", tail.decode("utf-8", "replace").rstrip("\n")]
+    return LogExcerpt(source, size, error_lines, len(patterns), "\n".join(parts), True)
+
+
+def excerpt_log(path: Union[str, Path], config: Optional[LogConfig] = None) -> LogExcerpt:
+    """
+    Excerpt a log file of any size.
+
+    The file is memory-mapped and scanned once, so memory use does not grow
+    with the log. The excerpt holds the start and end of the log and, for
+    each distinct error pattern, its first occurrence with surrounding
+    lines and its last occurrence, in log order, within
+    ``config.budget_bytes``.
+
+    Args:
+        path: Log file
+        config: Budget and context settings
+
+    Returns:
+        The excerpt and scan statistics
+    """
+    config = config or LogConfig()
+    path = Path(path).expanduser()
+    with open(path, "rb") as f:
+        if path.stat().st_size == 0:
+            return LogExcerpt(path.name, 0, 0, 0, "", False)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                buf.madvise(mmap.MADV_SEQUENTIAL)
+            return _excerpt(buf, path.name, config)
+
+
+def excerpt_text(text: str, config: Optional[LogConfig] = None, source: str = "log") -> LogExcerpt:
+    """Excerpt log text already in memory; text within the budget is returned unchanged."""
+    return _excerpt(text.encode("utf-8", "replace"), source, config or LogConfig())
@@ -0,0 +1,311 @@
+"""
+Bug Report Search
+Persistent BM25 inverted index over the bug-reports corpus for related-bug lookup
+"""
+import hashlib
+import heapq
+import json
+import math
+import os
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from config import QAConfig
+
+from .corpus import (
+    BugRecord,
+    extract_error_lines,
+    extract_section,
+    index_path,
+    iter_bug_files,
+    parse_bug_report,
+    resolve_repo_path,
+    tokenize,
+)
+
+INDEX_FILENAME = "bm25.json"
+INDEX_VERSION = 1
+
+# Per-field term weights (BM25F-style): a shared title or error message says
+# more about a duplicate than a shared reproduction step
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "component": 2.0,
+    "errors": 1.5,
+    "steps": 1.0,
+}
+
+
+def bug_fields(record: BugRecord) -> Dict[str, str]:
+    """The indexed fields of a bug report."""
+    return {
+        "title": record.title,
+        "component": record.component or "",
+        "errors": "\n".join(extract_error_lines(record.text)),
+        "steps": extract_section(record.text, "steps to reproduce"),
+    }
+
+
+def bug_summary_text(text: str) -> str:
+    """
+    The parts of a bug report that identify the defect, as one text.
+
+    Falls back to the full text for free-form reports without steps or
+    error sections.
+    """
+    fields = bug_fields(parse_bug_report(text))
+    if fields["steps"] or fields["errors"]:
+        return "\n".join(fields.values())
+    return text
+
+
+@dataclass
+class BugMatch:
+    """One search hit"""
+    bug_id: str
+    title: str
+    score: float
+    component: Optional[str] = None
+    status: Optional[str] = None
+    path: Optional[str] = None
+
+
+class BugIndex:
+    """
+    BM25 inverted index over markdown bug reports.
+
+    Each report is indexed once as field-weighted term frequencies; the
+    postings (term -> document -> weight) are rebuilt from them on load, so
+    a query only touches the postings of its own terms. The index is
+    persisted as ``<bug-reports>/.index/bm25.json`` and refreshed
+    incrementally by file modification time.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+        refresh_interval: float = 2.0
+    ):
+        self.directory = directory
+        self.k1 = k1
+        self.b = b
+        self.refresh_interval = refresh_interval
+        self._docs: Dict[str, Dict[str, object]] = {}  # Relative path -> metadata and term weights
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._total_length = 0.0
+        self._norms: Optional[Dict[str, float]] = None  # BM25 length normalization, rebuilt after changes
+        self._version: Optional[str] = None  # Corpus digest, rebuilt after changes
+        self._checked_at = 0.0
+
+    @classmethod
+    def from_corpus(cls, directory: Optional[str] = None) -> "BugIndex":
+        """Load the persisted index of a bug-reports directory and bring it up to date."""
+        path = resolve_repo_path(directory or QAConfig.bug_reports_dir)
+        index = cls(str(path))
+        index.load()
+        if index.refresh():
+            index.save()
+        return index
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    # ---- Documents ----
+
+    def add(self, key: str, record: BugRecord, mtime: float = 0.0, size: int = 0):
+        """Index a parsed bug report under ``key`` (replacing any previous version)."""
+        terms: Counter = Counter()
+        for name, text in bug_fields(record).items():
+            weight = FIELD_WEIGHTS[name]
+            for token in tokenize(text):
+                terms[token] += weight
+        self._insert(key, {
+            "bug_id": record.bug_id,
+            "title": record.title,
+            "component": record.component,
+            "status": record.status,
+            "mtime": mtime,
+            "size": size,
+            "length": sum(terms.values()),
+            "terms": dict(terms),
+        })
+
+    def _insert(self, key: str, doc: Dict[str, object]):
+        self.remove(key)
+        self._norms = None
+        self._version = None
+        self._docs[key] = doc
+        self._total_length += doc["length"]
+        for term, weight in doc["terms"].items():
+            self._postings[term][key] = weight
+
+    def remove(self, key: str):
+        """Drop a document from the index."""
+        doc = self._docs.pop(key, None)
+        if doc is None:
+            return
+        self._norms = None
+        self._version = None
+        self._total_length -= doc["length"]
+        for term in doc["terms"]:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[term]
+
+    @property
+    def version(self) -> str:
+        """
+        Digest of the indexed reports (paths, modification times and sizes).
+
+        It changes whenever a report is added, edited or deleted, so answers
+        that depend on the corpus can be keyed by it.
+        """
+        self._refresh_if_stale()
+        if self._version is None:
+            digest = hashlib.sha256()
+            for key in sorted(self._docs):
+                doc = self._docs[key]
+                digest.update(f"{key}\0{doc['mtime']}\0{doc['size']}\n".encode("utf-8"))
+            self._version = digest.hexdigest()[:16]
+        return self._version
+
+    # ---- Persistence ----
+
+    @property
+    def index_file(self) -> Optional[Path]:
+        return index_path(self.directory, INDEX_FILENAME) if self.directory else None
+
+    def load(self):
+        """Read the persisted index; ignored if missing or built with other field weights."""
+        if self.index_file is None or not self.index_file.exists():
+            return
+        try:
+            data = json.loads(self.index_file.read_text(encoding="utf-8"))
+        except ValueError:
+            return
+        if data.get("version") != INDEX_VERSION or data.get("fields") != FIELD_WEIGHTS:
+            return
+        for key, doc in data.get("docs", {}).items():
+            self._insert(key, doc)
+
+    def save(self):
+        """Write the index next to the corpus."""
+        if self.index_file is None:
+            return
+        data = {"version": INDEX_VERSION, "fields": FIELD_WEIGHTS, "docs": self._docs}
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.index_file)
+
+    def refresh(self) -> bool:
+        """
+        Re-index bug reports added, changed or deleted since the last run.
+
+        Returns:
+            Whether the index changed
+        """
+        self._checked_at = time.monotonic()
+        if self.directory is None or not Path(self.directory).is_dir():
+            return False
+        root = Path(self.directory)
+        seen = set()
+        changed = False
+        for path in iter_bug_files(self.directory):
+            key = path.relative_to(root).as_posix()
+            seen.add(key)
+            stat = path.stat()
+            doc = self._docs.get(key)
+            if doc and doc["mtime"] == stat.st_mtime and doc["size"] == stat.st_size:
+                continue
+            record = parse_bug_report(path.read_text(encoding="utf-8"), str(path))
+            self.add(key, record, stat.st_mtime, stat.st_size)
+            changed = True
+
+        for key in set(self._docs) - seen:
+            self.remove(key)
+            changed = True
+        return changed
+
+    def _refresh_if_stale(self):
+        if self.directory and time.monotonic() - self._checked_at >= self.refresh_interval:
+            if self.refresh():
+                self.save()
+
+    # ---- Search ----
+
+    def search(
+        self,
+        query: str,
+        component: str = "",
+        k: int = 5,
+        exclude: Iterable[str] = ()
+    ) -> List[BugMatch]:
+        """
+        Rank indexed bug reports against a query.
+
+        Args:
+            query: Title, steps or error messages of the bug to match
+            component: Component name, matched like the rest of the query
+            k: Maximum results
+            exclude: Bug IDs to leave out (e.g. the bug being analyzed)
+
+        Returns:
+            Up to ``k`` matches with BM25 scores, best first
+        """
+        self._refresh_if_stale()
+        if not self._docs:
+            return []
+
+        n = len(self._docs)
+        if self._norms is None:
+            average_length = self._total_length / n or 1.0
+            self._norms = {
+                key: self.k1 * (1 - self.b + self.b * doc["length"] / average_length)
+                for key, doc in self._docs.items()
+            }
+        norms = self._norms
+        scores: Dict[str, float] = defaultdict(float)
+        for term in set(tokenize(f"{query}\n{component}")):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            boost = idf * (self.k1 + 1)
+            for key, tf in postings.items():
+                scores[key] += boost * tf / (tf + norms[key])
+
+        excluded = set(exclude)
+        if excluded:
+            scores = {key: score for key, score in scores.items() if self._docs[key]["bug_id"] not in excluded}
+        ranked = heapq.nsmallest(k, scores, key=lambda key: (-scores[key], key))
+        return [
+            BugMatch(
+                bug_id=self._docs[key]["bug_id"],
+                title=self._docs[key]["title"],
+                score=scores[key],
+                component=self._docs[key]["component"],
+                status=self._docs[key]["status"],
+                path=key,
+            )
+            for key in ranked
+        ]
+
+
+_default_index: Optional[BugIndex] = None
+
+
+def get_bug_index() -> BugIndex:
+    """Get the process-wide index of the default bug-reports corpus."""
+    global _default_index
+
+    if _default_index is None:
+        _default_index = BugIndex.from_corpus()
+    return _default_index
@@ -0,0 +1,424 @@
+"""
+Stack Trace Fingerprinting
+Single-pass frame parsing, normalization and crash bucketing for JS/TS, Python, Java and .NET
+"""
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from config import QAConfig
+
+from .corpus import index_path, iter_bug_files, parse_bug_report, resolve_repo_path
+
+# One alternation per frame syntax plus exception lines, so a log is scanned once
+_TRACE_LINE_RE = re.compile(r"""
+^[ \t]*(?:
+    File[ ]"(?P<py_file>[^"\n]+)",[ ]line[ ](?P<py_line>\d+)(?:,[ ]in[ ](?P<py_func>\S+))?
+  | at[ ](?P<java_func>[\w$.<>/]+)
+    \((?P<java_file>[\w$.-]+\.(?:java|kt|scala|groovy|clj)|Native[ ]Method|Unknown[ ]Source)(?::(?P<java_line>\d+))?\)
+    (?:[ ]~?\[[^\]\n]*\])?
+  | at[ ](?P<net_func>[\w.`<>$\[\],|+]+\([^)\n]*\))(?:[ ]in[ ](?P<net_file>[^\n]+?):line[ ](?P<net_line>\d+))?
+  | at[ ](?:(?P<js_func>(?:async[ ]|new[ ])?[^\s()]+(?:[ ]\[as[ ][^\]\n]+\])?)[ ]\()?
+    (?P<js_file>[^\s()]+?):(?P<js_line>\d+)(?::\d+)?\)?
+  | (?P<ff_func>[^@\s]*)@(?P<ff_file>\S+?):(?P<ff_line>\d+):\d+
+  | (?:Uncaught[ ]|Unhandled[ ]exception\.[ ]|Exception[ ]in[ ]thread[ ]"[^"\n]*"[ ]|Caused[ ]by:[ ])?
+    (?P<exc_type>(?:[A-Za-z_$][\w$.]*)?(?:Error|Exception|Fault|Exit|Interrupt|Panic))
+    (?::[ ]?(?P<exc_msg>[^\n]*))?
+)[ \t]*\r?$
+""", re.M | re.X)
+
+_FRAME_GROUPS = {
+    "python": ("py_func", "py_file", "py_line"),
+    "java": ("java_func", "java_file", "java_line"),
+    "dotnet": ("net_func", "net_file", "net_line"),
+    "javascript": ("js_func", "js_file", "js_line"),
+    "javascript-ff": ("ff_func", "ff_file", "ff_line"),
+}
+
+# Normalization
+_URL_PREFIX_RE = re.compile(r"^(?:webpack(?:-internal)?|https?|file):/*[^/]*")
+_QUERY_RE = re.compile(r"[?#].*$")
+_BUILD_HASH_RE = re.compile(r"[.-][0-9a-f]{6,}(?=\.\w+$)")
+_FUNC_NOISE_RE = re.compile(
+    r"\$\$Lambda\$\d+/0x[0-9a-f]+|\$lambda\$\d+|\$\d+\b|<>c__DisplayClass\d+_\d+|d__\d+|`\d+|"
+    r"\[as [^\]]+\]|\(.*\)$|0x[0-9a-f]+|^async |^new "
+)
+_MESSAGE_NOISE = [
+    (re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.I), "<uuid>"),
+    (re.compile(r"\b0x[0-9a-f]+\b", re.I), "<hex>"),
+    (re.compile(r"'[^'\n]*'|\"[^\"\n]*\""), "<str>"),
+    (re.compile(r"\d+"), "<n>"),
+]
+_LIBRARY_DIRS = ("node_modules/", "site-packages/", "dist-packages/")
+_PYTHON_STDLIB_RE = re.compile(r"/lib/python\d+(?:\.\d+)?/(?P<module>.+)$")
+_LIBRARY_NAMESPACES = (
+    "java.", "javax.", "jdk.", "sun.", "kotlin.", "kotlinx.", "scala.", "org.junit.", "org.springframework.",
+    "System.", "Microsoft.", "NUnit.", "Xunit.",
+)
+_RUNTIME_FILES = ("<anonymous>", "<frozen", "internal/", "node:")
+
+FINGERPRINT_FRAMES = 5
+INDEX_FILENAME = "crash-buckets.json"
+INDEX_VERSION = 2
+
+
+@dataclass
+class StackFrame:
+    """One parsed stack frame"""
+    function: str
+    file: str
+    line: Optional[int]
+    language: str
+    module: str = ""  # Normalized file: no line numbers, build hashes or library internals
+    in_app: bool = True
+
+    @property
+    def signature(self) -> str:
+        return f"{self.module}:{normalize_function(self.function)}"
+
+
+@dataclass
+class StackTrace:
+    """A parsed stack trace with its fingerprint"""
+    language: str
+    exception_type: str
+    message: str
+    frames: List[StackFrame] = field(default_factory=list)
+    fingerprint: str = ""
+
+    @property
+    def top_frame(self) -> Optional[StackFrame]:
+        """The first application frame, or the first frame if none is in-app."""
+        return next((frame for frame in self.frames if frame.in_app), self.frames[0] if self.frames else None)
+
+
+def normalize_path(path: str) -> Tuple[str, bool]:
+    """
+    Stable module name of a frame's file, and whether it is application code.
+
+    Drops URL prefixes, query strings, build hashes (``main.3f2a9c1b.js``)
+    and directory prefixes; library files collapse to their package name.
+    Runtime internals (``node:internal/...``, ``<anonymous>``) are matched
+    before URL prefixes are stripped, since ``node:`` is one of them.
+    """
+    path = path.replace("\\", "/")
+    if path.startswith(_RUNTIME_FILES):
+        return path.split("/")[0], False
+    path = _QUERY_RE.sub("", _URL_PREFIX_RE.sub("", path))
+    for library_dir in _LIBRARY_DIRS:
+        if library_dir in path:
+            parts = path.split(library_dir)[-1].split("/")
+            package = "/".join(parts[:2]) if parts[0].startswith("@") else parts[0]
+            return f"{library_dir}{package}", False
+    stdlib = _PYTHON_STDLIB_RE.search(path)
+    if stdlib:
+        return f"python/{stdlib.group('module')}", False
+    path = _BUILD_HASH_RE.sub("", path)
+    parts = [part for part in path.split("/") if part and part != "."]
+    return "/".join(parts[-2:]), True
+
+
+def normalize_function(name: str) -> str:
+    """Function name without lambda counters, generic arity, addresses or parameters."""
+    return _FUNC_NOISE_RE.sub("", name or "").strip(".") or "<anonymous>"
+
+
+def normalize_message(message: str) -> str:
+    """Exception message with numbers, IDs and quoted values replaced by placeholders."""
+    for pattern, placeholder in _MESSAGE_NOISE:
+        message = pattern.sub(placeholder, message)
+    return message.strip()
+
+
+def _frame(match: "re.Match") -> Optional[StackFrame]:
+    for language, (func_group, file_group, line_group) in _FRAME_GROUPS.items():
+        file = match.group(file_group)
+        function = match.group(func_group)
+        if file is None and function is None:
+            continue
+        file, function = file or "", function or ""  # .NET frames lack a file without symbols
+        line = match.group(line_group)
+        language = language.split("-")[0]
+        if language in ("java", "dotnet"):
+            module = _FUNC_NOISE_RE.sub("", function.split("(")[0].rsplit(".", 1)[0])
+            in_app = not module.startswith(_LIBRARY_NAMESPACES)
+            function = function.split("(")[0].rsplit(".", 1)[-1]
+        else:
+            module, in_app = normalize_path(file)
+        return StackFrame(function, file, int(line) if line else None, language, module, in_app)
+    return None
+
+
+def _build_trace(matches: List["re.Match"]) -> StackTrace:
+    frames = [frame for frame in map(_frame, matches) if frame]
+    exceptions = [m for m in matches if m.group("exc_type")]
+    language = frames[0].language if frames else "unknown"
+    if language == "python":
+        frames.reverse()  # Python prints the innermost frame last
+        exception = exceptions[-1] if exceptions else None
+    else:
+        exception = exceptions[0] if exceptions else None
+
+    trace = StackTrace(
+        language=language,
+        exception_type=exception.group("exc_type") if exception else "",
+        message=(exception.group("exc_msg") or "").strip() if exception else "",
+        frames=frames,
+    )
+    trace.fingerprint = fingerprint(trace)
+    return trace
+
+
+def fingerprint(trace: StackTrace, depth: int = FINGERPRINT_FRAMES) -> str:
+    """
+    Stable identifier of a crash.
+
+    Hashes the exception type and the top ``depth`` application frames
+    (module and function, never line numbers), so the same crash matches
+    across builds and deployments. Traces without frames fall back to the
+    normalized message.
+    """
+    frames = [frame for frame in trace.frames if frame.in_app] or trace.frames
+    parts = [trace.exception_type]
+    if frames:
+        parts += [frame.signature for frame in frames[:depth]]
+    else:
+        parts.append(normalize_message(trace.message))
+    return hashlib.sha1("\n".join(parts).encode()).hexdigest()[:16]
+
+
+def iter_stack_traces(text: str, max_gap_lines: int = 2) -> Iterator[StackTrace]:
+    """
+    Parse every stack trace in a text (a log, bug report or single trace).
+
+    Frame and exception lines separated by at most ``max_gap_lines``
+    unrecognized lines (source excerpts, "... 12 more") belong to one trace.
+    Groups without frames or an exception are skipped.
+    """
+    group: List["re.Match"] = []
+    previous_end = 0
+    for match in _TRACE_LINE_RE.finditer(text):
+        if group and text.count("\n", previous_end, match.start()) > max_gap_lines + 1:
+            yield from _complete(group)
+            group = []
+        group.append(match)
+        previous_end = match.end()
+    yield from _complete(group)
+
+
+def _complete(group: List["re.Match"]) -> Iterator[StackTrace]:
+    if group and any(m.group("exc_type") is None for m in group):
+        yield _build_trace(group)
+
+
+def parse_stack_trace(text: str) -> StackTrace:
+    """Parse the first stack trace in a text (an empty trace if there is none)."""
+    trace = next(iter_stack_traces(text), None)
+    if trace is None:
+        exception = next((m for m in _TRACE_LINE_RE.finditer(text) if m.group("exc_type")), None)
+        trace = _build_trace([exception] if exception else [])
+    return trace
+
+
+@dataclass
+class CrashGroup:
+    """Traces sharing one fingerprint"""
+    fingerprint: str
+    exception_type: str
+    top_frame: str
+    count: int = 0
+    indices: List[int] = field(default_factory=list)  # Positions in the grouped input
+    bug_ids: List[str] = field(default_factory=list)  # Known bugs with this fingerprint
+
+    @property
+    def is_new(self) -> bool:
+        return not self.bug_ids
+
+
+class CrashBucketIndex:
+    """
+    Fingerprint -> bug ID index for crash grouping.
+
+    Built from the stack traces embedded in the bug-reports corpus, plus
+    links added explicitly; persisted as
+    ``<bug-reports>/.index/crash-buckets.json`` and refreshed incrementally
+    by file modification time. Grouping incoming traces is a single pass
+    of parse, fingerprint and dictionary lookup.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        self._files: Dict[str, Dict[str, object]] = {}  # Relative path -> mtime, size, bug ID, fingerprints
+        self._links: Dict[str, List[str]] = {}  # Explicit fingerprint -> bug IDs
+        self._links_meta: Dict[str, Dict[str, str]] = {}  # Explicit fingerprint -> exception, top frame
+        self._buckets: Dict[str, Dict[str, object]] = {}  # Fingerprint -> exception, top frame, bug IDs
+
+    @classmethod
+    def from_corpus(cls, directory: Optional[str] = None) -> "CrashBucketIndex":
+        """Load the persisted index of a bug-reports directory and bring it up to date."""
+        path = resolve_repo_path(directory or QAConfig.bug_reports_dir)
+        index = cls(str(path))
+        index.load()
+        if index.refresh():
+            index.save()
+        return index
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _rebuild(self):
+        self._buckets = {}
+        entries = [
+            (trace, info["bug_id"]) for info in self._files.values() for trace in info["traces"]
+        ] + [
+            ({"fingerprint": fp, **self._links_meta.get(fp, {})}, bug_id)
+            for fp, bug_ids in self._links.items() for bug_id in bug_ids
+        ]
+        for trace, bug_id in entries:
+            bucket = self._buckets.setdefault(trace["fingerprint"], {
+                "exception_type": trace.get("exception_type", ""),
+                "top_frame": trace.get("top_frame", ""),
+                "bug_ids": [],
+            })
+            if bug_id not in bucket["bug_ids"]:
+                bucket["bug_ids"].append(bug_id)
+
+    # ---- Persistence ----
+
+    @property
+    def index_file(self) -> Optional[Path]:
+        return index_path(self.directory, INDEX_FILENAME) if self.directory else None
+
+    def load(self):
+        """Read the persisted index; ignored if missing or from another version."""
+        if self.index_file is None or not self.index_file.exists():
+            return
+        try:
+            data = json.loads(self.index_file.read_text(encoding="utf-8"))
+        except ValueError:
+            return
+        if data.get("version") != INDEX_VERSION:
+            return
+        self._files = data.get("files", {})
+        self._links = data.get("links", {})
+        self._links_meta = data.get("links_meta", {})
+        self._rebuild()
+
+    def save(self):
+        """Write the index next to the corpus."""
+        if self.index_file is None:
+            return
+        data = {
+            "version": INDEX_VERSION,
+            "files": self._files,
+            "links": self._links,
+            "links_meta": self._links_meta,
+        }
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.index_file)
+
+    def refresh(self) -> bool:
+        """
+        Re-read bug reports added, changed or deleted since the last run.
+
+        Returns:
+            Whether the index changed
+        """
+        if self.directory is None or not Path(self.directory).is_dir():
+            return False
+        root = Path(self.directory)
+        seen = set()
+        changed = False
+        for path in iter_bug_files(self.directory):
+            relative = path.relative_to(root).as_posix()
+            seen.add(relative)
+            stat = path.stat()
+            info = self._files.get(relative)
+            if info and info["mtime"] == stat.st_mtime and info["size"] == stat.st_size:
+                continue
+            text = path.read_text(encoding="utf-8")
+            self._files[relative] = {
+                "mtime": stat.st_mtime,
+                "size": stat.st_size,
+                "bug_id": parse_bug_report(text, str(path)).bug_id,
+                "traces": [_bucket_entry(trace) for trace in iter_stack_traces(text)],
+            }
+            changed = True
+
+        for relative in set(self._files) - seen:
+            del self._files[relative]
+            changed = True
+        if changed:
+            self._rebuild()
+        return changed
+
+    # ---- Lookup ----
+
+    def link(self, trace: StackTrace, bug_id: str):
+        """Record that a crash signature belongs to a bug (persisted by save())."""
+        bug_ids = self._links.setdefault(trace.fingerprint, [])
+        if bug_id not in bug_ids:
+            bug_ids.append(bug_id)
+        entry = _bucket_entry(trace)
+        self._links_meta[trace.fingerprint] = {
+            "exception_type": entry["exception_type"], "top_frame": entry["top_frame"]
+        }
+        self._rebuild()
+
+    def lookup(self, fingerprint: str) -> List[str]:
+        """Bug IDs known for a fingerprint."""
+        bucket = self._buckets.get(fingerprint)
+        return list(bucket["bug_ids"]) if bucket else []
+
+    def group(self, traces: Iterable[Union[str, StackTrace]]) -> List[CrashGroup]:
+        """
+        Group traces by fingerprint and attach known bugs, in one pass.
+
+        Args:
+            traces: Stack trace texts (one trace each) or parsed traces
+
+        Returns:
+            Crash groups, largest first
+        """
+        groups: Dict[str, CrashGroup] = {}
+        for position, item in enumerate(traces):
+            trace = item if isinstance(item, StackTrace) else parse_stack_trace(item)
+            crash = groups.get(trace.fingerprint)
+            if crash is None:
+                entry = _bucket_entry(trace)
+                crash = groups[trace.fingerprint] = CrashGroup(
+                    fingerprint=trace.fingerprint,
+                    exception_type=entry["exception_type"],
+                    top_frame=entry["top_frame"],
+                    bug_ids=self.lookup(trace.fingerprint),
+                )
+            crash.count += 1
+            crash.indices.append(position)
+        return sorted(groups.values(), key=lambda crash: (-crash.count, crash.fingerprint))
+
+
+def _bucket_entry(trace: StackTrace) -> Dict[str, str]:
+    top = trace.top_frame
+    return {
+        "fingerprint": trace.fingerprint,
+        "exception_type": trace.exception_type,
+        "top_frame": top.signature if top else "",
+    }
+
+
+_default_index: Optional[CrashBucketIndex] = None
+
+
+def get_crash_index() -> CrashBucketIndex:
+    """Get the process-wide crash bucket index of the default bug-reports corpus."""
+    global _default_index
+
+    if _default_index is None:
+        _default_index = CrashBucketIndex.from_corpus()
+    return _default_index
@@ -0,0 +1,242 @@
+"""
+Local Triage Engine
+LLM-free severity/category classification with naive Bayes over sparse counts
+"""
+import math
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import QAConfig
+
+from .corpus import BugRecord, load_bug_reports, resolve_repo_path, tokenize
+from .keywords import SEVERITY_CRITERIA, TEST_CATEGORIES
+
+
+# Matched by every label alike; dropping them leaves short reports with their telling words
+_STOPWORDS = frozenset(
+    "a an and are as at be been by did do does for from he i in into is it its my of on or our "
+    "she than that the their then they this to was we were when with you your".split()
+)
+SEED_WEIGHT = 5  # A keyword criterion counts as this many documents' worth of feature evidence
+DEFAULT_MIN_CONFIDENCE = 0.5  # Calibrated on labelled one-line reports; see TriageEngine
+
+
+def extract_features(text: str) -> List[str]:
+    """Unique unigram and bigram features of a document, without stopwords."""
+    tokens = [token for token in tokenize(text) if token not in _STOPWORDS]
+    return list({*tokens, *map(" ".join, zip(tokens, tokens[1:]))})
+
+
+class NaiveBayesClassifier:
+    """
+    Multinomial naive Bayes over sparse feature counts.
+
+    Each document contributes each feature at most once, which keeps long
+    reports from drowning out short labelled phrases. Log-probabilities are
+    precomputed by fit(), so a prediction is one dictionary lookup per
+    feature plus a column sum.
+    """
+
+    def __init__(self, alpha: float = 0.5):
+        self.alpha = alpha
+        self._doc_counts: Counter = Counter()
+        self._feature_counts: Dict[str, Counter] = defaultdict(Counter)
+        self._totals: Counter = Counter()
+        self._labels: List[str] = []
+        self._log_priors: List[float] = []
+        self._log_unseen: List[float] = []  # Per label: log P(feature | label) of a feature it never saw
+        # Feature -> per label: log P(feature | label) - log P(unseen feature | label)
+        self._log_weights: Dict[str, Tuple[float, ...]] = {}
+
+    @property
+    def labels(self) -> List[str]:
+        return list(self._doc_counts)
+
+    def fit(self, documents: Iterable[Tuple[str, str]], weight: int = 1) -> "NaiveBayesClassifier":
+        """
+        Add labelled documents.
+
+        Args:
+            documents: (text, label) pairs
+            weight: Feature count each document contributes per feature
+        """
+        for text, label in documents:
+            features = extract_features(text)
+            self._doc_counts[label] += 1
+            self._feature_counts[label].update(dict.fromkeys(features, weight))
+            self._totals[label] += len(features) * weight
+        self._precompute()
+        return self
+
+    def _precompute(self):
+        labels = self.labels
+        vocabulary = set().union(*(self._feature_counts[label] for label in labels))
+        total_docs = sum(self._doc_counts.values())
+        self._labels = labels
+        self._log_priors = [math.log(self._doc_counts[label] / total_docs) for label in labels]
+        self._log_unseen = [
+            math.log(self.alpha / (self._totals[label] + self.alpha * len(vocabulary))) for label in labels
+        ]
+        # (count + alpha) / denominator over alpha / denominator: the denominator cancels
+        self._log_weights = {
+            feature: tuple(
+                math.log((self._feature_counts[label].get(feature, 0) + self.alpha) / self.alpha)
+                for label in labels
+            )
+            for feature in vocabulary
+        }
+
+    def predict_proba(self, text: str, features: Optional[List[str]] = None) -> Dict[str, float]:
+        """
+        Posterior probability per label.
+
+        Only features seen in training contribute. The log-likelihood is
+        tempered by the number of matched features, so confidence reflects
+        agreement between features rather than document length.
+
+        Args:
+            text: Document to classify
+            features: extract_features(text), if already computed
+        """
+        if not self._labels:
+            return {}
+
+        rows = [row for row in map(self._log_weights.get, features or extract_features(text)) if row]
+        matched = len(rows)
+        temperature = max(1.0, matched / 10)
+        sums = map(sum, zip(*rows)) if rows else [0.0] * len(self._labels)
+        scores = [
+            prior + (matched * unseen + weight) / temperature
+            for prior, unseen, weight in zip(self._log_priors, self._log_unseen, sums)
+        ]
+
+        peak = max(scores)
+        exp_scores = [math.exp(score - peak) for score in scores]
+        total = sum(exp_scores)
+        return {label: value / total for label, value in zip(self._labels, exp_scores)}
+
+    def predict(self, text: str, features: Optional[List[str]] = None) -> Tuple[Optional[str], float]:
+        """Most likely label and its probability."""
+        probabilities = self.predict_proba(text, features)
+        if not probabilities:
+            return None, 0.0
+        label = max(probabilities, key=probabilities.get)
+        return label, probabilities[label]
+
+
+@dataclass
+class TriageResult:
+    """Severity and category assigned to a bug"""
+    bug_id: str
+    severity: str
+    severity_confidence: float
+    category: str
+    category_confidence: float
+    needs_escalation: bool
+    source: str = "local"  # "local" or "llm"
+
+
+def _category_label(bug_type: Optional[str]) -> Optional[str]:
+    """Map a bug report's free-text Type field onto TEST_CATEGORIES."""
+    if not bug_type:
+        return None
+    bug_type = bug_type.lower()
+    return next((category for category in TEST_CATEGORIES if category in bug_type), None)
+
+
+class TriageEngine:
+    """
+    Local severity/category triage for bug reports.
+
+    Trained on the keyword criteria shared with the agent tools plus every
+    labelled report in the bug-reports corpus. Predictions whose confidence
+    falls below ``min_confidence`` are flagged for LLM escalation.
+
+    The default threshold was calibrated on hand-labelled one-line reports
+    (tests/test_triage.py): about four in ten are escalated, and about
+    seven in ten of the rest match both human labels. Full reports with
+    steps and environment details are rarely escalated.
+
+    Only the first ``max_chars`` of a report are classified: the title,
+    summary and exception carry the signal, while trailing logs and stack
+    traces would dominate the cost.
+    """
+
+    def __init__(self, min_confidence: float = DEFAULT_MIN_CONFIDENCE, max_chars: int = 4_000):
+        self.min_confidence = min_confidence
+        self.max_chars = max_chars
+        self.severity_model = NaiveBayesClassifier()
+        self.category_model = NaiveBayesClassifier()
+
+    def train(self, records: Iterable[BugRecord] = ()) -> "TriageEngine":
+        """
+        Train on the built-in keyword seeds and labelled bug records.
+
+        Args:
+            records: Parsed bug reports; unlabelled fields are skipped
+        """
+        self.severity_model.fit((
+            (keyword, severity)
+            for severity, keywords in SEVERITY_CRITERIA.items()
+            for keyword in keywords
+        ), weight=SEED_WEIGHT)
+        self.category_model.fit((
+            (keyword, category)
+            for category, keywords in TEST_CATEGORIES.items()
+            for keyword in keywords
+        ), weight=SEED_WEIGHT)
+
+        records = list(records)
+        self.severity_model.fit((record.text, record.severity) for record in records if record.severity)
+        self.category_model.fit(
+            (record.text, _category_label(record.type)) for record in records if _category_label(record.type)
+        )
+        return self
+
+    @classmethod
+    def from_corpus(
+        cls,
+        directory: Optional[str] = None,
+        min_confidence: float = DEFAULT_MIN_CONFIDENCE
+    ) -> "TriageEngine":
+        """Train an engine on a bug-reports directory (default: QAConfig.bug_reports_dir)."""
+        path = resolve_repo_path(directory or QAConfig.bug_reports_dir)
+        records = load_bug_reports(str(path)) if path.is_dir() else []
+        return cls(min_confidence).train(records)
+
+    def triage(self, text: str, bug_id: str = "") -> TriageResult:
+        """
+        Classify one bug report.
+
+        Args:
+            text: Bug report or crash description
+            bug_id: Identifier echoed back in the result
+
+        Returns:
+            Severity/category with confidences
+        """
+        text = text[:self.max_chars]
+        features = extract_features(text)
+        severity, severity_confidence = self.severity_model.predict(text, features)
+        category, category_confidence = self.category_model.predict(text, features)
+        return TriageResult(
+            bug_id=bug_id,
+            severity=severity or "Medium",
+            severity_confidence=severity_confidence,
+            category=category or "functional",
+            category_confidence=category_confidence,
+            needs_escalation=min(severity_confidence, category_confidence) < self.min_confidence,
+        )
+
+
+_default_engine: Optional[TriageEngine] = None
+
+
+def get_triage_engine() -> TriageEngine:
+    """Get the process-wide triage engine trained on the default corpus."""
+    global _default_engine
+
+    if _default_engine is None:
+        _default_engine = TriageEngine.from_corpus()
+    return _default_engine
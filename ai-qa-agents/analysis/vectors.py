@@ -0,0 +1,479 @@
+"""
+Vector Index
+Embedding-free hashed vectors in a memory-mapped file for similarity search
+"""
+import json
+import math
+import os
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config import QAConfig
+
+from .corpus import (
+    index_path,
+    iter_bug_files,
+    iter_test_case_files,
+    parse_bug_report,
+    resolve_repo_path,
+    split_test_cases,
+    tokenize,
+)
+from .search import bug_summary_text
+
+try:
+    import numpy as np
+except ImportError:  # Checked when an index is opened
+    np = None
+
+INDEX_DIRNAME = "vectors"
+INDEX_VERSION = 2
+VECTORS_FILENAME = "vectors-{generation}.f32"
+IDS_FILENAME = "ids-{generation}.jsonl"
+META_FILENAME = "meta.json"
+
+# Rows scored per matrix product; bounds the memory of a query batch
+SEARCH_CHUNK_ROWS = 65_536
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("The vector index needs numpy: pip install numpy")
+
+
+class HashingVectorizer:
+    """
+    Fixed-size vectors without a trained vocabulary or embedding service.
+
+    Word unigrams, word bigrams and character n-grams are hashed into
+    ``dim`` signed buckets with sublinear term frequency, then L2
+    normalized, so the dot product of two vectors is their cosine
+    similarity. Character n-grams keep "login"/"logins"/"log-in" close.
+    """
+
+    def __init__(self, dim: int = 1024, char_ngram: int = 4):
+        self.dim = dim
+        self.char_ngram = char_ngram
+
+    @property
+    def params(self) -> Dict[str, int]:
+        return {"dim": self.dim, "char_ngram": self.char_ngram}
+
+    def features(self, text: str) -> Counter:
+        """Feature counts of a text."""
+        tokens = tokenize(text)
+        features = Counter(tokens)
+        features.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+        n = self.char_ngram
+        for token in tokens:
+            padded = f"<{token}>"
+            if len(padded) > n:
+                features.update(f"#{padded[i:i + n]}" for i in range(len(padded) - n + 1))
+        return features
+
+    def transform(self, texts: Sequence[str]) -> "np.ndarray":
+        """Vectorize texts into a (len(texts), dim) float32 matrix of unit rows."""
+        _require_numpy()
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            vector = matrix[row]
+            for feature, count in self.features(text).items():
+                h = zlib.crc32(feature.encode())
+                weight = 1.0 + math.log(count)
+                vector[h % self.dim] += -weight if h & 0x80000000 else weight
+            norm = float(np.linalg.norm(vector))
+            if norm:
+                vector /= norm
+        return matrix
+
+
+@dataclass
+class VectorMatch:
+    """One nearest neighbour"""
+    key: str
+    doc_id: str
+    score: float  # Cosine similarity
+    path: Optional[str] = None
+
+
+# Corpus document extraction: (file path, relative path, text) -> [(key, id, text)]
+DocumentExtractor = Callable[[Path, str, str], List[Tuple[str, str, str]]]
+
+
+def _bug_documents(path: Path, relative: str, text: str) -> List[Tuple[str, str, str]]:
+    return [(relative, parse_bug_report(text, str(path)).bug_id, bug_summary_text(text))]
+
+
+def _test_case_documents(path: Path, relative: str, text: str) -> List[Tuple[str, str, str]]:
+    return [
+        (f"{relative}#{case_id}" if case_id else relative, case_id or path.stem, block)
+        for case_id, block in split_test_cases(text)
+    ]
+
+
+# Supported corpora: name -> (default directory, file lister, document extractor)
+CORPORA: Dict[str, Tuple[str, Callable[[str], List[Path]], DocumentExtractor]] = {
+    "bug-reports": (QAConfig.bug_reports_dir, iter_bug_files, _bug_documents),
+    "test-cases": (QAConfig.test_cases_dir, iter_test_case_files, _test_case_documents),
+}
+
+
+class VectorIndex:
+    """
+    Append-only vector store with brute-force cosine top-K search.
+
+    Layout of the index directory:
+
+    - ``vectors-<generation>.f32``: raw float32 rows, memory-mapped on
+      first search, so opening an index never reads the vectors into RAM
+    - ``ids-<generation>.jsonl``: ID sidecar, one record per appended row
+      (later records supersede earlier ones for the same key;
+      ``"row": null`` deletes)
+    - ``meta.json``: vectorizer parameters and the current generation; a
+      parameter mismatch resets the index
+
+    Updates append rows and sidecar records; superseded rows are skipped at
+    search time and dropped by compact(), which writes the next generation.
+    """
+
+    def __init__(self, directory: str, vectorizer: Optional[HashingVectorizer] = None):
+        _require_numpy()
+        self.directory = Path(directory)
+        self.vectorizer = vectorizer or HashingVectorizer()
+        self.dim = self.vectorizer.dim
+        self._records: Dict[str, Dict[str, object]] = {}  # Key -> live sidecar record
+        self._rows = 0  # Rows in the vectors file, live or not
+        self._generation = 0  # Of the data files named by meta.json
+        self._matrix = None  # Lazily opened memmap
+        self._row_keys: Optional[List[Optional[str]]] = None  # Row -> live key, built lazily
+        self._dead = None  # Row mask of superseded/deleted rows, built lazily
+        self._id_rows: Optional[Dict[str, List[int]]] = None  # Document ID -> live rows
+        self.corpus_dir: Optional[Path] = None
+        self._documents: Optional[DocumentExtractor] = None
+        self._list_files: Optional[Callable[[str], List[Path]]] = None
+        self._open()
+
+    @classmethod
+    def from_corpus(cls, corpus: str = "bug-reports", directory: Optional[str] = None) -> "VectorIndex":
+        """
+        Open the vector index of a corpus and bring it up to date.
+
+        Args:
+            corpus: "bug-reports" or "test-cases"
+            directory: Corpus directory (default from QAConfig)
+        """
+        if corpus not in CORPORA:
+            raise ValueError(f"Unknown corpus {corpus!r}; expected one of {sorted(CORPORA)}")
+        default_dir, list_files, documents = CORPORA[corpus]
+        corpus_dir = resolve_repo_path(directory or default_dir)
+        index = cls(str(index_path(str(corpus_dir), INDEX_DIRNAME)))
+        index.corpus_dir = corpus_dir
+        index._list_files = list_files
+        index._documents = documents
+        index.refresh()
+        return index
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._records
+
+    @property
+    def dead_rows(self) -> int:
+        return self._rows - len(self._records)
+
+    # ---- Storage ----
+
+    def _path(self, name: str, generation: Optional[int] = None) -> Path:
+        return self.directory / name.format(generation=self._generation if generation is None else generation)
+
+    def _write_meta(self, generation: int):
+        """Atomically name ``generation`` as current; this commits a compaction."""
+        meta = {"version": INDEX_VERSION, **self.vectorizer.params, "generation": generation}
+        tmp = self._path(META_FILENAME + ".tmp")
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, self._path(META_FILENAME))
+
+    def _remove_stale_files(self):
+        """Delete data files of other generations, left by an interrupted or finished compaction."""
+        current = {self._path(VECTORS_FILENAME), self._path(IDS_FILENAME)}
+        for pattern in (VECTORS_FILENAME, IDS_FILENAME):
+            for path in self.directory.glob(pattern.format(generation="*")):
+                if path not in current:
+                    try:
+                        path.unlink()
+                    except OSError:
+                        pass  # Still mapped by another process; retried on the next open
+
+    def _open(self):
+        """Read the metadata and ID sidecar (the vectors stay on disk)."""
+        meta_path = self._path(META_FILENAME)
+        meta = None
+        if meta_path.exists():
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            except ValueError:
+                pass
+        expected = {"version": INDEX_VERSION, **self.vectorizer.params}
+        if not isinstance(meta, dict) or {name: meta.get(name) for name in expected} != expected:
+            self._reset()
+            return
+
+        self._generation = meta.get("generation", 0)
+        self._remove_stale_files()
+        vectors_path = self._path(VECTORS_FILENAME)
+        self._rows = vectors_path.stat().st_size // (4 * self.dim) if vectors_path.exists() else 0
+        ids_path = self._path(IDS_FILENAME)
+        if not ids_path.exists():
+            return
+        with open(ids_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Torn final line after a crash
+                row = record.get("row")
+                if row is None:
+                    self._records.pop(record["key"], None)
+                elif row < self._rows:
+                    self._records[record["key"]] = record
+
+    def _reset(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._generation = 0
+        self._write_meta(self._generation)
+        self._remove_stale_files()
+        for name in (VECTORS_FILENAME, IDS_FILENAME):
+            self._path(name).unlink(missing_ok=True)
+        self._records = {}
+        self._rows = 0
+        self._invalidate()
+
+    def _invalidate(self):
+        self._matrix = None
+        self._row_keys = None
+        self._dead = None
+        self._id_rows = None
+
+    def _append(self, vectors: "np.ndarray", records: List[Dict[str, object]]):
+        """Append rows, then their sidecar records (a crash leaves only orphan rows)."""
+        with open(self._path(VECTORS_FILENAME), "ab") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        with open(self._path(IDS_FILENAME), "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._invalidate()
+
+    def _load_matrix(self):
+        if self._matrix is None and self._rows:
+            self._matrix = np.memmap(
+                self._path(VECTORS_FILENAME), dtype=np.float32, mode="r", shape=(self._rows, self.dim)
+            )
+        if self._row_keys is None:
+            self._row_keys = [None] * self._rows
+            self._dead = np.ones(self._rows, dtype=bool)
+            self._id_rows = {}
+            for key, record in self._records.items():
+                self._row_keys[record["row"]] = key
+                self._dead[record["row"]] = False
+                self._id_rows.setdefault(record["id"], []).append(record["row"])
+        return self._matrix
+
+    # ---- Updates ----
+
+    def add(self, items: Iterable[Tuple[str, str, str]], **info):
+        """
+        Vectorize and append documents, replacing earlier versions of their keys.
+
+        Args:
+            items: (key, document id, text) triples
+            **info: Extra fields stored in each sidecar record
+        """
+        items = list(items)
+        if not items:
+            return
+        vectors = self.vectorizer.transform([text for _, _, text in items])
+        records = []
+        for offset, (key, doc_id, _) in enumerate(items):
+            record = {"key": key, "row": self._rows + offset, "id": doc_id, **info}
+            records.append(record)
+        self._append(vectors, records)
+        self._rows += len(items)
+        for record in records:
+            self._records[record["key"]] = record
+
+    def remove(self, keys: Iterable[str]):
+        """Delete documents by key."""
+        keys = [key for key in keys if key in self._records]
+        if not keys:
+            return
+        with open(self._path(IDS_FILENAME), "a", encoding="utf-8") as f:
+            for key in keys:
+                f.write(json.dumps({"key": key, "row": None}) + "\n")
+                del self._records[key]
+        self._invalidate()
+
+    def compact(self):
+        """
+        Rewrite the files without superseded or deleted rows.
+
+        Live rows are written to the files of the next generation, which
+        becomes current when meta.json is rewritten to name it. A crash
+        before that leaves the current generation untouched; a crash after
+        it leaves only stale files, removed on the next open. Files are
+        never replaced while mapped, and the in-memory state changes only
+        once the new generation is committed.
+        """
+        matrix = self._load_matrix()
+        live = sorted(self._records.values(), key=lambda record: record["row"])
+        generation = self._generation + 1
+        with open(self._path(VECTORS_FILENAME, generation), "wb") as f:
+            for start in range(0, len(live), SEARCH_CHUNK_ROWS):
+                rows = [record["row"] for record in live[start:start + SEARCH_CHUNK_ROWS]]
+                f.write(np.ascontiguousarray(matrix[rows]).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        records = [{**record, "row": row} for row, record in enumerate(live)]
+        with open(self._path(IDS_FILENAME, generation), "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        # Unmap the current generation so its files can be deleted on every platform
+        del matrix
+        self._invalidate()
+        self._write_meta(generation)
+        self._generation = generation
+        self._records = {record["key"]: record for record in records}
+        self._rows = len(records)
+        self._remove_stale_files()
+
+    def refresh(self) -> bool:
+        """
+        Re-index corpus files added, changed or deleted since the last run.
+
+        Compacts the files once more than half of the rows are dead.
+
+        Returns:
+            Whether the index changed
+        """
+        if self.corpus_dir is None or not self.corpus_dir.is_dir():
+            return False
+
+        indexed: Dict[str, Tuple[object, object, List[str]]] = {}
+        for key, record in self._records.items():
+            if "file" not in record:
+                continue
+            mtime, size, keys = indexed.get(record["file"], (record["mtime"], record["size"], []))
+            keys.append(key)
+            indexed[record["file"]] = (mtime, size, keys)
+
+        seen = set()
+        stale: List[str] = []
+        changed = False
+        for path in self._list_files(str(self.corpus_dir)):
+            relative = path.relative_to(self.corpus_dir).as_posix()
+            seen.add(relative)
+            stat = path.stat()
+            mtime, size, keys = indexed.get(relative, (None, None, []))
+            if (mtime, size) == (stat.st_mtime, stat.st_size):
+                continue
+            documents = self._documents(path, relative, path.read_text(encoding="utf-8"))
+            stale.extend(set(keys) - {key for key, _, _ in documents})
+            self.add(documents, file=relative, mtime=stat.st_mtime, size=stat.st_size)
+            changed = True
+
+        for relative in set(indexed) - seen:
+            stale.extend(indexed[relative][2])
+        if stale:
+            self.remove(stale)
+            changed = True
+        if self.dead_rows > len(self._records):
+            self.compact()
+        return changed
+
+    # ---- Search ----
+
+    def search(self, queries: Sequence[str], k: int = 5, exclude: Iterable[str] = ()) -> List[List[VectorMatch]]:
+        """
+        Top-K most similar documents for a batch of query texts.
+
+        Args:
+            queries: Query texts, vectorized together
+            k: Results per query
+            exclude: Keys or document IDs to leave out
+
+        Returns:
+            One best-first match list per query, holding only documents
+            with a positive similarity
+        """
+        return self.search_vectors(self.vectorizer.transform(list(queries)), k, exclude)
+
+    def search_vectors(
+        self,
+        queries: "np.ndarray",
+        k: int = 5,
+        exclude: Iterable[str] = ()
+    ) -> List[List[VectorMatch]]:
+        """
+        Top-K cosine matches for a (n, dim) batch of unit query vectors.
+
+        The memory-mapped matrix is scored in chunks of SEARCH_CHUNK_ROWS
+        rows, keeping a running top-K per query. Only documents with a
+        positive cosine similarity are returned, so a list may hold fewer
+        than ``k`` matches.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        matrix = self._load_matrix()
+        if matrix is None or not self._records or k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        dead = self._dead
+        excluded = set(exclude)
+        if excluded:
+            dead = dead.copy()
+            for name in excluded:
+                if name in self._records:
+                    dead[self._records[name]["row"]] = True
+                dead[self._id_rows.get(name, [])] = True
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+        for start in range(0, self._rows, SEARCH_CHUNK_ROWS):
+            block = np.asarray(matrix[start:start + SEARCH_CHUNK_ROWS])
+            scores = queries @ block.T
+            scores[:, dead[start:start + len(block)]] = -np.inf
+            rows = np.broadcast_to(np.arange(start, start + len(block)), scores.shape)
+            scores = np.concatenate([best_scores, scores], axis=1)
+            rows = np.concatenate([best_rows, rows], axis=1)
+            if scores.shape[1] > k:
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(scores, top, axis=1)
+                rows = np.take_along_axis(rows, top, axis=1)
+            best_scores, best_rows = scores, rows
+
+        results = []
+        for scores, rows in zip(best_scores, best_rows):
+            matches = []
+            for i in np.argsort(-scores, kind="stable"):
+                if not np.isfinite(scores[i]) or scores[i] <= 0:
+                    break
+                key = self._row_keys[rows[i]]
+                record = self._records[key]
+                matches.append(VectorMatch(key, record["id"], float(scores[i]), record.get("file")))
+            results.append(matches)
+        return results
+
+
+_default_indexes: Dict[str, VectorIndex] = {}
+
+
+def get_vector_index(corpus: str = "bug-reports") -> VectorIndex:
+    """Get the process-wide vector index of a default corpus ("bug-reports" or "test-cases")."""
+    if corpus not in _default_indexes:
+        _default_indexes[corpus] = VectorIndex.from_corpus(corpus)
+    return _default_indexes[corpus]
@@ -0,0 +1,14 @@
+"""
+Benchmarks for AI QA Agents
+Mock LLM server and end-to-end latency suite for offline regression checks
+
+Run the suite with ``python -m benchmarks.suite``.
+"""
+from .mock_server import MockLLMServer, MockServerConfig, MockServerStats, MockToolCall
+
+__all__ = [
+    "MockLLMServer",
+    "MockServerConfig",
+    "MockServerStats",
+    "MockToolCall",
+]
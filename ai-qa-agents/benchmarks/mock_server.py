@@ -0,0 +1,391 @@
+"""
+Mock LLM Server
+Deterministic OpenAI-compatible chat completions endpoint for offline runs
+
+Point any agent at it with ``ModelConfig(base_url=server.base_url, api_key="mock")``
+or, for the CLI, ``QA_MODEL_BASE_URL=http://127.0.0.1:8765/v1``.
+"""
+import argparse
+import asyncio
+import json
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Union
+
+from scheduler import estimate_tokens
+
+# A canned response, or a function building one from the last user message
+Response = Union[str, Callable[[str], str]]
+
+DEFAULT_RESPONSE = """## Mock response ({model})
+
+Received a prompt of about {prompt_tokens} tokens starting with:
+
+> {excerpt}
+
+1. First recommendation with enough words to stream over several chunks
+2. Second recommendation covering negative and boundary cases
+3. Third recommendation about security and accessibility checks
+"""
+
+
+@dataclass
+class MockToolCall:
+    """A tool call the server issues before answering"""
+    name: str
+    arguments: Dict[str, object] = field(default_factory=dict)
+
+
+@dataclass
+class MockServerConfig:
+    """Behaviour of the mock server"""
+    host: str = "127.0.0.1"
+    port: int = 0  # 0 picks a free port
+    ttft: float = 0.2  # Seconds before the first chunk
+    inter_chunk_delay: float = 0.01  # Seconds between chunks
+    words_per_chunk: int = 1
+    default_response: str = DEFAULT_RESPONSE  # Formatted with model, prompt_tokens, excerpt
+    responses: Dict[str, Response] = field(default_factory=dict)  # Prompt substring -> response
+    tool_calls: List[MockToolCall] = field(default_factory=list)  # Issued when the tool is offered
+    rate_limit_every: int = 0  # Answer every Nth request with 429 (0 = never)
+    retry_after_ms: int = 100
+    model_errors: Dict[str, int] = field(default_factory=dict)  # Model -> HTTP status it always answers
+
+
+@dataclass
+class MockServerStats:
+    """Counters for requests served"""
+    requests: int = 0
+    streamed: int = 0
+    tool_call_rounds: int = 0
+    rate_limited: int = 0
+    failed: int = 0  # Requests answered with a model_errors status
+
+
+def _message_text(message: dict) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content)
+
+
+class MockLLMServer:
+    """
+    Minimal HTTP/1.1 server speaking the chat completions protocol.
+
+    Responses are deterministic: the first ``responses`` key found in the
+    last user message selects the reply, otherwise ``default_response`` is
+    used. Streaming replies honour ``ttft`` and ``inter_chunk_delay`` so
+    time-to-first-token and throughput of the client pipeline can be
+    measured without a network or token.
+    """
+
+    def __init__(self, config: Optional[MockServerConfig] = None):
+        self.config = config or MockServerConfig()
+        self.stats = MockServerStats()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._connections: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+        self.port: Optional[int] = None
+
+    @property
+    def base_url(self) -> str:
+        """Endpoint to use as ModelConfig.base_url."""
+        return f"http://{self.config.host}:{self.port}/v1"
+
+    # ---- Lifecycle ----
+
+    async def start(self) -> str:
+        """Start serving on the current event loop and return the base URL."""
+        self._server = await asyncio.start_server(self._handle, self.config.host, self.config.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.base_url
+
+    async def stop(self):
+        """Stop serving."""
+        if self._server is not None:
+            self._server.close()
+            # Keep-alive connections outlive the listening socket; end them too
+            for writer in self._connections.values():
+                writer.close()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "MockLLMServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    def start_in_thread(self) -> str:
+        """
+        Serve from a background thread with its own event loop.
+
+        Keeps the server's work off the event loop being measured.
+        """
+        started = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            started.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self.stop())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="mock-llm-server", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self.base_url
+
+    def stop_thread(self):
+        """Stop a server started with start_in_thread()."""
+        if self._loop is not None and self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+
+    # ---- Response content ----
+
+    def _reply_text(self, model: str, messages: List[dict]) -> str:
+        user_messages = [m for m in messages if m.get("role") == "user"]
+        prompt = _message_text(user_messages[-1]) if user_messages else ""
+        for needle, response in self.config.responses.items():
+            if needle in prompt:
+                return response(prompt) if callable(response) else response
+        excerpt = " ".join(prompt.split())[:120]
+        all_text = "".join(_message_text(m) for m in messages)
+        return self.config.default_response.format(
+            model=model,
+            prompt_tokens=estimate_tokens(all_text),
+            excerpt=excerpt,
+        )
+
+    def _pending_tool_calls(self, request: dict) -> List[MockToolCall]:
+        """Tool calls to issue: configured, offered by the client, not yet answered."""
+        messages = request.get("messages", [])
+        last_user = max((i for i, m in enumerate(messages) if m.get("role") == "user"), default=-1)
+        if any(m.get("role") == "tool" for m in messages[last_user + 1:]):
+            return []
+        offered = {
+            tool.get("function", {}).get("name")
+            for tool in request.get("tools") or []
+        }
+        return [call for call in self.config.tool_calls if call.name in offered]
+
+    def _chunks(self, text: str) -> List[str]:
+        """Split a reply into chunks of words that concatenate back to it exactly."""
+        words = re.findall(r"\s*\S+(?:\s+\Z)?", text) or [text]
+        size = max(1, self.config.words_per_chunk)
+        return ["".join(words[i:i + size]) for i in range(0, len(words), size)]
+
+    # ---- HTTP ----
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                await self._dispatch(method, path, body, writer)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self._connections.pop(task, None)
+            writer.close()
+
+    async def _send(self, writer: asyncio.StreamWriter, status: str, payload: dict, extra: str = ""):
+        body = json.dumps(payload).encode()
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n{extra}\r\n".encode() + body
+        )
+        await writer.drain()
+
+    async def _dispatch(self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter):
+        path = path.split("?", 1)[0].rstrip("/")
+        if method == "GET" and path.endswith("/models"):
+            await self._send(writer, "200 OK", {"object": "list", "data": []})
+            return
+        if method != "POST" or not path.endswith("/chat/completions"):
+            await self._send(writer, "404 Not Found", {"error": {"message": f"Unknown path {path}"}})
+            return
+
+        self.stats.requests += 1
+        every = self.config.rate_limit_every
+        if every and self.stats.requests % every == 0:
+            self.stats.rate_limited += 1
+            await self._send(
+                writer, "429 Too Many Requests",
+                {"error": {"message": "Rate limit exceeded (mock)", "code": "RateLimitReached"}},
+                extra=f"retry-after-ms: {self.config.retry_after_ms}\r\n",
+            )
+            return
+
+        request = json.loads(body or b"{}")
+        model = request.get("model", "mock")
+        status = self.config.model_errors.get(model)
+        if status is not None:
+            self.stats.failed += 1
+            await self._send(
+                writer, f"{status} Mock Error",
+                {"error": {"message": f"Model {model} failed (mock)", "code": str(status)}},
+            )
+            return
+
+        tool_calls = self._pending_tool_calls(request)
+        if tool_calls:
+            self.stats.tool_call_rounds += 1
+            text = ""
+        else:
+            text = self._reply_text(model, request.get("messages", []))
+
+        completion_id = f"chatcmpl-mock-{self.stats.requests}"
+        prompt_tokens = estimate_tokens(
+            "".join(_message_text(m) for m in request.get("messages", []))
+        )
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": estimate_tokens(text),
+            "total_tokens": prompt_tokens + estimate_tokens(text),
+        }
+        if request.get("stream"):
+            self.stats.streamed += 1
+            await self._stream_response(writer, completion_id, model, text, tool_calls, usage, request)
+        else:
+            await asyncio.sleep(self.config.ttft)
+            message = {"role": "assistant", "content": text or None}
+            if tool_calls:
+                message["tool_calls"] = [
+                    {
+                        "id": f"call_{i}",
+                        "type": "function",
+                        "function": {"name": call.name, "arguments": json.dumps(call.arguments)},
+                    }
+                    for i, call in enumerate(tool_calls)
+                ]
+            await self._send(writer, "200 OK", {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": message,
+                    "finish_reason": "tool_calls" if tool_calls else "stop",
+                }],
+                "usage": usage,
+            })
+
+    async def _stream_response(
+        self,
+        writer: asyncio.StreamWriter,
+        completion_id: str,
+        model: str,
+        text: str,
+        tool_calls: List[MockToolCall],
+        usage: dict,
+        request: dict
+    ):
+        created = int(time.time())
+
+        async def event(delta: Optional[dict], finish_reason: Optional[str] = None, extra: Optional[dict] = None):
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [] if delta is None else [
+                    {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                ],
+            }
+            payload.update(extra or {})
+            await self._write_chunk(writer, f"data: {json.dumps(payload)}\n\n".encode())
+
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\nTransfer-Encoding: chunked\r\n\r\n"
+        )
+        await asyncio.sleep(self.config.ttft)
+
+        if tool_calls:
+            for i, call in enumerate(tool_calls):
+                await event({
+                    "role": "assistant",
+                    "tool_calls": [{
+                        "index": i,
+                        "id": f"call_{i}",
+                        "type": "function",
+                        "function": {"name": call.name, "arguments": json.dumps(call.arguments)},
+                    }],
+                })
+            await event({}, "tool_calls")
+        else:
+            for i, chunk in enumerate(self._chunks(text)):
+                if i:
+                    await asyncio.sleep(self.config.inter_chunk_delay)
+                await event({"role": "assistant", "content": chunk} if i == 0 else {"content": chunk})
+            await event({}, "stop")
+
+        if (request.get("stream_options") or {}).get("include_usage"):
+            await event(None, extra={"usage": usage})
+        await self._write_chunk(writer, b"data: [DONE]\n\n")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    @staticmethod
+    async def _write_chunk(writer: asyncio.StreamWriter, data: bytes):
+        writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        await writer.drain()
+
+
+def main():
+    """Run the mock server until interrupted."""
+    parser = argparse.ArgumentParser(description="Deterministic OpenAI-compatible mock server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ttft", type=float, default=0.2, help="Seconds before the first chunk")
+    parser.add_argument("--chunk-delay", type=float, default=0.01, help="Seconds between chunks")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Answer every Nth request with 429")
+    args = parser.parse_args()
+
+    server = MockLLMServer(MockServerConfig(
+        host=args.host,
+        port=args.port,
+        ttft=args.ttft,
+        inter_chunk_delay=args.chunk_delay,
+        rate_limit_every=args.rate_limit_every,
+    ))
+
+    async def serve():
+        print(f"🧪 Mock LLM server on {await server.start()}")
+        print(f"   export QA_MODEL_BASE_URL={server.base_url} GITHUB_TOKEN=mock")
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
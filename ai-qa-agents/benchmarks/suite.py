@@ -0,0 +1,567 @@
+"""
+Benchmark Suite
+End-to-end latency, throughput and memory of every agent method and CLI command
+
+Runs against the mock server, so no token or network is needed:
+
+    python -m benchmarks.suite --iterations 20 --concurrency 4 -o bench.json
+    python -m benchmarks.suite --baseline bench.json   # Fail on p95 regressions
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from config import ModelConfig, RateLimitConfig
+
+from .mock_server import MockLLMServer, MockServerConfig
+
+CLI_PATH = Path(__file__).resolve().parents[1] / "cli.py"
+
+SAMPLE_BUG = """# BUG-900: Checkout button unresponsive after applying coupon
+
+**Severity:** High
+**Component:** Checkout
+
+## Steps to Reproduce
+1. Add any item to the cart
+2. Apply coupon SAVE10
+3. Click "Place order"
+
+## Expected Result
+Order is placed and the confirmation page opens.
+
+## Actual Result
+Nothing happens; the console shows "TypeError: Cannot read properties of undefined (reading 'total')".
+"""
+
+SAMPLE_CODE = """export function applyCoupon(cart: Cart, code: string): Cart {
+  const coupon = COUPONS[code];
+  if (!coupon || coupon.expires < Date.now()) throw new Error("Invalid coupon");
+  return { ...cart, total: Math.max(0, cart.total - coupon.amount) };
+}
+"""
+
+SAMPLE_CRASH = """2024-05-01T10:00:00Z ERROR Unhandled exception in checkout
+TypeError: Cannot read properties of undefined (reading 'total')
+    at applyCoupon (webpack:///src/checkout/coupon.ts:4:31)
+    at placeOrder (webpack:///src/checkout/order.ts:18:9)
+    at HTMLButtonElement.onClick (webpack:///src/checkout/CheckoutButton.tsx:12:5)
+2024-05-01T10:00:01Z INFO Retrying checkout for session 42
+2024-05-01T10:00:01Z INFO Cart restored
+2024-05-01T10:00:01Z INFO Payment form rendered
+2024-05-01T10:00:01Z ERROR Worker failed
+Traceback (most recent call last):
+  File "/srv/app/worker.py", line 42, in run
+    job.process()
+  File "/srv/app/jobs.py", line 17, in process
+    raise KeyError(self.order_id)
+KeyError: 'order-1234'
+2024-05-01T10:00:02Z INFO Job requeued
+2024-05-01T10:00:02Z INFO Queue depth 12
+2024-05-01T10:00:02Z INFO Health check ok
+"""
+
+SAMPLE_TEST_CASE = """# TC-001: Valid login
+**Priority:** High
+## Steps
+1. Open /login
+2. Enter valid credentials
+## Expected Result
+User lands on the dashboard
+"""
+
+
+def _score_lines(prompt: str) -> str:
+    """Mock reply to the bug-scoring prompt: one JSON line per numbered bug."""
+    return "\n".join(
+        json.dumps({"bug": int(n), "score": 100 - int(n) % 100, "severity": "High", "reason": "Blocks checkout"})
+        for n in re.findall(r"\*\*Bug (\d+):\*\*", prompt)
+    )
+
+
+def _test_case_array(prompt: str) -> str:
+    """Mock reply to the structured test case prompt."""
+    match = re.search(r"Generate (\d+) test cases", prompt)
+    return json.dumps([
+        {
+            "id": f"TC-{n:03d}", "title": f"Scenario {n}", "priority": "High", "type": "Functional",
+            "component": "General", "preconditions": ["User account exists"],
+            "steps": [{"action": "Open the page", "test_data": ""}, {"action": "Submit the form", "test_data": "a@b.co"}],
+            "expected_results": ["Request succeeds"], "notes": [],
+        }
+        for n in range(1, int(match.group(1)) + 1 if match else 2)
+    ], separators=(",", ":"))
+
+
+# Prompts whose replies are parsed get structured canned responses
+MOCK_RESPONSES = {
+    "Respond with one JSON object per line": _score_lines,
+    '"verdict"': '{"verdict": "duplicate", "similarity": 90, "reason": "Same failing step"}',
+    "Respond with a single JSON object": '{"severity": "High", "category": "functional"}',
+    '"root_cause_hypothesis"': json.dumps({
+        "severity": "High", "priority": "P2", "category": "Functional",
+        "root_cause_hypothesis": "Coupon total is undefined", "affected_areas": ["Checkout"],
+        "duplicate_candidates": [], "recommended_actions": ["Guard the total"], "test_coverage_gaps": [],
+    }),
+    '"expected_results"': _test_case_array,
+}
+
+
+@dataclass
+class Scenario:
+    """One benchmarked operation; ``call(i)`` returns an awaitable or async iterator"""
+    name: str
+    call: Callable[[int], Any]
+    streaming: bool = False
+
+
+@dataclass
+class BenchmarkResult:
+    """Measurements of one scenario"""
+    name: str
+    iterations: int
+    concurrency: int
+    wall_seconds: float
+    latencies: List[float] = field(default_factory=list)
+    ttfts: List[float] = field(default_factory=list)
+    errors: int = 0
+    first_error: Optional[str] = None
+    peak_memory_kb: Optional[float] = None
+
+    def summary(self) -> Dict[str, Any]:
+        """Percentiles, throughput and memory, in seconds and KiB."""
+        return {
+            "name": self.name,
+            "iterations": self.iterations,
+            "concurrency": self.concurrency,
+            "errors": self.errors,
+            "first_error": self.first_error,
+            "p50": percentile(self.latencies, 50),
+            "p95": percentile(self.latencies, 95),
+            "p99": percentile(self.latencies, 99),
+            "ttft_p50": percentile(self.ttfts, 50),
+            "throughput": len(self.latencies) / self.wall_seconds if self.wall_seconds else None,
+            "peak_memory_kb": self.peak_memory_kb,
+        }
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Linearly interpolated percentile, or None for no samples."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+# ============= Agent Scenarios =============
+
+def agent_scenarios(config: ModelConfig) -> List[Scenario]:
+    """Every public agent method, with inputs that differ per iteration."""
+    from agents import BugAnalyzerAgent, TestCaseGeneratorAgent, TestExecutionAssistant
+
+    generator = TestCaseGeneratorAgent(config)
+    analyzer = BugAnalyzerAgent(config)
+    assistant = TestExecutionAssistant(config)
+
+    def requirement(i: int) -> str:
+        # Unique per iteration so neither the cache nor request coalescing short-circuits it
+        return f"Users can reset their password via an emailed link (run {i})"
+
+    def bug(i: int) -> str:
+        return f"{SAMPLE_BUG}\nRun {i}"
+
+    def backlog(i: int) -> List[str]:
+        return [f"{SAMPLE_BUG}\nVariant {i}-{n}" for n in range(60)]
+
+    report_args = dict(
+        tests_executed=[{"id": "TC-001", "status": "passed"}, {"id": "TC-002", "status": "failed"}],
+        defects_found=["BUG-900"],
+        blockers=[],
+    )
+
+    return [
+        Scenario("TestCaseGenerator.generate_test_cases",
+                 lambda i: generator.generate_test_cases(requirement(i), count=3)),
+        Scenario("TestCaseGenerator.generate_test_cases_stream",
+                 lambda i: generator.generate_test_cases_stream(requirement(i), count=3), streaming=True),
+        Scenario("TestCaseGenerator.generate_test_cases_structured",
+                 lambda i: generator.generate_test_cases_structured(requirement(i), count=3)),
+        Scenario("TestCaseGenerator.generate_test_cases_iter",
+                 lambda i: generator.generate_test_cases_iter(requirement(i), count=3, structured=True),
+                 streaming=True),
+        Scenario("TestCaseGenerator.generate_test_cases_batch",
+                 lambda i: generator.generate_test_cases_batch(
+                     [f"{requirement(i)} #{n}" for n in range(8)], concurrency=4, count=3)),
+        Scenario("TestCaseGenerator.enhance_test_case",
+                 lambda i: generator.enhance_test_case(f"{SAMPLE_TEST_CASE}\nRun {i}")),
+        Scenario("TestCaseGenerator.enhance_test_case_stream",
+                 lambda i: generator.enhance_test_case_stream(f"{SAMPLE_TEST_CASE}\nRun {i}"), streaming=True),
+        Scenario("TestCaseGenerator.generate_from_code",
+                 lambda i: generator.generate_from_code(f"{SAMPLE_CODE}// run {i}")),
+        Scenario("TestCaseGenerator.generate_from_code_stream",
+                 lambda i: generator.generate_from_code_stream(f"{SAMPLE_CODE}// run {i}"), streaming=True),
+        Scenario("BugAnalyzer.analyze_bug",
+                 lambda i: analyzer.analyze_bug(bug(i))),
+        Scenario("BugAnalyzer.analyze_bug_stream",
+                 lambda i: analyzer.analyze_bug_stream(bug(i)), streaming=True),
+        Scenario("BugAnalyzer.analyze_bug_structured",
+                 lambda i: analyzer.analyze_bug_structured(bug(i))),
+        Scenario("BugAnalyzer.compare_bugs",
+                 lambda i: analyzer.compare_bugs(bug(i), bug(i + 1))),
+        Scenario("BugAnalyzer.compare_bugs_stream",
+                 lambda i: analyzer.compare_bugs_stream(bug(i), bug(i + 1)), streaming=True),
+        Scenario("BugAnalyzer.generate_bug_report",
+                 lambda i: analyzer.generate_bug_report(f"Checkout fails with coupon (run {i})",
+                                                        "1. Apply coupon\n2. Place order", "Chrome 126")),
+        Scenario("BugAnalyzer.generate_bug_report_stream",
+                 lambda i: analyzer.generate_bug_report_stream(f"Checkout fails with coupon (run {i})",
+                                                               "1. Apply coupon\n2. Place order", "Chrome 126"),
+                 streaming=True),
+        Scenario("BugAnalyzer.prioritize_bugs",
+                 lambda i: analyzer.prioritize_bugs(backlog(i))),
+        Scenario("BugAnalyzer.prioritize_bugs_stream",
+                 lambda i: analyzer.prioritize_bugs_stream(backlog(i)), streaming=True),
+        Scenario("BugAnalyzer.triage_bugs",
+                 lambda i: analyzer.triage_bugs(backlog(i), escalate=True)),
+        Scenario("BugAnalyzer.find_duplicates",
+                 lambda i: analyzer.find_duplicates(backlog(i), max_pairs=20)),
+        Scenario("TestExecutionAssistant.get_execution_guidance",
+                 lambda i: assistant.get_execution_guidance(f"Checkout plan {i}", "4 hours", "Payments")),
+        Scenario("TestExecutionAssistant.get_execution_guidance_stream",
+                 lambda i: assistant.get_execution_guidance_stream(f"Checkout plan {i}", "4 hours", "Payments"),
+                 streaming=True),
+        Scenario("TestExecutionAssistant.generate_daily_report",
+                 lambda i: assistant.generate_daily_report(**{**report_args, "blockers": [f"Env down {i}"]})),
+        Scenario("TestExecutionAssistant.generate_daily_report_stream",
+                 lambda i: assistant.generate_daily_report_stream(**{**report_args, "blockers": [f"Env down {i}"]}),
+                 streaming=True),
+        Scenario("TestExecutionAssistant.analyze_failure",
+                 lambda i: assistant.analyze_failure(f"TC-{i}", "Order placed", "Nothing happens")),
+        Scenario("TestExecutionAssistant.analyze_failure_stream",
+                 lambda i: assistant.analyze_failure_stream(f"TC-{i}", "Order placed", "Nothing happens"),
+                 streaming=True),
+    ]
+
+
+async def run_scenario(
+    scenario: Scenario,
+    iterations: int,
+    concurrency: int,
+    trace_memory: bool = False
+) -> BenchmarkResult:
+    """
+    Run a scenario ``iterations`` times with at most ``concurrency`` in flight.
+
+    Args:
+        scenario: Operation to measure
+        iterations: Number of calls
+        concurrency: Calls in flight at once
+        trace_memory: Record the tracemalloc peak (slows the run down)
+
+    Returns:
+        Latencies, time to first chunk for streams, errors and memory
+    """
+    result = BenchmarkResult(scenario.name, iterations, concurrency, wall_seconds=0.0)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                if scenario.streaming:
+                    first = None
+                    async for _ in scenario.call(i):
+                        if first is None:
+                            first = time.perf_counter() - start
+                    if first is not None:
+                        result.ttfts.append(first)
+                else:
+                    await scenario.call(i)
+            except Exception as e:
+                result.errors += 1
+                result.first_error = result.first_error or f"{type(e).__name__}: {e}"
+                return
+            result.latencies.append(time.perf_counter() - start)
+
+    if trace_memory:
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(iterations)))
+    result.wall_seconds = time.perf_counter() - start
+    if trace_memory:
+        result.peak_memory_kb = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+    return result
+
+
+# ============= CLI Scenarios =============
+
+def cli_scenarios(workdir: Path) -> List[Dict[str, Any]]:
+    """CLI invocations (arguments and optional stdin) with their input files."""
+    bug_dir = workdir / "bugs"
+    bug_dir.mkdir(exist_ok=True)
+    for n in range(20):
+        (bug_dir / f"BUG-{n:03d}.md").write_text(f"{SAMPLE_BUG}\nVariant {n}", encoding="utf-8")
+
+    requirements = workdir / "requirements.jsonl"
+    requirements.write_text(
+        "".join(json.dumps({"requirement": f"Users can export report #{n}"}) + "\n" for n in range(8)),
+        encoding="utf-8"
+    )
+    eval_data = workdir / "eval.jsonl"
+    eval_data.write_text(
+        "".join(json.dumps({"test_case": SAMPLE_TEST_CASE, "requirement": "Login"}) + "\n" for _ in range(200)),
+        encoding="utf-8"
+    )
+    crash_log = workdir / "crashes.log"
+    crash_log.write_text(SAMPLE_CRASH * 100, encoding="utf-8")
+    out = workdir / "out"
+    out.mkdir(exist_ok=True)
+
+    return [
+        {"name": "cli generate", "args": ["generate", "Password reset via email", "-n", "3", "-o", str(out / "tc.md")]},
+        {"name": "cli generate-batch", "args": ["generate-batch", str(requirements), "-d", str(out), "-n", "3"]},
+        {"name": "cli generate --structured", "args": ["generate", "Password reset via email", "-n", "3", "--structured"]},
+        {"name": "cli analyze-bug", "args": ["analyze-bug", str(bug_dir / "BUG-000.md"), "-o", str(out / "a.md")]},
+        {"name": "cli analyze-bug --json", "args": ["analyze-bug", str(bug_dir / "BUG-000.md"), "--json"]},
+        {"name": "cli create-bug", "args": ["create-bug", "Checkout fails", "-s", "Apply coupon", "-o", str(out / "b.md")]},
+        {"name": "cli triage", "args": ["triage", str(bug_dir), "--escalate", "-o", str(out / "t.jsonl")]},
+        {"name": "cli find-duplicates",
+         "args": ["find-duplicates", str(bug_dir), "--max-pairs", "20", "-o", str(out / "d.jsonl")]},
+        {"name": "cli related", "args": ["related", str(bug_dir / "BUG-000.md"), "--bug-dir", str(bug_dir)]},
+        {"name": "cli similar", "args": ["similar", "Checkout button does nothing after a coupon", "--dir", str(bug_dir)]},
+        {"name": "cli crashes", "args": ["crashes", str(crash_log), "--bug-dir", str(bug_dir), "-o", str(out / "c.jsonl")]},
+        {"name": "cli guide", "args": ["guide", "Checkout plan", "-p", "Payments"]},
+        {"name": "cli chat", "args": ["chat"], "stdin": "Start with checkout\nquit\n"},
+        {"name": "cli evaluate", "args": ["evaluate", str(eval_data), "-o", str(out / "eval.json")]},
+    ]
+
+
+def run_cli_scenario(
+    name: str,
+    args: List[str],
+    iterations: int,
+    env: Dict[str, str],
+    cwd: Path,
+    stdin: Optional[str] = None
+) -> BenchmarkResult:
+    """
+    Run a CLI command in fresh processes.
+
+    Latency includes interpreter start-up. Peak memory is the largest
+    child RSS, where the platform reports it.
+    """
+    result = BenchmarkResult(name, iterations, concurrency=1, wall_seconds=0.0)
+    peak_rss = 0.0
+    start_all = time.perf_counter()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, str(CLI_PATH), "--no-cache", *args],
+            stdin=subprocess.PIPE if stdin is not None else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            env=env,
+            cwd=cwd,
+        )
+        if stdin is not None:
+            proc.stdin.write(stdin.encode())
+            proc.stdin.close()
+        output = proc.stdout.read().decode(errors="replace")
+        if hasattr(os, "wait4"):
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            # ru_maxrss is KiB on Linux, bytes on macOS
+            rss = usage.ru_maxrss / 1024 if sys.platform == "darwin" else usage.ru_maxrss
+            peak_rss = max(peak_rss, rss)
+        else:
+            proc.wait()
+        elapsed = time.perf_counter() - start
+
+        if proc.returncode != 0:
+            result.errors += 1
+            lines = output.strip().splitlines()
+            result.first_error = result.first_error or f"exit {proc.returncode}: {lines[-1] if lines else ''}"
+        else:
+            result.latencies.append(elapsed)
+    result.wall_seconds = time.perf_counter() - start_all
+    result.peak_memory_kb = peak_rss or None
+    return result
+
+
+# ============= Reporting =============
+
+def _fmt(value: Optional[float], scale: float = 1000, unit: str = "ms") -> str:
+    return "-" if value is None else f"{value * scale:,.1f}{unit}"
+
+
+def print_report(summaries: List[Dict[str, Any]]):
+    """Print summaries as an aligned table."""
+    headers = ["scenario", "n", "conc", "err", "p50", "p95", "p99", "ttft p50", "ops/s", "peak mem"]
+    rows = [
+        [
+            s["name"], str(s["iterations"]), str(s["concurrency"]), str(s["errors"]),
+            _fmt(s["p50"]), _fmt(s["p95"]), _fmt(s["p99"]), _fmt(s["ttft_p50"]),
+            _fmt(s["throughput"], 1, ""), _fmt(s["peak_memory_kb"], 1, " KiB"),
+        ]
+        for s in summaries
+    ]
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *rows)]
+    for line in [headers, ["-" * w for w in widths], *rows]:
+        print("  ".join(cell.ljust(w) if i == 0 else cell.rjust(w) for i, (cell, w) in enumerate(zip(line, widths))))
+    for s in summaries:
+        if s["first_error"]:
+            print(f"❌ {s['name']}: {s['errors']} errors, first: {s['first_error']}")
+
+
+def compare_to_baseline(
+    summaries: List[Dict[str, Any]],
+    baseline: Dict[str, Any],
+    tolerance: float = 0.2,
+    min_delta: float = 0.005
+) -> List[str]:
+    """
+    Find p95 latency regressions against a previous run.
+
+    A scenario regresses when its p95 exceeds the baseline by more than
+    ``tolerance`` (relative) and ``min_delta`` seconds (absolute, to ignore
+    jitter on very fast scenarios).
+    """
+    previous = {s["name"]: s for s in baseline.get("results", [])}
+    regressions = []
+    for s in summaries:
+        old = previous.get(s["name"])
+        if not old or old.get("p95") is None or s["p95"] is None:
+            continue
+        if s["p95"] > old["p95"] * (1 + tolerance) and s["p95"] - old["p95"] > min_delta:
+            regressions.append(f"{s['name']}: p95 {_fmt(old['p95'])} -> {_fmt(s['p95'])}")
+    return regressions
+
+
+# ============= Entry Point =============
+
+async def run_agent_benchmarks(
+    server: MockLLMServer,
+    iterations: int,
+    concurrency: int,
+    only: Optional[str],
+    trace_memory: bool,
+    use_cache: bool
+) -> List[BenchmarkResult]:
+    """Benchmark every agent scenario in this process against the mock server."""
+    from cache import get_response_cache
+    from client_pool import close_clients
+    from scheduler import configure_scheduler
+
+    config = ModelConfig(base_url=server.base_url, api_key="mock")
+    get_response_cache().enabled = use_cache
+    # Lift rate limits so the pipeline, not the free-tier quota, is measured
+    configure_scheduler(config.model_id, RateLimitConfig(
+        requests_per_minute=1_000_000,
+        tokens_per_minute=1_000_000_000,
+        max_concurrency=max(64, concurrency * 8),
+    ))
+
+    results = []
+    try:
+        for scenario in agent_scenarios(config):
+            if only and only not in scenario.name:
+                continue
+            results.append(await run_scenario(scenario, iterations, concurrency, trace_memory))
+    finally:
+        await close_clients()
+    return results
+
+
+def main():
+    """Run the suite and report."""
+    parser = argparse.ArgumentParser(description="End-to-end benchmarks against the mock LLM server")
+    parser.add_argument("--iterations", "-n", type=int, default=20, help="Calls per agent scenario")
+    parser.add_argument("--concurrency", "-j", type=int, default=1, help="Agent calls in flight at once")
+    parser.add_argument("--cli-iterations", type=int, default=3, help="Runs per CLI command")
+    parser.add_argument("--only", help="Run scenarios whose name contains this text")
+    parser.add_argument("--skip-agents", action="store_true", help="Skip in-process agent scenarios")
+    parser.add_argument("--skip-cli", action="store_true", help="Skip CLI command scenarios")
+    parser.add_argument("--ttft", type=float, default=0.05, help="Mock time to first chunk (s)")
+    parser.add_argument("--chunk-delay", type=float, default=0.002, help="Mock delay between chunks (s)")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Mock a 429 every Nth request")
+    parser.add_argument("--trace-memory", action="store_true", help="Record tracemalloc peaks per agent scenario")
+    parser.add_argument("--cache", action="store_true", help="Leave the response cache enabled")
+    parser.add_argument("--output", "-o", help="Write results as JSON")
+    parser.add_argument("--baseline", help="Previous JSON results; exit 1 on p95 regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative p95 regression")
+    args = parser.parse_args()
+
+    server = MockLLMServer(MockServerConfig(
+        ttft=args.ttft,
+        inter_chunk_delay=args.chunk_delay,
+        responses=MOCK_RESPONSES,
+        rate_limit_every=args.rate_limit_every,
+    ))
+    server.start_in_thread()
+
+    results: List[BenchmarkResult] = []
+    try:
+        if not args.skip_agents:
+            results += asyncio.run(run_agent_benchmarks(
+                server, args.iterations, args.concurrency, args.only, args.trace_memory, args.cache
+            ))
+
+        if not args.skip_cli:
+            env = {**os.environ, "QA_MODEL_BASE_URL": server.base_url, "GITHUB_TOKEN": "mock"}
+            with tempfile.TemporaryDirectory(prefix="qa-bench-") as tmp:
+                for spec in cli_scenarios(Path(tmp)):
+                    if args.only and args.only not in spec["name"]:
+                        continue
+                    results.append(run_cli_scenario(
+                        spec["name"], spec["args"], args.cli_iterations, env, Path(tmp), spec.get("stdin")
+                    ))
+    finally:
+        server.stop_thread()
+
+    summaries = [r.summary() for r in results]
+    print_report(summaries)
+    print(f"\nMock server: {asdict(server.stats)}")
+
+    if args.output:
+        report = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "iterations": args.iterations,
+                "concurrency": args.concurrency,
+                "ttft": args.ttft,
+                "chunk_delay": args.chunk_delay,
+            },
+            "results": summaries,
+        }
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"✅ Results saved to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare_to_baseline(summaries, baseline, args.tolerance)
+        for line in regressions:
+            print(f"❌ Regression: {line}")
+        if regressions:
+            sys.exit(1)
+        print("✅ No p95 regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Response Cache for AI QA Agents
+Content-addressed, two-tier (memory LRU + SQLite) cache for agent LLM calls
+"""
+import hashlib
+import inspect
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+from config import CacheConfig, QAConfig
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for a response cache"""
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def _tool_signature(tool: Callable) -> str:
+    """Describe a tool by name and signature so tool changes invalidate the cache."""
+    name = getattr(tool, "__name__", repr(tool))
+    try:
+        return f"{name}{inspect.signature(tool)}"
+    except (TypeError, ValueError):
+        return name
+
+
+def make_cache_key(
+    model_id: str,
+    instructions: str,
+    tools: Iterable[Callable],
+    prompt: str,
+    tools_state: str = ""
+) -> str:
+    """
+    Build a content-addressed key for an agent call.
+
+    Args:
+        model_id: Model the prompt is sent to
+        instructions: Agent system instructions
+        tools: Tools registered on the agent
+        prompt: User prompt
+        tools_state: Version of the data the tools read (e.g. a corpus
+            index), so answers are refreshed when that data changes
+
+    Returns:
+        Hex SHA-256 digest identifying the call
+    """
+    digest = hashlib.sha256()
+    parts = [model_id, instructions, *sorted(_tool_signature(t) for t in tools), prompt]
+    if tools_state:
+        parts.append(tools_state)
+    for part in parts:
+        data = part.encode("utf-8")
+        # Length-prefix each part so boundaries cannot collide
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier cache for agent responses.
+
+    Tiers:
+    - Memory: bounded LRU of recently used responses
+    - Disk: SQLite database shared across runs
+
+    Entries expire after ``ttl_seconds``; both tiers evict least recently
+    used entries once they exceed their size limits.
+    """
+
+    def __init__(self, config: Optional[CacheConfig] = None):
+        self.config = config or CacheConfig()
+        self.enabled = self.config.enabled
+        self.stats = CacheStats()
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    @property
+    def path(self) -> str:
+        """Location of the SQLite database."""
+        directory = self.config.directory or os.path.join(QAConfig.output_dir, "cache")
+        return os.path.join(directory, "responses.sqlite3")
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed_at)"
+            )
+            self._db.commit()
+        return self._db
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.config.ttl_seconds > 0 and now - created_at > self.config.ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for ``key`` or None."""
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if not self._expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self.stats.memory_hits += 1
+                    return value
+                del self._memory[key]
+
+            db = self._connect()
+            row = db.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                value, created_at = row
+                if not self._expired(created_at, now):
+                    db.execute(
+                        "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+                    )
+                    db.commit()
+                    self._remember(key, value, created_at)
+                    self.stats.disk_hits += 1
+                    return value
+                db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                db.commit()
+
+            self.stats.misses += 1
+            return None
+
+    def set(self, key: str, value: str):
+        """Store a response in both tiers."""
+        if not self.enabled:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+
+            db = self._connect()
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            self._evict_disk(db, now)
+            db.commit()
+            self.stats.writes += 1
+
+    def _remember(self, key: str, value: str, created_at: float):
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.config.memory_max_entries:
+            self._memory.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _evict_disk(self, db: sqlite3.Connection, now: float):
+        if self.config.ttl_seconds > 0:
+            cursor = db.execute(
+                "DELETE FROM responses WHERE created_at < ?",
+                (now - self.config.ttl_seconds,)
+            )
+            self.stats.evictions += max(cursor.rowcount, 0)
+
+        (count,) = db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        overflow = count - self.config.disk_max_entries
+        if overflow > 0:
+            cursor = db.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                (overflow,)
+            )
+            self.stats.evictions += max(cursor.rowcount, 0)
+
+    def clear(self):
+        """Remove every cached response."""
+        with self._lock:
+            self._memory.clear()
+            self._connect().execute("DELETE FROM responses")
+            self._db.commit()
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide response cache used by agents by default."""
+    global _response_cache
+
+    if _response_cache is None:
+        _response_cache = ResponseCache()
+    return _response_cache
+
+
+def set_response_cache(cache: ResponseCache):
+    """Replace the process-wide response cache."""
+    global _response_cache
+    _response_cache = cache
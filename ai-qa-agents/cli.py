@@ -6,6 +6,7 @@ Provides easy access to all AI agents and tools
 import asyncio
 import sys
 import os
+import time
 from pathlib import Path
 from typing import Optional
 
@@ -14,6 +15,7 @@ try:
     from rich.console import Console
     from rich.panel import Panel
     from rich.markdown import Markdown
+    from rich.live import Live
     from rich.progress import Progress, SpinnerColumn, TextColumn
     from rich.prompt import Prompt, Confirm
     from rich.table import Table
@@ -76,6 +78,133 @@ def check_github_token() -> bool:
     return True
 
 
+def run_async(coro):
+    """Run a command coroutine and close the shared model clients afterwards."""
+    async def runner():
+        from client_pool import close_clients
+        try:
+            return await coro
+        finally:
+            await close_clients()
+
+    return asyncio.run(runner())
+
+
+if app:
+    @app.callback()
+    def main_options(
+        no_cache: bool = typer.Option(False, "--no-cache", help="Bypass the agent response cache"),
+        route: bool = typer.Option(False, "--route", help="Pick the cheapest adequate model per task"),
+    ):
+        """🤖 AI-Powered QA Testing Framework"""
+        if no_cache:
+            from cache import get_response_cache
+            get_response_cache().enabled = False
+        if route:
+            from router import get_model_router
+            get_model_router().config.enabled = True
+
+
+async def _render_stream(chunks, output: Optional[str], label: str = "Output") -> str:
+    """
+    Render an agent response stream as it arrives.
+    
+    Chunks are shown live in the terminal (as markdown when rich is available)
+    and appended to the output file as they are received.
+    
+    Returns:
+        The complete response text
+    """
+    parts = []
+    out_file = open(output, "w", encoding="utf-8") if output else None
+    try:
+        if console:
+            with Live(Markdown(""), console=console, vertical_overflow="visible") as live:
+                last_render = 0.0
+                async for chunk in chunks:
+                    parts.append(chunk)
+                    if out_file:
+                        out_file.write(chunk)
+                        out_file.flush()
+                    # Re-parsing markdown on every token is costly; throttle redraws
+                    now = time.monotonic()
+                    if now - last_render >= 0.1:
+                        live.update(Markdown("".join(parts)))
+                        last_render = now
+                live.update(Markdown("".join(parts)))
+        else:
+            async for chunk in chunks:
+                parts.append(chunk)
+                print(chunk, end="", flush=True)
+                if out_file:
+                    out_file.write(chunk)
+                    out_file.flush()
+            print()
+    finally:
+        if out_file:
+            out_file.close()
+    
+    if output:
+        if console:
+            console.print(f"[green]✅ {label} saved to {output}[/green]")
+        else:
+            print(f"✅ {label} saved to {output}")
+    
+    return "".join(parts)
+
+
+async def _render_structured(result, output: Optional[str], label: str, as_json: bool):
+    """
+    Show a structured agent result as JSON or locally rendered markdown.
+    
+    Args:
+        result: Awaitable returning a dataclass, or an async iterator of
+            dataclasses (each shown as soon as it arrives)
+        output: File to save the rendered result to
+        label: Name used in status messages
+        as_json: Emit JSON instead of markdown
+    """
+    import json
+    from contextlib import nullcontext
+    from dataclasses import asdict
+    
+    def show(item):
+        if as_json:
+            text = json.dumps(asdict(item), indent=2, ensure_ascii=False)
+        else:
+            text = item.to_markdown()
+        if console and as_json:
+            console.print(text, markup=False, highlight=False)
+        elif console:
+            console.print(Markdown(text))
+        else:
+            print(text)
+    
+    if hasattr(result, "__aiter__"):
+        items = []
+        async for item in result:
+            items.append(item)
+            show(item)
+        value = items
+    else:
+        with console.status(f"Generating {label.lower()}...") if console else nullcontext():
+            value = await result
+        show(value)
+    
+    if output:
+        if as_json:
+            data = [asdict(item) for item in value] if isinstance(value, list) else asdict(value)
+            text = json.dumps(data, indent=2, ensure_ascii=False) + "\n"
+        else:
+            items = value if isinstance(value, list) else [value]
+            text = "\n---\n\n".join(item.to_markdown() for item in items)
+        Path(output).write_text(text, encoding="utf-8")
+        if console:
+            console.print(f"[green]✅ {label} saved to {output}[/green]")
+        else:
+            print(f"✅ {label} saved to {output}")
+
+
 # ============= Test Case Generator Commands =============
 
 if app:
@@ -87,14 +216,16 @@ if app:
         output: Optional[str] = typer.Option(None, "--output", "-o", help="Output file path"),
         no_security: bool = typer.Option(False, "--no-security", help="Skip security tests"),
         no_negative: bool = typer.Option(False, "--no-negative", help="Skip negative tests"),
+        structured: bool = typer.Option(False, "--structured", help="Request compact JSON and render markdown locally"),
+        as_json: bool = typer.Option(False, "--json", help="Output structured JSON (implies --structured)"),
     ):
         """🧪 Generate test cases from a requirement."""
         if not check_github_token():
             raise typer.Exit(1)
         
-        asyncio.run(_generate_test_cases(
+        run_async(_generate_test_cases(
             requirement, component, count, output, 
-            not no_security, not no_negative
+            not no_security, not no_negative, structured or as_json, as_json
         ))
 
 
@@ -104,53 +235,160 @@ async def _generate_test_cases(
     count: int,
     output: Optional[str],
     include_security: bool,
-    include_negative: bool
+    include_negative: bool,
+    structured: bool = False,
+    as_json: bool = False
 ):
     """Async implementation of test case generation."""
     from agents import TestCaseGeneratorAgent
     from config import ModelConfig
     
-    if console:
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console
-        ) as progress:
-            task = progress.add_task("Generating test cases...", total=None)
-            
-            agent = TestCaseGeneratorAgent(ModelConfig())
-            result = await agent.generate_test_cases(
+    agent = TestCaseGeneratorAgent(ModelConfig())
+    if structured:
+        await _render_structured(
+            agent.generate_test_cases_iter(
                 requirement=requirement,
                 component=component,
                 count=count,
+                include_negative=include_negative,
                 include_security=include_security,
-                include_negative=include_negative
-            )
-            
-            progress.remove_task(task)
-    else:
-        print("Generating test cases...")
-        agent = TestCaseGeneratorAgent()
-        result = await agent.generate_test_cases(
+                structured=True
+            ),
+            output,
+            "Test cases",
+            as_json
+        )
+        return
+    await _render_stream(
+        agent.generate_test_cases_stream(
             requirement=requirement,
             component=component,
             count=count,
-            include_security=include_security,
-            include_negative=include_negative
-        )
-    
-    # Output result
-    if output:
-        Path(output).write_text(result)
-        if console:
-            console.print(f"[green]✅ Test cases saved to {output}[/green]")
+            include_negative=include_negative,
+            include_security=include_security
+        ),
+        output,
+        "Test cases"
+    )
+
+
+def _load_requirements(path: str) -> list:
+    """Load requirements from a JSONL or CSV file."""
+    import csv
+    import json
+
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            rows = list(csv.DictReader(f))
         else:
-            print(f"✅ Test cases saved to {output}")
-    else:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    return [row for row in rows if row.get("requirement")]
+
+
+if app:
+    @app.command("generate-batch")
+    def generate_batch(
+        requirements_file: str = typer.Argument(..., help="JSONL or CSV file with a 'requirement' column"),
+        output_dir: Optional[str] = typer.Option(None, "--output-dir", "-d", help="Directory for generated files"),
+        concurrency: int = typer.Option(4, "--concurrency", "-j", help="Requirements processed in parallel"),
+        count: int = typer.Option(5, "--count", "-n", help="Test cases per requirement"),
+        no_security: bool = typer.Option(False, "--no-security", help="Skip security tests"),
+        no_negative: bool = typer.Option(False, "--no-negative", help="Skip negative tests"),
+        no_dedup: bool = typer.Option(False, "--no-dedup", help="Keep near-duplicate test cases"),
+        flag_duplicates: bool = typer.Option(False, "--flag-duplicates", help="Mark near-duplicates instead of dropping them"),
+        dedup_threshold: float = typer.Option(0.8, "--dedup-threshold", help="Similarity treated as a duplicate"),
+    ):
+        """📚 Generate test cases for many requirements in parallel."""
+        if not check_github_token():
+            raise typer.Exit(1)
+
+        if not Path(requirements_file).exists():
+            if console:
+                console.print(f"[red]❌ File not found: {requirements_file}[/red]")
+            else:
+                print(f"❌ File not found: {requirements_file}")
+            raise typer.Exit(1)
+
+        run_async(_generate_batch(
+            requirements_file, output_dir, concurrency, count,
+            not no_security, not no_negative,
+            None if no_dedup else dedup_threshold, flag_duplicates
+        ))
+
+
+async def _generate_batch(
+    requirements_file: str,
+    output_dir: Optional[str],
+    concurrency: int,
+    count: int,
+    include_security: bool,
+    include_negative: bool,
+    dedup_threshold: Optional[float] = 0.8,
+    flag_duplicates: bool = False
+):
+    """Async implementation of batch test case generation."""
+    from agents import TestCaseGeneratorAgent
+    from analysis.dedup import TestCaseDeduplicator
+    from config import ModelConfig, QAConfig
+
+    requirements = _load_requirements(requirements_file)
+    out_dir = Path(output_dir or os.path.join(QAConfig.output_dir, "generated"))
+    out_dir.mkdir(parents=True, exist_ok=True)
+    # Near-duplicates are checked against the test-cases corpus and the batch so far
+    dedup = TestCaseDeduplicator.from_corpus(threshold=dedup_threshold) if dedup_threshold is not None else None
+    duplicates = []
+
+    def write_result(result):
+        # Each file is written as soon as its requirement completes
+        if result.error:
+            message = f"❌ {result.item_id} failed after {result.latency_seconds:.1f}s: {result.error}"
+        else:
+            content = result.content
+            if dedup:
+                content, found = dedup.filter_markdown(content, result.item_id, flag=flag_duplicates)
+                duplicates.extend(found)
+            target = out_dir / f"{result.item_id}.md"
+            target.write_text(content)
+            message = f"✅ {result.item_id} → {target} ({result.latency_seconds:.1f}s)"
+            if dedup and found:
+                action = "flagged" if flag_duplicates else "dropped"
+                message += f", {len(found)} near-duplicates {action}"
         if console:
-            console.print(Markdown(result))
+            console.print(message, markup=False)
         else:
-            print(result)
+            print(message)
+
+    agent = TestCaseGeneratorAgent(ModelConfig())
+    results = await agent.generate_test_cases_batch(
+        requirements,
+        concurrency=concurrency,
+        count=count,
+        include_negative=include_negative,
+        include_security=include_security,
+        on_result=write_result
+    )
+
+    latencies = sorted(r.latency_seconds for r in results if not r.error)
+    failed = sum(1 for r in results if r.error)
+
+    if console:
+        table = Table(title="Batch Generation")
+        table.add_column("Metric")
+        table.add_column("Value")
+        table.add_row("Requirements", str(len(results)))
+        table.add_row("Failed", str(failed))
+        if dedup:
+            table.add_row("Near-duplicates " + ("flagged" if flag_duplicates else "dropped"), str(len(duplicates)))
+        if latencies:
+            table.add_row("Latency (mean)", f"{sum(latencies) / len(latencies):.1f}s")
+            table.add_row("Latency (p95)", f"{latencies[int(0.95 * (len(latencies) - 1))]:.1f}s")
+            table.add_row("Latency (max)", f"{latencies[-1]:.1f}s")
+        console.print(table)
+    else:
+        print(f"Generated {len(results) - failed}/{len(results)} requirements into {out_dir}")
+        if dedup:
+            print(f"{len(duplicates)} near-duplicate test cases {'flagged' if flag_duplicates else 'dropped'}")
 
 
 # ============= Bug Analyzer Commands =============
@@ -160,55 +398,52 @@ if app:
     def analyze_bug(
         bug_file: str = typer.Argument(..., help="Path to bug report file"),
         output: Optional[str] = typer.Option(None, "--output", "-o", help="Output file path"),
+        structured: bool = typer.Option(False, "--structured", help="Request compact JSON and render markdown locally"),
+        as_json: bool = typer.Option(False, "--json", help="Output structured JSON (implies --structured)"),
+        log: Optional[str] = typer.Option(None, "--log", help="Log file to attach; large logs are excerpted around their errors"),
     ):
         """🔍 Analyze a bug report."""
+        from analysis.logs import excerpt_log
+        from config import LogConfig
+        
         if not check_github_token():
             raise typer.Exit(1)
         
-        if not Path(bug_file).exists():
-            if console:
-                console.print(f"[red]❌ File not found: {bug_file}[/red]")
-            else:
-                print(f"❌ File not found: {bug_file}")
-            raise typer.Exit(1)
+        for path in filter(None, (bug_file, log)):
+            if not Path(path).exists():
+                if console:
+                    console.print(f"[red]❌ File not found: {path}[/red]")
+                else:
+                    print(f"❌ File not found: {path}")
+                raise typer.Exit(1)
         
-        bug_content = Path(bug_file).read_text()
-        asyncio.run(_analyze_bug(bug_content, output))
+        # Reports with pasted logs can be huge; those are memory-mapped and cut down to an excerpt
+        bug_config = LogConfig(budget_bytes=64_000)
+        if Path(bug_file).stat().st_size > bug_config.budget_bytes:
+            bug_content = excerpt_log(bug_file, bug_config).text
+        else:
+            bug_content = Path(bug_file).read_text(encoding="utf-8", errors="replace")
+        if log:
+            bug_content += f"\n\n## Attached Log Excerpt\n\n```\n{excerpt_log(log).text}\n```\n"
+        run_async(_analyze_bug(bug_content, output, structured or as_json, as_json, Path(bug_file).stem))
 
 
-async def _analyze_bug(bug_content: str, output: Optional[str]):
+async def _analyze_bug(
+    bug_content: str,
+    output: Optional[str],
+    structured: bool = False,
+    as_json: bool = False,
+    bug_id: str = ""
+):
     """Async implementation of bug analysis."""
     from agents import BugAnalyzerAgent
     from config import ModelConfig
     
-    if console:
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console
-        ) as progress:
-            task = progress.add_task("Analyzing bug report...", total=None)
-            
-            agent = BugAnalyzerAgent(ModelConfig())
-            result = await agent.analyze_bug(bug_content)
-            
-            progress.remove_task(task)
-    else:
-        print("Analyzing bug report...")
-        agent = BugAnalyzerAgent()
-        result = await agent.analyze_bug(bug_content)
-    
-    if output:
-        Path(output).write_text(result)
-        if console:
-            console.print(f"[green]✅ Analysis saved to {output}[/green]")
-        else:
-            print(f"✅ Analysis saved to {output}")
-    else:
-        if console:
-            console.print(Markdown(result))
-        else:
-            print(result)
+    agent = BugAnalyzerAgent(ModelConfig())
+    if structured:
+        await _render_structured(agent.analyze_bug_structured(bug_content, bug_id), output, "Analysis", as_json)
+        return
+    await _render_stream(agent.analyze_bug_stream(bug_content), output, "Analysis")
 
 
 if app:
@@ -223,7 +458,7 @@ if app:
         if not check_github_token():
             raise typer.Exit(1)
         
-        asyncio.run(_create_bug_report(description, steps, environment, output))
+        run_async(_create_bug_report(description, steps, environment, output))
 
 
 async def _create_bug_report(
@@ -237,17 +472,334 @@ async def _create_bug_report(
     from config import ModelConfig
     
     agent = BugAnalyzerAgent(ModelConfig())
-    result = await agent.generate_bug_report(description, steps, environment)
+    await _render_stream(
+        agent.generate_bug_report_stream(description, steps, environment),
+        output,
+        "Bug report"
+    )
+
+
+if app:
+    @app.command("triage")
+    def triage_bugs(
+        bug_dir: str = typer.Argument(..., help="Directory of markdown bug reports"),
+        escalate: bool = typer.Option(False, "--escalate", help="Send low-confidence bugs to the model"),
+        min_confidence: float = typer.Option(0.5, "--min-confidence", help="Escalation threshold"),
+        output: Optional[str] = typer.Option(None, "--output", "-o", help="Write results as JSONL"),
+    ):
+        """⚡ Triage bug reports locally, without a model call."""
+        from analysis.corpus import iter_bug_files
+        
+        if not Path(bug_dir).is_dir():
+            if console:
+                console.print(f"[red]❌ Directory not found: {bug_dir}[/red]")
+            else:
+                print(f"❌ Directory not found: {bug_dir}")
+            raise typer.Exit(1)
+        if escalate and not check_github_token():
+            raise typer.Exit(1)
+        
+        files = iter_bug_files(bug_dir)
+        run_async(_triage_bugs(
+            [path.read_text(encoding="utf-8") for path in files],
+            [path.stem for path in files],
+            escalate, min_confidence, output
+        ))
+
+
+async def _triage_bugs(
+    reports: list,
+    bug_ids: list,
+    escalate: bool,
+    min_confidence: float,
+    output: Optional[str]
+):
+    """Async implementation of bug triage."""
+    import json
+    from dataclasses import asdict
+    from analysis.triage import get_triage_engine
+    
+    engine = get_triage_engine()
+    engine.min_confidence = min_confidence
+    
+    started = time.perf_counter()
+    if escalate:
+        from agents import BugAnalyzerAgent
+        from config import ModelConfig
+        
+        results = await BugAnalyzerAgent(ModelConfig()).triage_bugs(reports, bug_ids)
+    else:
+        results = [engine.triage(report, bug_id) for report, bug_id in zip(reports, bug_ids)]
+    elapsed = time.perf_counter() - started
     
     if output:
-        Path(output).write_text(result)
-        if console:
-            console.print(f"[green]✅ Bug report saved to {output}[/green]")
+        with open(output, "w", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(asdict(result)) + "\n")
+    
+    escalations = sum(1 for r in results if r.needs_escalation or r.source == "llm")
+    if console:
+        table = Table(title=f"Triage ({len(results)} bugs, {elapsed * 1000:.1f} ms)")
+        table.add_column("Bug")
+        table.add_column("Severity")
+        table.add_column("Category")
+        table.add_column("Confidence")
+        table.add_column("Source")
+        for r in results:
+            confidence = min(r.severity_confidence, r.category_confidence)
+            source = "needs LLM" if r.needs_escalation else r.source
+            table.add_row(r.bug_id, r.severity, r.category, f"{confidence:.0%}", source)
+        console.print(table)
+        console.print(f"{escalations} of {len(results)} bugs below {min_confidence:.0%} confidence")
+        if output:
+            console.print(f"[green]✅ Results saved to {output}[/green]")
     else:
+        for r in results:
+            print(f"{r.bug_id}: {r.severity} / {r.category} ({r.source})")
+
+
+if app:
+    @app.command("find-duplicates")
+    def find_duplicates(
+        bug_dir: str = typer.Argument(..., help="Directory of markdown bug reports"),
+        threshold: float = typer.Option(0.3, "--threshold", help="Minimum word overlap for a candidate pair (0-1)"),
+        concurrency: int = typer.Option(4, "--concurrency", "-c", help="Maximum confirmations in flight"),
+        max_pairs: Optional[int] = typer.Option(None, "--max-pairs", help="Confirm only the N most similar candidates"),
+        no_confirm: bool = typer.Option(False, "--no-confirm", help="Report candidate clusters without a model call"),
+        output: Optional[str] = typer.Option(None, "--output", "-o", help="Write every pair verdict as JSONL"),
+    ):
+        """👯 Find duplicate clusters in a directory of bug reports."""
+        from analysis.corpus import iter_bug_files
+        
+        if not Path(bug_dir).is_dir():
+            if console:
+                console.print(f"[red]❌ Directory not found: {bug_dir}[/red]")
+            else:
+                print(f"❌ Directory not found: {bug_dir}")
+            raise typer.Exit(1)
+        if not no_confirm and not check_github_token():
+            raise typer.Exit(1)
+        
+        files = iter_bug_files(bug_dir)
+        run_async(_find_duplicates(
+            [path.read_text(encoding="utf-8") for path in files],
+            [path.stem for path in files],
+            threshold, concurrency, max_pairs, not no_confirm, output
+        ))
+
+
+async def _find_duplicates(
+    reports: list,
+    bug_ids: list,
+    threshold: float,
+    concurrency: int,
+    max_pairs: Optional[int],
+    confirm: bool,
+    output: Optional[str]
+):
+    """Async implementation of duplicate detection."""
+    import json
+    from dataclasses import asdict
+    from agents import BugAnalyzerAgent
+    from config import ModelConfig
+    
+    # Without confirmation no model call is made, so no token is needed
+    agent = BugAnalyzerAgent(ModelConfig() if confirm else ModelConfig(api_key=os.getenv("GITHUB_TOKEN", "offline")))
+    started = time.perf_counter()
+    clusters, pairs = await agent.find_duplicates(
+        reports, bug_ids, threshold=threshold, concurrency=concurrency, max_pairs=max_pairs, confirm=confirm
+    )
+    elapsed = time.perf_counter() - started
+    
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            for pair in pairs:
+                f.write(json.dumps(asdict(pair)) + "\n")
+    
+    all_pairs = len(reports) * (len(reports) - 1) // 2
+    failed = sum(1 for pair in pairs if pair.error)
+    summary = (
+        f"{len(pairs)} candidate pairs of {all_pairs} checked"
+        f"{' by the model' if confirm else ''}, {len(clusters)} duplicate clusters ({elapsed:.1f}s)"
+        f"{f'; {failed} pairs unconfirmed after model errors' if failed else ''}"
+    )
+    if console:
+        table = Table(title="Duplicate clusters")
+        table.add_column("#")
+        table.add_column("Bugs")
+        table.add_column("Similarity")
+        table.add_column("Reason")
+        for n, cluster in enumerate(clusters, 1):
+            best = max(cluster.pairs, key=lambda pair: pair.similarity)
+            table.add_row(str(n), ", ".join(cluster.bug_ids), f"{best.similarity:.0%}", best.reason)
+        console.print(table)
+        console.print(summary)
+        if output:
+            console.print(f"[green]✅ Pair verdicts saved to {output}[/green]")
+    else:
+        for n, cluster in enumerate(clusters, 1):
+            print(f"{n}. {', '.join(cluster.bug_ids)}")
+        print(summary)
+
+
+if app:
+    @app.command("related")
+    def related_bugs(
+        query: str = typer.Argument(..., help="Bug title, error message or a bug report file"),
+        component: str = typer.Option("", "--component", "-c", help="Component where the bug was found"),
+        top_k: int = typer.Option(5, "--top", "-k", help="Number of results"),
+        bug_dir: Optional[str] = typer.Option(None, "--bug-dir", help="Bug reports directory (default: bug-reports)"),
+    ):
+        """🔗 Find related or duplicate bug reports, without a model call."""
+        from analysis.corpus import parse_bug_report
+        from analysis.search import BugIndex, bug_fields, get_bug_index
+        
+        exclude = []
+        if Path(query).is_file():
+            record = parse_bug_report(Path(query).read_text(encoding="utf-8"), query)
+            fields = bug_fields(record)
+            query = "\n".join(text for name, text in fields.items() if name != "component")
+            component = component or fields["component"]
+            exclude.append(record.bug_id)
+        
+        started = time.perf_counter()
+        index = BugIndex.from_corpus(bug_dir) if bug_dir else get_bug_index()
+        loaded = time.perf_counter()
+        matches = index.search(query, component=component, k=top_k, exclude=exclude)
+        elapsed = time.perf_counter() - loaded
+        
+        if console:
+            table = Table(
+                title=f"Related bugs ({len(index)} indexed, loaded in {(loaded - started) * 1000:.1f} ms, "
+                      f"searched in {elapsed * 1000:.1f} ms)"
+            )
+            table.add_column("Bug")
+            table.add_column("Title")
+            table.add_column("Component")
+            table.add_column("Status")
+            table.add_column("Score")
+            for match in matches:
+                table.add_row(
+                    match.bug_id, match.title, match.component or "", match.status or "", f"{match.score:.2f}"
+                )
+            console.print(table)
+        else:
+            for match in matches:
+                print(f"{match.bug_id}: {match.title} ({match.score:.2f})")
+
+
+if app:
+    @app.command("similar")
+    def similar(
+        query: str = typer.Argument(..., help="Query text or a markdown file"),
+        corpus: str = typer.Option("bug-reports", "--corpus", help="bug-reports or test-cases"),
+        top_k: int = typer.Option(5, "--top", "-k", help="Number of results"),
+        directory: Optional[str] = typer.Option(None, "--dir", help="Corpus directory (default from config)"),
+    ):
+        """🧭 Find similar bug reports or test cases with the local vector index."""
+        from analysis.vectors import VectorIndex, get_vector_index
+        
+        if Path(query).is_file():
+            query = Path(query).read_text(encoding="utf-8")
+        try:
+            started = time.perf_counter()
+            index = VectorIndex.from_corpus(corpus, directory) if directory else get_vector_index(corpus)
+            loaded = time.perf_counter()
+            matches = index.search([query], k=top_k)[0]
+        except (ImportError, ValueError) as e:
+            if console:
+                console.print(f"[red]❌ {e}[/red]")
+            else:
+                print(f"❌ {e}")
+            raise typer.Exit(1)
+        elapsed = time.perf_counter() - loaded
+        
+        if console:
+            table = Table(
+                title=f"Similar {corpus} ({len(index)} indexed, opened in {(loaded - started) * 1000:.1f} ms, "
+                      f"searched in {elapsed * 1000:.1f} ms)"
+            )
+            table.add_column("ID")
+            table.add_column("File")
+            table.add_column("Cosine")
+            for match in matches:
+                table.add_row(match.doc_id, match.path or "", f"{match.score:.3f}")
+            console.print(table)
+        else:
+            for match in matches:
+                print(f"{match.doc_id}: {match.path} ({match.score:.3f})")
+
+
+if app:
+    @app.command("crashes")
+    def group_crashes(
+        source: str = typer.Argument(..., help="Log file, directory of logs, or JSONL with a 'trace' field"),
+        bug_dir: Optional[str] = typer.Option(None, "--bug-dir", help="Bug reports directory (default: bug-reports)"),
+        output: Optional[str] = typer.Option(None, "--output", "-o", help="Write crash groups as JSONL"),
+    ):
+        """💥 Group stack traces by crash fingerprint and match them to known bugs."""
+        import json
+        from dataclasses import asdict
+        from analysis.stacktrace import CrashBucketIndex, get_crash_index, iter_stack_traces, parse_stack_trace
+        
+        path = Path(source)
+        if not path.exists():
+            if console:
+                console.print(f"[red]❌ Not found: {source}[/red]")
+            else:
+                print(f"❌ Not found: {source}")
+            raise typer.Exit(1)
+        
+        started = time.perf_counter()
+        if path.suffix == ".jsonl":
+            traces = []
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        item = json.loads(line)
+                        traces.append(parse_stack_trace(item["trace"] if isinstance(item, dict) else str(item)))
+        else:
+            files = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+            traces = [
+                trace for file in files
+                for trace in iter_stack_traces(file.read_text(encoding="utf-8", errors="replace"))
+            ]
+        
+        index = CrashBucketIndex.from_corpus(bug_dir) if bug_dir else get_crash_index()
+        groups = index.group(traces)
+        elapsed = time.perf_counter() - started
+        
+        if output:
+            with open(output, "w", encoding="utf-8") as f:
+                for group in groups:
+                    f.write(json.dumps(asdict(group)) + "\n")
+        
+        known = sum(group.count for group in groups if not group.is_new)
+        summary = (
+            f"{len(traces)} traces in {len(groups)} crash groups, "
+            f"{known} matched to known bugs ({elapsed * 1000:.0f} ms)"
+        )
         if console:
-            console.print(Markdown(result))
+            table = Table(title="Crash groups")
+            table.add_column("Fingerprint")
+            table.add_column("Count")
+            table.add_column("Exception")
+            table.add_column("Top frame")
+            table.add_column("Known bugs")
+            for group in groups:
+                table.add_row(
+                    group.fingerprint, str(group.count), group.exception_type, group.top_frame,
+                    ", ".join(group.bug_ids) or "[yellow]new[/yellow]"
+                )
+            console.print(table)
+            console.print(summary)
+            if output:
+                console.print(f"[green]✅ Crash groups saved to {output}[/green]")
         else:
-            print(result)
+            for group in groups:
+                print(f"{group.fingerprint} x{group.count} {group.exception_type} {group.top_frame} "
+                      f"{', '.join(group.bug_ids) or 'new'}")
+            print(summary)
 
 
 # ============= Test Execution Commands =============
@@ -263,7 +815,7 @@ if app:
         if not check_github_token():
             raise typer.Exit(1)
         
-        asyncio.run(_execution_guide(test_plan, time, priorities))
+        run_async(_execution_guide(test_plan, time, priorities))
 
 
 async def _execution_guide(test_plan: str, time: str, priorities: str):
@@ -272,31 +824,32 @@ async def _execution_guide(test_plan: str, time: str, priorities: str):
     from config import ModelConfig
     
     agent = TestExecutionAssistant(ModelConfig())
-    result = await agent.get_execution_guidance(test_plan, time, priorities)
-    
-    if console:
-        console.print(Markdown(result))
-    else:
-        print(result)
+    await _render_stream(
+        agent.get_execution_guidance_stream(test_plan, time, priorities),
+        None
+    )
 
 
 if app:
     @app.command("chat")
-    def interactive_chat():
+    def interactive_chat(
+        window: int = typer.Option(6, "--window", "-w", help="Recent turns kept verbatim"),
+        show_tokens: bool = typer.Option(False, "--show-tokens", help="Show prompt tokens per turn"),
+    ):
         """💬 Start interactive testing assistant chat."""
         if not check_github_token():
             raise typer.Exit(1)
         
-        asyncio.run(_interactive_chat())
+        run_async(_interactive_chat(window, show_tokens))
 
 
-async def _interactive_chat():
+async def _interactive_chat(window: int, show_tokens: bool):
     """Start interactive chat session."""
     from agents import TestExecutionAssistant
     from config import ModelConfig
     
     agent = TestExecutionAssistant(ModelConfig())
-    await agent.interactive_session()
+    await agent.interactive_session(max_turns=window, show_tokens=show_tokens)
 
 
 # ============= Evaluation Commands =============
@@ -309,9 +862,19 @@ if app:
                                        help="Evaluator to use: test-case, bug-report"),
         output: str = typer.Option("evaluation_results.json", "--output", "-o",
                                    help="Output file path"),
+        stream: bool = typer.Option(False, "--stream",
+                                    help="Append row results to a JSONL file as they are produced (constant memory)"),
+        resume: bool = typer.Option(False, "--resume",
+                                    help="Continue an interrupted --stream run from its last completed row"),
+        workers: int = typer.Option(1, "--workers", "-w",
+                                    help="Evaluate in parallel worker processes (0 = one per CPU core)"),
+        no_cache: bool = typer.Option(False, "--no-cache",
+                                      help="Re-score every row instead of reusing results from earlier runs"),
     ):
         """📊 Run evaluation on test data."""
-        from evaluation import TestCaseQualityEvaluator, BugReportQualityEvaluator, run_evaluation
+        from evaluation import (
+            TestCaseQualityEvaluator, BugReportQualityEvaluator, EvaluationCache, run_evaluation
+        )
         
         evaluators = {
             "test-case": TestCaseQualityEvaluator(),
@@ -323,11 +886,22 @@ if app:
                 console.print(f"[red]Unknown evaluator: {evaluator}[/red]")
             raise typer.Exit(1)
         
+        stream = stream or resume
+        if stream and output.endswith(".json"):
+            output += "l"
+        
+        cache = None if no_cache else EvaluationCache()
         results = run_evaluation(
             data_file,
             {evaluator: evaluators[evaluator]},
-            output
+            output,
+            stream=stream,
+            resume=resume,
+            workers=workers,
+            cache=cache
         )
+        if cache is not None:
+            cache.close()
         
         if console:
             table = Table(title="Evaluation Results")
@@ -339,6 +913,11 @@ if app:
                 table.add_row(f"{metric} (min)", f"{stats['min']:.2%}")
                 table.add_row(f"{metric} (max)", f"{stats['max']:.2%}")
             
+            if stream:
+                table.add_row("Rows", f"{results['rows']} ({results['rows_evaluated']} this run)")
+            if cache is not None:
+                table.add_row("Cached results", f"{cache.hits} reused, {cache.misses} computed")
+            
             console.print(table)
             console.print(f"[green]✅ Full results saved to {output}[/green]")
         else:
@@ -0,0 +1,90 @@
+"""
+Shared Model Client Pool for AI QA Agents
+One AsyncOpenAI connection pool per endpoint, reused by every agent
+"""
+import asyncio
+from typing import Dict, Optional, Tuple
+
+import httpx
+from agent_framework.openai import OpenAIChatClient
+from openai import AsyncOpenAI
+
+from config import ClientPoolConfig, ModelConfig
+
+_pool_config = ClientPoolConfig()
+_async_clients: Dict[Tuple[str, str], AsyncOpenAI] = {}
+_chat_clients: Dict[Tuple[str, str, str], OpenAIChatClient] = {}
+
+
+def configure_client_pool(config: ClientPoolConfig):
+    """
+    Set connection limits for clients created after this call.
+
+    Args:
+        config: Keep-alive and connection limits
+    """
+    global _pool_config
+    _pool_config = config
+
+
+def get_async_client(config: ModelConfig) -> AsyncOpenAI:
+    """
+    Get the shared AsyncOpenAI client for an endpoint and credential.
+
+    Args:
+        config: Model configuration (base_url and api_key are used)
+
+    Returns:
+        AsyncOpenAI client backed by a pooled HTTP connection pool
+    """
+    key = (config.base_url, config.api_key)
+    client = _async_clients.get(key)
+    if client is None:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=_pool_config.max_connections,
+                max_keepalive_connections=_pool_config.max_keepalive_connections,
+                keepalive_expiry=_pool_config.keepalive_expiry,
+            ),
+            timeout=_pool_config.timeout,
+        )
+        client = AsyncOpenAI(
+            base_url=config.base_url,
+            api_key=config.api_key,
+            http_client=http_client,
+            max_retries=0,  # Retries are owned by the request scheduler
+        )
+        _async_clients[key] = client
+    return client
+
+
+def get_chat_client(config: ModelConfig, model_id: Optional[str] = None) -> OpenAIChatClient:
+    """
+    Get the shared chat client for (base_url, api_key, model_id).
+
+    Args:
+        config: Model configuration
+        model_id: Model override (defaults to config.model_id)
+
+    Returns:
+        OpenAIChatClient sharing its connection pool with every other
+        client for the same endpoint
+    """
+    model_id = model_id or config.model_id
+    key = (config.base_url, config.api_key, model_id)
+    chat_client = _chat_clients.get(key)
+    if chat_client is None:
+        chat_client = OpenAIChatClient(
+            async_client=get_async_client(config),
+            model_id=model_id
+        )
+        _chat_clients[key] = chat_client
+    return chat_client
+
+
+async def close_clients():
+    """Close every pooled connection. Call once on shutdown."""
+    clients = list(_async_clients.values())
+    _async_clients.clear()
+    _chat_clients.clear()
+    await asyncio.gather(*(client.close() for client in clients), return_exceptions=True)
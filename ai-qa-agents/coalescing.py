@@ -0,0 +1,124 @@
+"""
+Request Coalescing for AI QA Agents
+Single-flight sharing of identical in-flight agent requests
+"""
+import asyncio
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+
+@dataclass
+class CoalescingStats:
+    """Counters for request coalescing"""
+    flights: int = 0  # Requests actually sent to the model
+    coalesced: int = 0  # Callers that joined an in-flight request instead
+
+
+@dataclass
+class _Flight:
+    """One in-flight request and the chunks it has produced so far."""
+    chunks: List[str] = field(default_factory=list)
+    done: bool = False
+    error: Optional[BaseException] = None
+    changed: asyncio.Event = field(default_factory=asyncio.Event)
+    task: Optional[asyncio.Task] = None
+    listeners: int = 0
+    cancel_when_idle: bool = False
+
+    def notify(self):
+        # Wake everyone waiting on the current event, then arm a fresh one
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent streaming requests.
+
+    The first caller for a key starts the request in a background task;
+    callers arriving while it runs replay the chunks produced so far and then
+    follow the live stream. By default the request runs to completion even
+    if its callers stop listening, so completion side effects (such as
+    cache writes) still happen; a request started with
+    ``cancel_when_idle=True`` is cancelled once its last listener leaves.
+    """
+
+    def __init__(self):
+        self.stats = CoalescingStats()
+        self._flights: Dict[str, _Flight] = {}
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct requests currently running."""
+        return len(self._flights)
+
+    async def _drive(self, key: str, flight: _Flight, make_stream: Callable[[], AsyncIterator[str]]):
+        try:
+            async for chunk in make_stream():
+                flight.chunks.append(chunk)
+                flight.notify()
+        except BaseException as e:
+            flight.error = e
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        finally:
+            flight.done = True
+            self._flights.pop(key, None)
+            flight.notify()
+
+    async def stream(
+        self,
+        key: str,
+        make_stream: Callable[[], AsyncIterator[str]],
+        cancel_when_idle: bool = False
+    ) -> AsyncIterator[str]:
+        """
+        Stream the response for ``key``, sharing it with identical callers.
+
+        Args:
+            key: Identity of the request (e.g. its response-cache key)
+            make_stream: Starts the request when no identical one is running
+            cancel_when_idle: When starting the request, cancel it as soon
+                as no caller is listening (e.g. after an early stop)
+
+        Yields:
+            Every chunk of the response, from the beginning
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(cancel_when_idle=cancel_when_idle)
+            self._flights[key] = flight
+            flight.task = asyncio.create_task(self._drive(key, flight, make_stream))
+            self.stats.flights += 1
+        else:
+            self.stats.coalesced += 1
+
+        index = 0
+        flight.listeners += 1
+        try:
+            while True:
+                changed = flight.changed
+                while index < len(flight.chunks):
+                    yield flight.chunks[index]
+                    index += 1
+                if flight.done:
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+                await changed.wait()
+        finally:
+            flight.listeners -= 1
+            if flight.cancel_when_idle and not flight.listeners and not flight.done:
+                flight.task.cancel()
+
+
+_single_flight: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> SingleFlight:
+    """Get the process-wide request coalescer shared by all agents."""
+    global _single_flight
+
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
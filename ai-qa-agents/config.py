@@ -3,13 +3,15 @@ Configuration for AI QA Testing Framework
 Using GitHub Models with Microsoft Agent Framework
 """
 import os
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import List, Optional
 
 @dataclass
 class ModelConfig:
     """Configuration for AI Model"""
-    base_url: str = "https://models.github.ai/inference"
+    base_url: str = field(
+        default_factory=lambda: os.environ.get("QA_MODEL_BASE_URL", "https://models.github.ai/inference")
+    )  # Override with QA_MODEL_BASE_URL, e.g. to use the benchmarks mock server
     model_id: str = "openai/gpt-4.1-mini"  # Cost-effective, high quality
     api_key: Optional[str] = None
     
@@ -29,11 +31,74 @@ class TracingConfig:
     enable_sensitive_data: bool = True
     service_name: str = "ai-qa-agents"
 
+@dataclass
+class CacheConfig:
+    """Configuration for the agent response cache"""
+    enabled: bool = True
+    directory: Optional[str] = None  # Defaults to <QAConfig.output_dir>/cache
+    ttl_seconds: int = 7 * 24 * 3600  # Responses older than a week are refreshed
+    memory_max_entries: int = 256
+    disk_max_entries: int = 10_000
+
+@dataclass
+class ClientPoolConfig:
+    """Connection limits for the shared model client pool"""
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 60.0  # Seconds an idle connection is kept open
+    timeout: float = 120.0
+
+@dataclass
+class LogConfig:
+    """Limits for log excerpts sent to a model"""
+    budget_bytes: int = 16_000  # Excerpt size, regardless of log size
+    context_lines: int = 3  # Lines kept before and after each error region
+    max_patterns: int = 1_000  # Distinct error patterns tracked per log
+    max_line_bytes: int = 2_000  # Longer lines are cut
+
+@dataclass
+class RateLimitConfig:
+    """Request scheduling limits for one model"""
+    requests_per_minute: int = 15
+    tokens_per_minute: int = 120_000
+    max_concurrency: int = 5
+    min_concurrency: int = 1
+    expected_output_tokens: int = 1_500  # Reserved per request on top of the prompt
+    max_retries: int = 5
+    base_backoff: float = 1.0  # Seconds, doubled per retry with full jitter
+    max_backoff: float = 60.0
+    latency_tolerance: float = 2.0  # Shrink concurrency when latency exceeds baseline by this factor
+
+@dataclass
+class RouterConfig:
+    """Configuration for per-call model routing"""
+    enabled: bool = False  # When disabled every call uses ModelConfig.model_id
+    candidates: Optional[List[str]] = None  # Defaults to RECOMMENDED_MODELS
+    latency_budget: float = 20.0  # Seconds to first chunk a model may take
+    max_cost_per_call: Optional[float] = None  # In MODEL_PROFILES cost units
+    first_chunk_timeout: float = 60.0  # Fall back to the next model after this
+
+@dataclass
+class ModelProfile:
+    """Routing attributes of a model"""
+    quality: int  # 1 = basic, 2 = standard, 3 = advanced
+    cost_per_1k_tokens: float  # Blended input/output price, relative units
+    context_tokens: int
+    typical_latency: float  # Expected seconds to first chunk before stats exist
+    specialty: Optional[str] = None  # Specialist models only serve matching tasks
+
+@dataclass
+class TaskRoute:
+    """Routing requirements of an agent task"""
+    min_quality: int = 2
+    specialty: Optional[str] = None
+
 @dataclass
 class QAConfig:
     """Main QA Framework Configuration"""
     model: ModelConfig = None
     tracing: TracingConfig = None
+    cache: CacheConfig = None
     
     # Paths
     test_cases_dir: str = "test-cases"
@@ -50,6 +115,8 @@ class QAConfig:
             self.model = ModelConfig()
         if self.tracing is None:
             self.tracing = TracingConfig()
+        if self.cache is None:
+            self.cache = CacheConfig()
 
 # Available GitHub Models for QA Tasks
 RECOMMENDED_MODELS = {
@@ -59,3 +126,33 @@ RECOMMENDED_MODELS = {
     "reasoning": "openai/o3-mini",              # Complex test logic
     "coding": "mistral-ai/codestral-2501",      # Code generation
 }
+
+# Scheduling limits per model (GitHub Models free-tier defaults; raise for paid plans)
+MODEL_RATE_LIMITS = {
+    RECOMMENDED_MODELS["default"]: RateLimitConfig(requests_per_minute=15, tokens_per_minute=120_000, max_concurrency=5),
+    RECOMMENDED_MODELS["advanced"]: RateLimitConfig(requests_per_minute=10, tokens_per_minute=80_000, max_concurrency=2),
+    RECOMMENDED_MODELS["fast"]: RateLimitConfig(requests_per_minute=15, tokens_per_minute=120_000, max_concurrency=5),
+    RECOMMENDED_MODELS["reasoning"]: RateLimitConfig(requests_per_minute=2, tokens_per_minute=24_000, max_concurrency=1),
+    RECOMMENDED_MODELS["coding"]: RateLimitConfig(requests_per_minute=15, tokens_per_minute=120_000, max_concurrency=5),
+}
+
+# Routing attributes per model
+MODEL_PROFILES = {
+    RECOMMENDED_MODELS["default"]: ModelProfile(quality=2, cost_per_1k_tokens=0.001, context_tokens=1_000_000, typical_latency=0.8),
+    RECOMMENDED_MODELS["advanced"]: ModelProfile(quality=3, cost_per_1k_tokens=0.005, context_tokens=1_000_000, typical_latency=1.2),
+    RECOMMENDED_MODELS["fast"]: ModelProfile(quality=1, cost_per_1k_tokens=0.00025, context_tokens=1_000_000, typical_latency=0.5),
+    RECOMMENDED_MODELS["reasoning"]: ModelProfile(quality=3, cost_per_1k_tokens=0.00275, context_tokens=200_000, typical_latency=5.0),
+    RECOMMENDED_MODELS["coding"]: ModelProfile(quality=2, cost_per_1k_tokens=0.0006, context_tokens=256_000, typical_latency=0.7, specialty="code"),
+}
+
+# Routing requirements per "<AgentName>.<method>" task (others use TaskRoute())
+TASK_ROUTES = {
+    "TestCaseGenerator.generate_from_code": TaskRoute(min_quality=2, specialty="code"),
+    "BugAnalyzer.generate_bug_report": TaskRoute(min_quality=1),
+    "BugAnalyzer.score_bugs": TaskRoute(min_quality=1),
+    "BugAnalyzer.triage": TaskRoute(min_quality=1),
+    "BugAnalyzer.confirm_duplicate": TaskRoute(min_quality=1),
+    "TestExecutionAssistant.get_execution_guidance": TaskRoute(min_quality=1),
+    "TestExecutionAssistant.generate_daily_report": TaskRoute(min_quality=1),
+    "TestExecutionAssistant.summarize_session": TaskRoute(min_quality=1),
+}
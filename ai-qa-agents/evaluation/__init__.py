@@ -7,7 +7,9 @@ from .evaluators import (
     SeverityAccuracyEvaluator,
     run_evaluation,
     EvaluationResult,
+    MetricStats,
 )
+from .result_cache import EvaluationCache
 
 __all__ = [
     "TestCaseQualityEvaluator",
@@ -15,4 +17,6 @@ __all__ = [
     "SeverityAccuracyEvaluator",
     "run_evaluation",
     "EvaluationResult",
+    "MetricStats",
+    "EvaluationCache",
 ]
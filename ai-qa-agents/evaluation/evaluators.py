@@ -4,12 +4,92 @@ Measures quality of generated test cases, bug analyses, and recommendations
 """
 import os
 import json
-from typing import Optional, List, Dict, Any
+import math
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Tuple
+
+from analysis.keywords import (
+    BUG_REPORT_FIELDS,
+    COVERAGE_INDICATORS,
+    EMAIL_INDICATORS,
+    SCANNER,
+    TEST_CASE_SECTIONS,
+    KeywordHits,
+    scan_keywords,
+)
 from dataclasses import dataclass
 
+from .result_cache import CachedResult, EvaluationCache
+
+try:
+    import pandas as pd
+except ImportError:  # evaluate_frame needs pandas; run_evaluation then scores row by row
+    pd = None
+
 # Note: For full evaluation, install azure-ai-evaluation
 # pip install azure-ai-evaluation
 
+# Numbered steps ("1." ... "9.") or numbered table rows ("| 1 |")
+_NUMBERED_STEP_RE = re.compile(r"[1-9]\.|\| [1-9] \|")
+_NUMBERED_LINE_RE = re.compile(r"[1-9]\.")
+_ASCII_DIGIT_RE = re.compile(r"[0-9]")
+# Markdown headers / bold labels at the start of a line
+_HEADER_LINE_RE = re.compile(r"(?m)^(?:#|\*\*)")
+# A line break plus any whitespace-only lines after it. Whitespace is spelled
+# out as str.isspace() defines it, so pyarrow-backed string columns agree with re.
+_LINE_GAP_RE = re.compile(
+    "\n[\t\n\x0b\x0c\r\x1c-\x1f \x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]*"
+)
+
+
+def _has_digit(text: str) -> bool:
+    """Whether any character is a digit, as ``str.isdigit`` defines it (e.g. "²" and "٣" count)."""
+    if text.isascii():
+        return _ASCII_DIGIT_RE.search(text) is not None
+    return any(map(str.isdigit, text))
+
+
+def _has_email(text: str) -> bool:
+    """Whether every email indicator occurs, case-sensitively."""
+    return all(indicator in text for indicator in EMAIL_INDICATORS)
+
+
+def _require_pandas():
+    if pd is None:
+        raise ImportError("Frame evaluation needs pandas: pip install pandas")
+
+
+class _FrameHits:
+    """Keyword hits of a text column, as per-group count columns"""
+    
+    def __init__(self, text: "pd.Series"):
+        self._matrix = SCANNER.keyword_matrix(text.tolist())
+        self._index = text.index
+    
+    def count(self, group: str) -> "pd.Series":
+        return pd.Series(self._matrix[:, SCANNER.columns(group)].sum(axis=1), index=self._index)
+    
+    def any(self, group: str) -> "pd.Series":
+        return self.count(group) > 0
+    
+    def all(self, keywords: List[str]) -> "pd.Series":
+        columns = [SCANNER.keywords.index(keyword) for keyword in keywords]
+        return pd.Series(self._matrix[:, columns].all(axis=1), index=self._index)
+
+
+def _frame_feedback(scores: "pd.DataFrame", rules: List[Tuple[str, float, str]], default: str) -> "pd.Series":
+    """Feedback strings for a frame of scores, applying the same rules as per-row feedback."""
+    # Each combination of low scores is one bit pattern; build its message once
+    messages = [
+        "; ".join(message for bit, (_, _, message) in enumerate(rules) if pattern >> bit & 1) or default
+        for pattern in range(1 << len(rules))
+    ]
+    patterns = sum((scores[metric] < threshold) * (1 << bit) for bit, (metric, threshold, _) in enumerate(rules))
+    return patterns.map(dict(enumerate(messages)))
+
 
 @dataclass
 class EvaluationResult:
@@ -31,11 +111,19 @@ class TestCaseQualityEvaluator:
     - Test Data: Is appropriate test data provided?
     """
     
+    INPUT_FIELD = "test_case"
+    VERSION = 2  # Bump when scoring changes, so cached results are recomputed
+    
+    # (score, threshold, advice) - advice is given when the score is below the threshold
+    FEEDBACK_RULES = [
+        ("completeness", 0.8, "Add missing sections: preconditions, expected results, or test data"),
+        ("clarity", 0.7, "Use more action verbs and numbered steps for clarity"),
+        ("coverage", 0.5, "Include negative, edge case, or security scenarios"),
+        ("test_data_quality", 0.6, "Provide specific test data values instead of placeholders"),
+    ]
+    
     def __init__(self):
-        self.required_sections = [
-            "title", "priority", "preconditions", 
-            "steps", "expected", "test_data"
-        ]
+        self.required_sections = TEST_CASE_SECTIONS
     
     def __call__(
         self,
@@ -54,11 +142,12 @@ class TestCaseQualityEvaluator:
         Returns:
             Evaluation scores and feedback
         """
+        hits = scan_keywords(test_case)
         scores = {
-            "completeness": self._check_completeness(test_case),
-            "clarity": self._check_clarity(test_case),
-            "coverage": self._check_coverage(test_case),
-            "test_data_quality": self._check_test_data(test_case),
+            "completeness": self._check_completeness(hits),
+            "clarity": self._check_clarity(test_case, hits),
+            "coverage": self._check_coverage(hits),
+            "test_data_quality": self._check_test_data(test_case, hits),
         }
         
         overall_score = sum(scores.values()) / len(scores)
@@ -72,46 +161,28 @@ class TestCaseQualityEvaluator:
             "feedback": self._generate_feedback(scores),
         }
     
-    def _check_completeness(self, test_case: str) -> float:
+    def _check_completeness(self, hits: KeywordHits) -> float:
         """Check if all required sections are present."""
-        tc_lower = test_case.lower()
-        found = sum(1 for section in self.required_sections if section in tc_lower)
-        return found / len(self.required_sections)
+        return len(hits["test_case.sections"]) / len(self.required_sections)
     
-    def _check_clarity(self, test_case: str) -> float:
+    def _check_clarity(self, test_case: str, hits: KeywordHits) -> float:
         """Check if steps are clear and actionable."""
-        # Check for action verbs
-        action_verbs = ["click", "enter", "verify", "navigate", "select", "check", "wait", "scroll"]
-        verb_count = sum(1 for verb in action_verbs if verb in test_case.lower())
-        
-        # Check for numbered steps
-        has_numbered_steps = any(f"{i}." in test_case or f"| {i} |" in test_case for i in range(1, 10))
+        verb_count = len(hits["test_case.actions"])
+        has_numbered_steps = _NUMBERED_STEP_RE.search(test_case) is not None
         
         score = min(1.0, verb_count / 5) * 0.6 + (0.4 if has_numbered_steps else 0)
         return score
     
-    def _check_coverage(self, test_case: str) -> float:
+    def _check_coverage(self, hits: KeywordHits) -> float:
         """Check for coverage of different test types."""
-        tc_lower = test_case.lower()
-        coverage_indicators = {
-            "positive": ["valid", "correct", "success", "happy path"],
-            "negative": ["invalid", "error", "fail", "incorrect", "wrong"],
-            "edge": ["boundary", "edge", "limit", "maximum", "minimum", "empty"],
-            "security": ["injection", "xss", "security", "authentication"],
-        }
-        
-        found_types = 0
-        for test_type, keywords in coverage_indicators.items():
-            if any(kw in tc_lower for kw in keywords):
-                found_types += 1
-        
-        return found_types / len(coverage_indicators)
+        found_types = sum(1 for test_type in COVERAGE_INDICATORS if hits[f"coverage.{test_type}"])
+        return found_types / len(COVERAGE_INDICATORS)
     
-    def _check_test_data(self, test_case: str) -> float:
+    def _check_test_data(self, test_case: str, hits: KeywordHits) -> float:
         """Check if appropriate test data is provided."""
         # Look for specific test data patterns
-        has_email = "@" in test_case and ".com" in test_case
-        has_specific_values = any(char.isdigit() for char in test_case)
+        has_email = _has_email(test_case)
+        has_specific_values = _has_digit(test_case)
         has_data_table = "|" in test_case and "---" in test_case
         
         score = 0.0
@@ -126,21 +197,55 @@ class TestCaseQualityEvaluator:
     
     def _generate_feedback(self, scores: Dict[str, float]) -> str:
         """Generate improvement feedback based on scores."""
-        feedback = []
-        
-        if scores["completeness"] < 0.8:
-            feedback.append("Add missing sections: preconditions, expected results, or test data")
-        
-        if scores["clarity"] < 0.7:
-            feedback.append("Use more action verbs and numbered steps for clarity")
-        
-        if scores["coverage"] < 0.5:
-            feedback.append("Include negative, edge case, or security scenarios")
+        feedback = [message for metric, threshold, message in self.FEEDBACK_RULES if scores[metric] < threshold]
+        return "; ".join(feedback) if feedback else "Good quality test case!"
+    
+    def evaluate_frame(self, df: "pd.DataFrame", column: Optional[str] = None) -> "pd.DataFrame":
+        """
+        Evaluate a whole column of test cases at once.
         
-        if scores["test_data_quality"] < 0.6:
-            feedback.append("Provide specific test data values instead of placeholders")
+        Scores match calling the evaluator row by row. Pattern checks run
+        as vectorized string operations over the column, keywords come from
+        one scanner pass per document, and scoring and feedback are
+        computed column-wise.
         
-        return "; ".join(feedback) if feedback else "Good quality test case!"
+        Args:
+            df: Frame with one test case per row
+            column: Column holding the test case text (default: "test_case")
+            
+        Returns:
+            Frame with the same index and the columns returned by ``__call__``
+        """
+        _require_pandas()
+        text = df[column or self.INPUT_FIELD].fillna("").astype(str)
+        hits = _FrameHits(text)
+        
+        verb_share = (hits.count("test_case.actions") / 5).clip(upper=1.0)
+        has_email = pd.Series(True, index=text.index)
+        for indicator in EMAIL_INDICATORS:
+            has_email &= text.str.contains(indicator, regex=False)
+        has_data_table = text.str.contains("|", regex=False) & text.str.contains("---", regex=False)
+        scores = pd.DataFrame({
+            "completeness": hits.count("test_case.sections") / len(self.required_sections),
+            "clarity": verb_share * 0.6 + text.str.contains(_NUMBERED_STEP_RE.pattern) * 0.4,
+            "coverage": sum(
+                hits.any(f"coverage.{test_type}") for test_type in COVERAGE_INDICATORS
+            ) / len(COVERAGE_INDICATORS),
+            "test_data_quality": (
+                has_email * 0.3 + text.map(_has_digit).astype(bool) * 0.3 + has_data_table * 0.4
+            ).clip(upper=1.0),
+        }, index=df.index)
+        
+        return pd.DataFrame({
+            "test_case_quality": (
+                scores["completeness"] + scores["clarity"] + scores["coverage"] + scores["test_data_quality"]
+            ) / 4,
+            "completeness_score": scores["completeness"],
+            "clarity_score": scores["clarity"],
+            "coverage_score": scores["coverage"],
+            "test_data_score": scores["test_data_quality"],
+            "feedback": _frame_feedback(scores, self.FEEDBACK_RULES, "Good quality test case!"),
+        }, index=df.index)
 
 
 class BugReportQualityEvaluator:
@@ -154,11 +259,19 @@ class BugReportQualityEvaluator:
     - Evidence: Screenshots, logs, or other evidence?
     """
     
+    INPUT_FIELD = "bug_report"
+    VERSION = 1  # Bump when scoring changes, so cached results are recomputed
+    
+    # (score, threshold, advice) - advice is given when the score is below the threshold
+    FEEDBACK_RULES = [
+        ("reproducibility", 0.7, "Add more specific reproduction steps with exact data"),
+        ("completeness", 0.8, "Include all required fields: severity, environment, expected/actual results"),
+        ("clarity", 0.7, "Use headers and clearly separate expected vs actual behavior"),
+        ("evidence", 0.5, "Add screenshots, console logs, or network traces"),
+    ]
+    
     def __init__(self):
-        self.required_fields = [
-            "title", "steps", "expected", "actual",
-            "environment", "severity"
-        ]
+        self.required_fields = BUG_REPORT_FIELDS
     
     def __call__(
         self,
@@ -167,11 +280,12 @@ class BugReportQualityEvaluator:
         **kwargs
     ) -> Dict[str, Any]:
         """Evaluate a bug report."""
+        hits = scan_keywords(bug_report)
         scores = {
-            "reproducibility": self._check_reproducibility(bug_report),
-            "completeness": self._check_completeness(bug_report),
-            "clarity": self._check_clarity(bug_report),
-            "evidence": self._check_evidence(bug_report),
+            "reproducibility": self._check_reproducibility(bug_report, hits),
+            "completeness": self._check_completeness(hits),
+            "clarity": self._check_clarity(bug_report, hits),
+            "evidence": self._check_evidence(hits),
         }
         
         overall_score = sum(scores.values()) / len(scores)
@@ -185,17 +299,12 @@ class BugReportQualityEvaluator:
             "feedback": self._generate_feedback(scores),
         }
     
-    def _check_reproducibility(self, bug_report: str) -> float:
+    def _check_reproducibility(self, bug_report: str, hits: KeywordHits) -> float:
         """Check if steps to reproduce are clear."""
-        br_lower = bug_report.lower()
-        
-        has_numbered_steps = any(f"{i}." in bug_report for i in range(1, 10))
-        has_url = "http" in br_lower or "url" in br_lower
-        has_test_data = "@" in bug_report or "password" in br_lower
-        has_specific_actions = any(
-            action in br_lower 
-            for action in ["click", "enter", "navigate", "select", "submit"]
-        )
+        has_numbered_steps = _NUMBERED_LINE_RE.search(bug_report) is not None
+        has_url = bool(hits["bug_report.url"])
+        has_test_data = bool(hits["bug_report.test_data"])
+        has_specific_actions = bool(hits["bug_report.actions"])
         
         score = 0.0
         if has_numbered_steps:
@@ -209,13 +318,11 @@ class BugReportQualityEvaluator:
         
         return score
     
-    def _check_completeness(self, bug_report: str) -> float:
+    def _check_completeness(self, hits: KeywordHits) -> float:
         """Check if all required fields are present."""
-        br_lower = bug_report.lower()
-        found = sum(1 for field in self.required_fields if field in br_lower)
-        return found / len(self.required_fields)
+        return len(hits["bug_report.fields"]) / len(self.required_fields)
     
-    def _check_clarity(self, bug_report: str) -> float:
+    def _check_clarity(self, bug_report: str, hits: KeywordHits) -> float:
         """Check for clear writing."""
         # Simple heuristics for clarity
         lines = bug_report.strip().split('\n')
@@ -223,7 +330,7 @@ class BugReportQualityEvaluator:
         
         has_headers = any(l.startswith('#') or l.startswith('**') for l in lines)
         good_length = 10 < len(non_empty_lines) < 100
-        has_expected_actual = "expected" in bug_report.lower() and "actual" in bug_report.lower()
+        has_expected_actual = {"expected", "actual"} <= hits["bug_report.fields"]
         
         score = 0.0
         if has_headers:
@@ -235,19 +342,11 @@ class BugReportQualityEvaluator:
         
         return score
     
-    def _check_evidence(self, bug_report: str) -> float:
+    def _check_evidence(self, hits: KeywordHits) -> float:
         """Check for evidence like screenshots or logs."""
-        br_lower = bug_report.lower()
-        
-        has_screenshot_ref = any(
-            kw in br_lower 
-            for kw in ["screenshot", "image", ".png", ".jpg", "attached"]
-        )
-        has_logs = any(
-            kw in br_lower 
-            for kw in ["console", "error:", "stack trace", "log", "```"]
-        )
-        has_network = "network" in br_lower or "request" in br_lower
+        has_screenshot_ref = bool(hits["evidence.screenshot"])
+        has_logs = bool(hits["evidence.logs"])
+        has_network = bool(hits["evidence.network"])
         
         score = 0.0
         if has_screenshot_ref:
@@ -261,21 +360,61 @@ class BugReportQualityEvaluator:
     
     def _generate_feedback(self, scores: Dict[str, float]) -> str:
         """Generate improvement feedback."""
-        feedback = []
-        
-        if scores["reproducibility"] < 0.7:
-            feedback.append("Add more specific reproduction steps with exact data")
-        
-        if scores["completeness"] < 0.8:
-            feedback.append("Include all required fields: severity, environment, expected/actual results")
-        
-        if scores["clarity"] < 0.7:
-            feedback.append("Use headers and clearly separate expected vs actual behavior")
+        feedback = [message for metric, threshold, message in self.FEEDBACK_RULES if scores[metric] < threshold]
+        return "; ".join(feedback) if feedback else "Comprehensive bug report!"
+    
+    def evaluate_frame(self, df: "pd.DataFrame", column: Optional[str] = None) -> "pd.DataFrame":
+        """
+        Evaluate a whole column of bug reports at once.
         
-        if scores["evidence"] < 0.5:
-            feedback.append("Add screenshots, console logs, or network traces")
+        Scores match calling the evaluator row by row; see
+        ``TestCaseQualityEvaluator.evaluate_frame``.
         
-        return "; ".join(feedback) if feedback else "Comprehensive bug report!"
+        Args:
+            df: Frame with one bug report per row
+            column: Column holding the bug report text (default: "bug_report")
+            
+        Returns:
+            Frame with the same index and the columns returned by ``__call__``
+        """
+        _require_pandas()
+        text = df[column or self.INPUT_FIELD].fillna("").astype(str)
+        hits = _FrameHits(text)
+        stripped = text.str.strip()
+        
+        # In stripped text every gap separates two non-empty lines
+        non_empty_lines = (stripped.str.count(_LINE_GAP_RE.pattern) + 1).where(stripped.str.len() > 0, 0)
+        has_expected_actual = hits.all(["expected", "actual"])
+        scores = pd.DataFrame({
+            "reproducibility": (
+                text.str.contains(_NUMBERED_LINE_RE.pattern) * 0.3
+                + hits.any("bug_report.url") * 0.2
+                + hits.any("bug_report.test_data") * 0.25
+                + hits.any("bug_report.actions") * 0.25
+            ),
+            "completeness": hits.count("bug_report.fields") / len(self.required_fields),
+            "clarity": (
+                stripped.str.contains(_HEADER_LINE_RE.pattern) * 0.3
+                + ((non_empty_lines > 10) & (non_empty_lines < 100)) * 0.3
+                + has_expected_actual * 0.4
+            ),
+            "evidence": (
+                hits.any("evidence.screenshot") * 0.4
+                + hits.any("evidence.logs") * 0.4
+                + hits.any("evidence.network") * 0.2
+            ),
+        }, index=df.index)
+        
+        return pd.DataFrame({
+            "bug_report_quality": (
+                scores["reproducibility"] + scores["completeness"] + scores["clarity"] + scores["evidence"]
+            ) / 4,
+            "reproducibility_score": scores["reproducibility"],
+            "completeness_score": scores["completeness"],
+            "clarity_score": scores["clarity"],
+            "evidence_score": scores["evidence"],
+            "feedback": _frame_feedback(scores, self.FEEDBACK_RULES, "Comprehensive bug report!"),
+        }, index=df.index)
 
 
 class SeverityAccuracyEvaluator:
@@ -284,6 +423,8 @@ class SeverityAccuracyEvaluator:
     Compares AI-suggested severity against ground truth or criteria.
     """
     
+    VERSION = 1  # Bump when scoring changes, so cached results are recomputed
+    
     def __init__(self):
         self.severity_weights = {
             "critical": 4,
@@ -322,64 +463,385 @@ class SeverityAccuracyEvaluator:
         }
 
 
+@dataclass
+class MetricStats:
+    """Running aggregate of one evaluator's main score"""
+    count: int = 0
+    mean: float = 0.0
+    min: float = math.inf
+    max: float = -math.inf
+    
+    def add(self, value: float):
+        self.count += 1
+        self.mean += (value - self.mean) / self.count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+    
+    def merge(self, other: "MetricStats"):
+        """Fold in the aggregate of another set of rows."""
+        if not other.count:
+            return
+        total = self.count + other.count
+        self.mean += (other.mean - self.mean) * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+    
+    @classmethod
+    def of(cls, values: "pd.Series") -> "MetricStats":
+        """Aggregate of a column of scores."""
+        if values.empty:
+            return cls()
+        return cls(len(values), float(values.mean()), float(values.min()), float(values.max()))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {"mean": self.mean, "min": self.min, "max": self.max, "count": self.count}
+
+
+def _main_score_key(result: Dict[str, Any]) -> Optional[str]:
+    """Key of an evaluator's main score (first numeric value with "score" in its key)."""
+    for key, value in result.items():
+        if isinstance(value, (int, float)) and "score" in key.lower():
+            return key
+    return None
+
+
+def _main_score(result: Any) -> Optional[float]:
+    """The main score of an evaluator result."""
+    if not isinstance(result, dict) or "error" in result:
+        return None
+    key = _main_score_key(result)
+    return result[key] if key is not None else None
+
+
+def _evaluate_row(
+    row: Dict[str, Any],
+    evaluators: Dict[str, Any],
+    precomputed: Optional[Dict[str, Dict[str, Any]]] = None
+) -> Dict[str, Any]:
+    """Run every evaluator on one row (unless already scored); failures are recorded per evaluator."""
+    row_result = {"input": row}
+    for eval_name, evaluator in evaluators.items():
+        if precomputed and eval_name in precomputed:
+            row_result[eval_name] = precomputed[eval_name]
+            continue
+        try:
+            row_result[eval_name] = evaluator(**row)
+        except Exception as e:
+            row_result[eval_name] = {"error": str(e)}
+    return row_result
+
+
+def _evaluate_frames(
+    rows: List[Any],
+    evaluators: Dict[str, Any],
+    stats: Dict[str, MetricStats],
+    cached: List[Dict[str, Any]]
+) -> List[Dict[str, Dict[str, Any]]]:
+    """
+    Score rows column-wise with each evaluator's ``evaluate_frame``, when pandas is available.
+    
+    Only rows whose input field is text and that have no cached result are
+    scored this way; the rest are left to the per-row path (which also
+    reports their errors). Main scores of the scored rows are added to
+    ``stats``.
+    
+    Returns:
+        Per row, evaluator name -> result for the evaluators that scored it
+    """
+    precomputed: List[Dict[str, Dict[str, Any]]] = [{} for _ in rows]
+    if pd is None:
+        return precomputed
+    for eval_name, evaluator in evaluators.items():
+        field = getattr(evaluator, "INPUT_FIELD", None)
+        if field is None or not hasattr(evaluator, "evaluate_frame"):
+            continue
+        positions = [
+            i for i, row in enumerate(rows)
+            if isinstance(row, dict) and isinstance(row.get(field), str) and eval_name not in cached[i]
+        ]
+        if not positions:
+            continue
+        scores = evaluator.evaluate_frame(pd.DataFrame({field: [rows[i][field] for i in positions]}))
+        records = scores.to_dict("records")
+        for i, result in zip(positions, records):
+            precomputed[i][eval_name] = result
+        key = _main_score_key(records[0])
+        if key is not None:
+            stats[eval_name].merge(MetricStats.of(scores[key]))
+    return precomputed
+
+
+def _add_scores(row_result: Dict[str, Any], stats: Dict[str, MetricStats], skip: Iterable[str] = ()):
+    for eval_name, metric in stats.items():
+        if eval_name in skip:
+            continue
+        score = _main_score(row_result.get(eval_name))
+        if score is not None:
+            metric.add(score)
+
+
+def _iter_lines(data_path: str, skip: int = 0) -> Iterator[Tuple[int, str]]:
+    """Lazily read (index, raw JSON line) pairs from a JSONL file, starting at row ``skip``."""
+    with open(data_path, encoding="utf-8") as f:
+        index = 0
+        for line in f:
+            if not line.strip():
+                continue
+            if index >= skip:
+                yield index, line
+            index += 1
+
+
+# Evaluators of a pool worker process, set once by _init_worker
+_worker_evaluators: Optional[Dict[str, Any]] = None
+
+
+def _init_worker(evaluators: Dict[str, Any]):
+    global _worker_evaluators
+    _worker_evaluators = evaluators
+
+
+def _encode_row(index: int, row_json: str, results: Dict[str, str]) -> str:
+    """A row result JSON line from already encoded parts, as ``json.dumps`` would write the whole."""
+    parts = [f'"index": {index}', f'"input": {row_json}']
+    parts += [f"{json.dumps(eval_name)}: {result}" for eval_name, result in results.items()]
+    return "{" + ", ".join(parts) + "}"
+
+
+def _evaluate_chunk(
+    chunk: List[Tuple[int, str, Dict[str, CachedResult]]],
+    encode: bool,
+    collect: bool = False,
+    evaluators: Optional[Dict[str, Any]] = None
+) -> Tuple[list, Dict[str, MetricStats], List[Dict[str, CachedResult]]]:
+    """
+    Evaluate a chunk of raw rows, reusing the cached results given with each row.
+    
+    When encoding, rows cached for every evaluator are not parsed: their
+    JSON line is assembled from the raw input line and the cached results.
+    
+    Returns:
+        Row results (JSON lines tagged with their index if ``encode``), the
+        partial aggregates of the chunk, and, if ``collect``, per row the
+        newly computed results other than errors, to be cached
+    """
+    evaluators = evaluators if evaluators is not None else _worker_evaluators
+    stats = {eval_name: MetricStats() for eval_name in evaluators}
+    results: list = [None] * len(chunk)
+    fresh: List[Dict[str, CachedResult]] = [{} for _ in chunk]
+    pending = []
+    for i, (index, line, hits) in enumerate(chunk):
+        for eval_name, (_, score) in hits.items():
+            if score is not None:
+                stats[eval_name].add(score)
+        if encode and len(hits) == len(evaluators):
+            results[i] = _encode_row(index, line.strip(), {eval_name: hits[eval_name][0] for eval_name in evaluators})
+        else:
+            pending.append(i)
+    
+    rows = [json.loads(chunk[i][1]) for i in pending]
+    cached = [{eval_name: json.loads(result) for eval_name, (result, _) in chunk[i][2].items()} for i in pending]
+    scored_by_frame = _evaluate_frames(rows, evaluators, stats, cached)
+    for i, row, row_cached, scored in zip(pending, rows, cached, scored_by_frame):
+        index, _, hits = chunk[i]
+        row_result = _evaluate_row(row, evaluators, {**row_cached, **scored})
+        _add_scores(row_result, stats, skip={*hits, *scored})
+        if not (encode or collect):
+            results[i] = row_result
+            continue
+        
+        encoded = {
+            eval_name: hits[eval_name][0] if eval_name in hits else json.dumps(row_result[eval_name])
+            for eval_name in evaluators
+        }
+        results[i] = _encode_row(index, json.dumps(row), encoded) if encode else row_result
+        if collect:
+            fresh[i] = {
+                eval_name: (encoded[eval_name], _main_score(result))
+                for eval_name, result in row_result.items()
+                if eval_name in evaluators and eval_name not in hits
+                and not (isinstance(result, dict) and "error" in result)
+            }
+    return results, stats, fresh
+
+
+def _evaluate_chunks(
+    lines: Iterator[Tuple[int, str]],
+    evaluators: Dict[str, Any],
+    workers: int,
+    chunk_size: int,
+    encode: bool,
+    cache: Optional[EvaluationCache] = None
+) -> Iterator[Tuple[list, Dict[str, MetricStats]]]:
+    """
+    Evaluate rows chunk by chunk, in input order.
+    
+    With more than one worker, chunks are evaluated in a process pool whose
+    workers receive the evaluators once at startup. Only a few chunks per
+    worker are in flight at a time, so input is still read lazily.
+    
+    With a cache, each chunk's cached results are looked up before it is
+    evaluated and newly computed results are stored once it is done; the
+    cache is only used from this process.
+    """
+    chunks = iter(lambda: list(islice(lines, chunk_size)), [])
+    collect = cache is not None
+    if collect:
+        scopes = cache.prepare(evaluators)
+        chunks = (cache.lookup(scopes, chunk) for chunk in chunks)
+    else:
+        chunks = ([(index, line, {}) for index, line in chunk] for chunk in chunks)
+    
+    def finish(chunk, outcome):
+        results, stats, fresh = outcome
+        if collect:
+            cache.store(scopes, chunk, fresh)
+        return results, stats
+    
+    if workers <= 1:
+        for chunk in chunks:
+            yield finish(chunk, _evaluate_chunk(chunk, encode, collect, evaluators))
+        return
+    
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(evaluators,)) as pool:
+        pending = deque(
+            (chunk, pool.submit(_evaluate_chunk, chunk, encode, collect)) for chunk in islice(chunks, 2 * workers)
+        )
+        while pending:
+            chunk, future = pending.popleft()
+            result = future.result()
+            for next_chunk in islice(chunks, 1):
+                pending.append((next_chunk, pool.submit(_evaluate_chunk, next_chunk, encode, collect)))
+            yield finish(chunk, result)
+
+
+def _completed_rows(output_path: str, stats: Dict[str, MetricStats]) -> int:
+    """
+    Replay the row results already in a streaming output file.
+    
+    Aggregates are rebuilt from the replayed rows, and a partially written
+    last line (from an interrupted run) is cut off.
+    
+    Returns:
+        Index of the first row still to evaluate
+    """
+    next_index = 0
+    good_until = 0
+    with open(output_path, "rb+") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                row_result = json.loads(line)
+            except ValueError:
+                break
+            _add_scores(row_result, stats)
+            next_index = row_result["index"] + 1
+            good_until += len(line)
+        f.truncate(good_until)
+    return next_index
+
+
+def _run_evaluation_stream(
+    data_path: str,
+    evaluators: Dict[str, Any],
+    output_path: str,
+    resume: bool,
+    workers: int,
+    chunk_size: int,
+    cache: Optional[EvaluationCache]
+) -> Dict[str, Any]:
+    stats = {eval_name: MetricStats() for eval_name in evaluators}
+    start = _completed_rows(output_path, stats) if resume and os.path.exists(output_path) else 0
+    
+    evaluated = 0
+    with open(output_path, "a" if start else "w", encoding="utf-8") as out:
+        for lines, partial in _evaluate_chunks(
+            _iter_lines(data_path, skip=start), evaluators, workers, chunk_size, encode=True, cache=cache
+        ):
+            out.write("\n".join(lines) + "\n")
+            out.flush()
+            evaluated += len(lines)
+            for eval_name, metric in partial.items():
+                stats[eval_name].merge(metric)
+    
+    results = {
+        "aggregate_metrics": {name: metric.to_dict() for name, metric in stats.items() if metric.count},
+        "rows": start + evaluated,
+        "rows_evaluated": evaluated,
+        "output_path": output_path,
+    }
+    summary_path = os.path.splitext(output_path)[0] + ".summary.json"
+    with open(summary_path, "w") as f:
+        json.dump(results, f, indent=2)
+    return results
+
+
 def run_evaluation(
     data_path: str,
     evaluators: Dict[str, Any],
-    output_path: str = "evaluation_results.json"
+    output_path: str = "evaluation_results.json",
+    stream: bool = False,
+    resume: bool = False,
+    workers: int = 1,
+    chunk_size: int = 5000,
+    cache: Optional[EvaluationCache] = None
 ) -> Dict[str, Any]:
     """
     Run evaluation using multiple evaluators.
     
+    By default all row results are kept and saved as one JSON document. In
+    streaming mode rows are read lazily and each row result is appended to
+    ``output_path`` as a JSON line (tagged with its input ``index``) as soon
+    as it is produced, with aggregates computed online, so memory stays
+    constant however large the dataset is. Aggregates are also saved to
+    ``<output>.summary.json``.
+    
+    When pandas is installed, evaluators with ``evaluate_frame`` score each
+    chunk of rows column-wise; the results are the same as row by row.
+    
+    With ``workers`` > 1, rows are evaluated in chunks by a process pool
+    (evaluators must be picklable; each worker gets its own copy once).
+    Row results keep input order and per-chunk aggregates are merged.
+    
+    With a ``cache``, evaluator results are reused for rows whose JSON text
+    was already scored by the same evaluator version, so a rerun only
+    evaluates new or changed rows; aggregates still cover every row.
+    
     Args:
         data_path: Path to JSONL data file
         evaluators: Dictionary of evaluator name -> evaluator instance
         output_path: Where to save results
+        stream: Write row results incrementally as JSONL instead of returning them
+        resume: Continue an interrupted streaming run from its last completed row
+            (implies ``stream``)
+        workers: Worker processes (0 = one per CPU core)
+        chunk_size: Rows sent to a worker at a time
+        cache: Store of per-row results reused across runs
         
     Returns:
-        Evaluation results with metrics
+        Evaluation results with metrics (streaming mode: metrics and row counts only)
     """
-    import jsonlines
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    if stream or resume:
+        return _run_evaluation_stream(data_path, evaluators, output_path, resume, workers, chunk_size, cache)
     
     results = {
         "row_results": [],
         "aggregate_metrics": {}
     }
+    stats = {eval_name: MetricStats() for eval_name in evaluators}
     
-    # Read data
-    with jsonlines.open(data_path) as reader:
-        data = list(reader)
+    for row_results, partial in _evaluate_chunks(
+        _iter_lines(data_path), evaluators, workers, chunk_size, encode=False, cache=cache
+    ):
+        results["row_results"].extend(row_results)
+        for eval_name, metric in partial.items():
+            stats[eval_name].merge(metric)
     
-    # Run evaluators on each row
-    for row in data:
-        row_result = {"input": row}
-        
-        for eval_name, evaluator in evaluators.items():
-            try:
-                eval_result = evaluator(**row)
-                row_result[eval_name] = eval_result
-            except Exception as e:
-                row_result[eval_name] = {"error": str(e)}
-        
-        results["row_results"].append(row_result)
-    
-    # Calculate aggregate metrics
-    for eval_name in evaluators.keys():
-        scores = []
-        for row in results["row_results"]:
-            if eval_name in row and "error" not in row[eval_name]:
-                # Get the main score (first numeric value)
-                for key, value in row[eval_name].items():
-                    if isinstance(value, (int, float)) and "score" in key.lower():
-                        scores.append(value)
-                        break
-        
-        if scores:
-            results["aggregate_metrics"][eval_name] = {
-                "mean": sum(scores) / len(scores),
-                "min": min(scores),
-                "max": max(scores),
-                "count": len(scores)
-            }
+    results["aggregate_metrics"] = {name: metric.to_dict() for name, metric in stats.items() if metric.count}
     
     # Save results
     with open(output_path, 'w') as f:
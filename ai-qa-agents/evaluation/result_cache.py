@@ -0,0 +1,174 @@
+"""
+Evaluation Result Cache
+Content-addressed store of per-row evaluator results, so reruns only score new or changed rows
+"""
+import hashlib
+import inspect
+import os
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import QAConfig
+
+_LOOKUP_BATCH = 500  # Keys per query, below SQLite's bound-parameter limit
+
+# A stored evaluator result: its JSON and its main score (None if it has none)
+CachedResult = Tuple[str, Optional[float]]
+
+
+def row_hash(line: str) -> bytes:
+    """Identify a dataset row by its JSON text."""
+    return hashlib.blake2b(line.strip().encode("utf-8"), digest_size=16).digest()
+
+
+def evaluator_version(evaluator: Any) -> Optional[str]:
+    """
+    Identify an evaluator's scoring logic.
+
+    Evaluators declare a ``VERSION`` to bump when their scoring changes;
+    others are versioned by a hash of their source code. Evaluators whose
+    source is unavailable get None and are never cached.
+    """
+    target = evaluator if inspect.isfunction(evaluator) else type(evaluator)
+    name = f"{target.__module__}.{target.__qualname__}"
+    version = getattr(evaluator, "VERSION", None)
+    if version is not None:
+        return f"{name}@{version}"
+    try:
+        source = inspect.getsource(target)
+    except (OSError, TypeError):
+        return None
+    return f"{name}#{hashlib.sha256(source.encode('utf-8')).hexdigest()[:16]}"
+
+
+def _scope(name: str, version: str) -> bytes:
+    return f"{name}\0{version}\0".encode("utf-8")
+
+
+def _result_key(scope: bytes, digest: bytes) -> bytes:
+    """Key of one evaluator version's result for one row."""
+    return hashlib.blake2b(scope + digest, digest_size=16).digest()
+
+
+class EvaluationCache:
+    """
+    SQLite store of evaluator results, keyed by (evaluator name, evaluator
+    version, row hash).
+
+    Identical rows share results wherever they appear in a dataset. Each
+    result is stored with its main score, so aggregates over cached rows
+    need no re-parsing. Error results are not stored, and an evaluator's
+    results are dropped once a run uses a different version of it.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(QAConfig.output_dir, "cache", "evaluations.sqlite3")
+        self.hits = 0  # Evaluator results reused
+        self.misses = 0  # Evaluator results to compute
+        self._db: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._db = sqlite3.connect(self.path)
+            # Results are appended in rowid order; only the small key index is updated at random
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key BLOB PRIMARY KEY, evaluator TEXT NOT NULL, result TEXT NOT NULL, score REAL)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS evaluators (name TEXT PRIMARY KEY, version TEXT NOT NULL)"
+            )
+            self._db.commit()
+        return self._db
+
+    def prepare(self, evaluators: Dict[str, Any]) -> Dict[str, bytes]:
+        """
+        Version the evaluators of a run, dropping results of their other versions.
+
+        Returns:
+            Evaluator name -> key scope, for the evaluators that can be cached
+        """
+        db = self._connect()
+        scopes = {}
+        for name, evaluator in evaluators.items():
+            version = evaluator_version(evaluator)
+            if version is None:
+                continue
+            scopes[name] = _scope(name, version)
+            stored = db.execute("SELECT version FROM evaluators WHERE name = ?", (name,)).fetchone()
+            if stored is not None and stored[0] != version:
+                db.execute("DELETE FROM results WHERE evaluator = ?", (name,))
+            db.execute("INSERT OR REPLACE INTO evaluators (name, version) VALUES (?, ?)", (name, version))
+        db.commit()
+        return scopes
+
+    def lookup(
+        self,
+        scopes: Dict[str, bytes],
+        chunk: List[Tuple[int, str]]
+    ) -> List[Tuple[int, str, Dict[str, CachedResult]]]:
+        """
+        Find the cached results of a chunk of raw rows.
+
+        Returns:
+            (index, raw line, evaluator name -> cached result) per row
+        """
+        digests = [row_hash(line) for _, line in chunk]
+        cached: List[Dict[str, CachedResult]] = [{} for _ in chunk]
+        db = self._connect()
+        for name, scope in scopes.items():
+            positions: Dict[bytes, List[int]] = {}
+            for i, digest in enumerate(digests):
+                positions.setdefault(_result_key(scope, digest), []).append(i)
+            keys = list(positions)
+            for start in range(0, len(keys), _LOOKUP_BATCH):
+                batch = keys[start:start + _LOOKUP_BATCH]
+                rows = db.execute(
+                    f"SELECT key, result, score FROM results WHERE key IN ({', '.join('?' * len(batch))})",
+                    batch
+                )
+                for key, result, score in rows:
+                    for i in positions[key]:
+                        cached[i][name] = (result, score)
+
+        found = sum(map(len, cached))
+        self.hits += found
+        self.misses += len(chunk) * len(scopes) - found
+        return [(index, line, hits) for (index, line), hits in zip(chunk, cached)]
+
+    def store(
+        self,
+        scopes: Dict[str, bytes],
+        chunk: List[Tuple[int, str, Dict[str, CachedResult]]],
+        fresh: List[Dict[str, CachedResult]]
+    ):
+        """Save the results computed for a chunk (evaluator name -> result per row)."""
+        entries = []
+        for (_, line, _), results in zip(chunk, fresh):
+            if not results:
+                continue
+            digest = row_hash(line)
+            for name, (result, score) in results.items():
+                if name in scopes:
+                    entries.append((_result_key(scopes[name], digest), name, result, score))
+        if entries:
+            db = self._connect()
+            db.executemany(
+                "INSERT OR REPLACE INTO results (key, evaluator, result, score) VALUES (?, ?, ?, ?)",
+                entries
+            )
+            db.commit()
+
+    def clear(self):
+        """Remove every cached result."""
+        db = self._connect()
+        db.execute("DELETE FROM results")
+        db.execute("DELETE FROM evaluators")
+        db.commit()
+
+    def close(self):
+        """Close the underlying database connection."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
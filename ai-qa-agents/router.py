@@ -0,0 +1,135 @@
+"""
+Model Router for AI QA Agents
+Latency/cost-aware model selection per agent task, with fallback
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from config import (
+    MODEL_PROFILES,
+    RECOMMENDED_MODELS,
+    TASK_ROUTES,
+    ModelProfile,
+    RouterConfig,
+    TaskRoute,
+)
+
+
+@dataclass
+class ModelRouteStats:
+    """Observed behaviour of one model"""
+    calls: int = 0
+    failures: int = 0
+    latency_ewma: Optional[float] = None  # Seconds to first chunk
+
+
+class ModelRouter:
+    """
+    Picks the model for each agent call.
+
+    Candidates must meet the task's quality tier (TASK_ROUTES), fit the prompt
+    in their context window and respect the cost budget. They are ordered
+    by whether their observed latency fits the budget, then by estimated
+    cost, then by latency. The rest of the ordered list is the fallback chain.
+    """
+
+    def __init__(self, config: Optional[RouterConfig] = None):
+        self.config = config or RouterConfig()
+        self.stats: Dict[str, ModelRouteStats] = {}
+
+    def _profile(self, model_id: str) -> ModelProfile:
+        return MODEL_PROFILES.get(
+            model_id,
+            ModelProfile(quality=2, cost_per_1k_tokens=0.001, context_tokens=128_000, typical_latency=1.0)
+        )
+
+    def expected_latency(self, model_id: str) -> float:
+        """Observed time to first chunk, or the profile's typical latency."""
+        stats = self.stats.get(model_id)
+        if stats is not None and stats.latency_ewma is not None:
+            return stats.latency_ewma
+        return self._profile(model_id).typical_latency
+
+    def route(
+        self,
+        task: str,
+        prompt_tokens: int,
+        default_model: str,
+        output_tokens: int = 1_500
+    ) -> List[str]:
+        """
+        Order candidate models for a call.
+
+        Args:
+            task: "<AgentName>.<method>" task identifier
+            prompt_tokens: Estimated prompt size
+            default_model: Model used when routing is disabled or nothing fits
+            output_tokens: Expected response size
+
+        Returns:
+            Models to try in order; the first is the primary choice
+        """
+        if not self.config.enabled:
+            return [default_model]
+
+        route = TASK_ROUTES.get(task, TaskRoute())
+        total_tokens = prompt_tokens + output_tokens
+        candidates = self.config.candidates or list(RECOMMENDED_MODELS.values())
+
+        ranked = []
+        for model_id in candidates:
+            profile = self._profile(model_id)
+            if profile.quality < route.min_quality:
+                continue
+            if profile.specialty is not None and profile.specialty != route.specialty:
+                continue
+            if total_tokens > profile.context_tokens:
+                continue
+            cost = profile.cost_per_1k_tokens * total_tokens / 1000
+            if self.config.max_cost_per_call is not None and cost > self.config.max_cost_per_call:
+                continue
+            latency = self.expected_latency(model_id)
+            ranked.append((
+                latency > self.config.latency_budget,
+                route.specialty is not None and profile.specialty != route.specialty,
+                cost,
+                latency,
+                model_id,
+            ))
+
+        order = [entry[-1] for entry in sorted(ranked)]
+        if default_model not in order:
+            order.append(default_model)
+        return order
+
+    def record(self, model_id: str, latency: Optional[float], ok: bool):
+        """
+        Record the outcome of a call.
+
+        Args:
+            model_id: Model that served (or failed) the call
+            latency: Seconds to first chunk, if any chunk arrived
+            ok: Whether the call succeeded
+        """
+        stats = self.stats.setdefault(model_id, ModelRouteStats())
+        stats.calls += 1
+        if not ok:
+            stats.failures += 1
+            # Count failures as timeouts so repeated errors steer routing away
+            latency = max(latency or 0.0, self.config.first_chunk_timeout)
+        if latency is None:
+            return
+        previous = self.expected_latency(model_id)
+        stats.latency_ewma = 0.8 * previous + 0.2 * latency
+
+
+_model_router: Optional[ModelRouter] = None
+
+
+def get_model_router() -> ModelRouter:
+    """Get the process-wide model router used by agents."""
+    global _model_router
+
+    if _model_router is None:
+        _model_router = ModelRouter()
+    return _model_router
@@ -0,0 +1,238 @@
+"""
+Request Scheduler for AI QA Agents
+Per-model rate limiting, retry with backoff and adaptive concurrency
+"""
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, Optional
+
+from config import MODEL_RATE_LIMITS, RateLimitConfig
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting (about 4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Check whether an error is a provider throttling response (HTTP 429)."""
+    return getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError"
+
+
+def _is_retryable(error: BaseException) -> bool:
+    if is_rate_limit_error(error):
+        return True
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int) and status >= 500:
+        return True
+    name = type(error).__name__
+    return "Timeout" in name or "Connection" in name
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    """Read the Retry-After header (in seconds) from a provider error, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    for header in ("retry-after-ms", "retry-after"):
+        value = headers.get(header)
+        if value is None:
+            continue
+        try:
+            seconds = float(value)
+        except (TypeError, ValueError):
+            continue
+        return seconds / 1000 if header == "retry-after-ms" else seconds
+    return None
+
+
+class TokenBucket:
+    """Continuously refilling token bucket."""
+
+    def __init__(self, capacity: float, per_minute: float):
+        self.capacity = capacity
+        self.rate = per_minute / 60.0
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        """Wait until ``amount`` tokens are available and take them."""
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+
+@dataclass
+class SchedulerStats:
+    """Counters for one model scheduler"""
+    requests: int = 0
+    throttled: int = 0
+    retries: int = 0
+    failures: int = 0
+    latency_ewma: float = 0.0
+
+
+class ModelScheduler:
+    """
+    Schedules requests to a single model.
+
+    - Requests/min and tokens/min token buckets
+    - Retries with jittered exponential backoff, honoring Retry-After
+    - AIMD concurrency: grows by 1/limit per healthy response, halves on
+      throttling and shrinks when recent latency drifts above the long-run
+      baseline
+    """
+
+    def __init__(self, model_id: str, limits: Optional[RateLimitConfig] = None):
+        self.model_id = model_id
+        self.limits = limits or MODEL_RATE_LIMITS.get(model_id, RateLimitConfig())
+        self.stats = SchedulerStats()
+        self._requests = TokenBucket(self.limits.requests_per_minute, self.limits.requests_per_minute)
+        self._tokens = TokenBucket(self.limits.tokens_per_minute, self.limits.tokens_per_minute)
+        self._limit = float(self.limits.max_concurrency)
+        self._in_flight = 0
+        self._baseline_latency: Optional[float] = None
+        self._slots = asyncio.Condition()
+
+    @property
+    def concurrency_limit(self) -> int:
+        """Current adaptive concurrency limit."""
+        return max(self.limits.min_concurrency, int(self._limit))
+
+    async def _acquire(self, tokens: int):
+        async with self._slots:
+            await self._slots.wait_for(lambda: self._in_flight < self.concurrency_limit)
+            self._in_flight += 1
+        try:
+            await self._requests.acquire(1)
+            await self._tokens.acquire(tokens)
+        except BaseException:
+            await self._release(None, throttled=False)
+            raise
+
+    async def _release(self, latency: Optional[float], throttled: bool):
+        async with self._slots:
+            self._in_flight -= 1
+            self._adjust(latency, throttled)
+            self._slots.notify_all()
+
+    def _adjust(self, latency: Optional[float], throttled: bool):
+        limits = self.limits
+        if throttled:
+            self._limit = max(limits.min_concurrency, self._limit / 2)
+            return
+        if latency is None:
+            return
+
+        # Compare a fast-moving latency average against a slow-moving baseline
+        if self._baseline_latency is None:
+            self.stats.latency_ewma = self._baseline_latency = latency
+        else:
+            self.stats.latency_ewma = 0.7 * self.stats.latency_ewma + 0.3 * latency
+            self._baseline_latency = 0.95 * self._baseline_latency + 0.05 * latency
+
+        if self.stats.latency_ewma > self._baseline_latency * limits.latency_tolerance:
+            self._limit = max(limits.min_concurrency, self._limit * 0.9)
+        else:
+            self._limit = min(limits.max_concurrency, self._limit + 1 / self._limit)
+
+    def _backoff(self, error: BaseException, attempt: int) -> Optional[float]:
+        """Delay before the next attempt, or None if the error is final."""
+        if attempt >= self.limits.max_retries or not _is_retryable(error):
+            return None
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.limits.max_backoff)
+        ceiling = min(self.limits.max_backoff, self.limits.base_backoff * 2 ** attempt)
+        return random.uniform(0, ceiling)
+
+    async def stream(
+        self,
+        make_stream: Callable[[], AsyncIterator[str]],
+        prompt_tokens: int,
+        first_chunk_timeout: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """
+        Run a streaming request under this model's limits.
+
+        Args:
+            make_stream: Starts a fresh attempt of the request
+            prompt_tokens: Estimated prompt size used for token budgeting
+            first_chunk_timeout: Seconds a dispatched attempt may take to
+                produce its first chunk. Time spent waiting for a slot, for
+                the rate limits or between retries does not count. An
+                attempt that times out is not retried.
+
+        Yields:
+            Chunks of the response. Attempts that fail before yielding
+            anything are retried; failures mid-stream are raised.
+        """
+        tokens = prompt_tokens + self.limits.expected_output_tokens
+        attempt = 0
+        while True:
+            await self._acquire(tokens)
+            self.stats.requests += 1
+            started = time.monotonic()
+            latency = None
+            throttled = False
+            yielded = False
+            deadline = asyncio.timeout(first_chunk_timeout)
+            try:
+                chunks = make_stream().__aiter__()
+                try:
+                    async with deadline:
+                        first = await chunks.__anext__()
+                except StopAsyncIteration:
+                    return
+                # Time to first chunk is the latency signal we adapt on
+                latency = time.monotonic() - started
+                yielded = True
+                yield first
+                async for chunk in chunks:
+                    yield chunk
+                return
+            except Exception as e:
+                throttled = is_rate_limit_error(e)
+                if throttled:
+                    self.stats.throttled += 1
+                delay = None if yielded or deadline.expired() else self._backoff(e, attempt)
+                if delay is None:
+                    self.stats.failures += 1
+                    raise
+            finally:
+                await self._release(latency, throttled)
+
+            attempt += 1
+            self.stats.retries += 1
+            await asyncio.sleep(delay)
+
+
+_schedulers: Dict[str, ModelScheduler] = {}
+
+
+def get_scheduler(model_id: str) -> ModelScheduler:
+    """Get the process-wide scheduler for a model."""
+    scheduler = _schedulers.get(model_id)
+    if scheduler is None:
+        scheduler = ModelScheduler(model_id)
+        _schedulers[model_id] = scheduler
+    return scheduler
+
+
+def configure_scheduler(model_id: str, limits: RateLimitConfig) -> ModelScheduler:
+    """Replace the scheduler for a model with one using custom limits."""
+    scheduler = ModelScheduler(model_id, limits)
+    _schedulers[model_id] = scheduler
+    return scheduler
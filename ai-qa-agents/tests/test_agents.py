@@ -0,0 +1,111 @@
+"""
+BaseQAAgent streaming path against the mock LLM server: cache, coalescing, retries and fallback.
+"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("agent_framework")
+
+from agents.base import BaseQAAgent
+from benchmarks.mock_server import MockLLMServer, MockServerConfig
+from cache import ResponseCache
+from client_pool import close_clients
+from coalescing import get_single_flight
+from config import CacheConfig, ModelConfig, RateLimitConfig, RouterConfig
+from router import ModelRouter
+from scheduler import configure_scheduler
+
+DEFAULT_MODEL = ModelConfig.model_id
+BROKEN_MODEL = "mock/a-broken"  # Sorts before WORKING_MODEL among equally ranked candidates
+WORKING_MODEL = "mock/b-working"
+
+PLAN = "## Plan\n\n1. Open the login page  \n2. Sign in with a locked account\n\n"
+RESPONSES = {"plan": PLAN}
+
+
+@pytest.fixture
+def serve(tmp_path):
+    """Run ``scenario(server, agent)`` against a fresh mock server, cache and router."""
+
+    def run(scenario, router=None, **server_options):
+        for model_id in (DEFAULT_MODEL, BROKEN_MODEL, WORKING_MODEL):
+            configure_scheduler(model_id, RateLimitConfig(
+                requests_per_minute=10_000, tokens_per_minute=100_000_000, base_backoff=0.01
+            ))
+        options = {"ttft": 0.05, "inter_chunk_delay": 0.0, "responses": RESPONSES, **server_options}
+
+        async def main():
+            async with MockLLMServer(MockServerConfig(**options)) as server:
+                agent = BaseQAAgent(
+                    ModelConfig(base_url=server.base_url, api_key="mock"),
+                    cache=ResponseCache(CacheConfig(directory=str(tmp_path / "cache"))),
+                    router=router or ModelRouter(),
+                )
+                try:
+                    return await scenario(server, agent)
+                finally:
+                    await close_clients()
+
+        return asyncio.run(main())
+
+    return run
+
+
+def test_stream_yields_the_response_exactly(serve):
+    async def scenario(server, agent):
+        return [chunk async for chunk in agent._stream("Write a test plan")]
+
+    chunks = serve(scenario)
+    assert len(chunks) > 1
+    assert "".join(chunks) == PLAN
+
+
+def test_cache_hit_is_served_without_a_request(serve):
+    async def scenario(server, agent):
+        first = await agent._run("Write a test plan")
+        second = [chunk async for chunk in agent._stream("Write a test plan")]
+        return server.stats.requests, agent.cache.stats.hits, first, second
+
+    requests, hits, first, second = serve(scenario)
+    assert (requests, hits) == (1, 1)
+    assert first == PLAN
+    assert second == [PLAN]  # A hit is one chunk
+
+
+def test_identical_concurrent_requests_share_one_flight(serve):
+    async def scenario(server, agent):
+        before = get_single_flight().stats.coalesced
+        results = await asyncio.gather(*(agent._run("Write a test plan") for _ in range(3)))
+        return server.stats.requests, get_single_flight().stats.coalesced - before, results
+
+    requests, coalesced, results = serve(scenario, ttft=0.2)
+    assert (requests, coalesced) == (1, 2)
+    assert results == [PLAN] * 3
+
+
+def test_rate_limited_attempt_is_retried(serve):
+    async def scenario(server, agent):
+        await agent._run("Warm up")
+        text = await agent._run("Write a test plan")  # Second request is answered with 429
+        return server.stats, text
+
+    stats, text = serve(scenario, rate_limit_every=2, retry_after_ms=10)
+    assert (stats.requests, stats.rate_limited) == (3, 1)
+    assert text == PLAN
+
+
+def test_router_falls_back_when_a_model_fails(serve):
+    router = ModelRouter(RouterConfig(enabled=True, candidates=[WORKING_MODEL, BROKEN_MODEL]))
+
+    async def scenario(server, agent):
+        models = router.route("QAAgent.default", 100, DEFAULT_MODEL)
+        text = await agent._run("Write a test plan")
+        cached = agent.cache.get(agent._cache_key("Write a test plan", WORKING_MODEL))
+        return models, server.stats, text, cached
+
+    models, stats, text, cached = serve(scenario, router=router, model_errors={BROKEN_MODEL: 400})
+    assert models[:2] == [BROKEN_MODEL, WORKING_MODEL]
+    assert (stats.requests, stats.failed) == (2, 1)
+    assert (router.stats[BROKEN_MODEL].failures, router.stats[WORKING_MODEL].failures) == (1, 0)
+    assert text == cached == PLAN  # Cached under the model that answered
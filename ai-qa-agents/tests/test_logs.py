@@ -0,0 +1,70 @@
+"""
+Log excerpt extraction.
+"""
+import pytest
+
+from analysis import logs
+from analysis.logs import excerpt_log, excerpt_text
+from config import LogConfig
+
+MINIFIED = (
+    '{"level":"info","msg":"ok"},' * 200
+    + '{"level":"error","msg":"Unhandled exception in worker"},'
+    + '{"level":"info","msg":"ok"},' * 200
+)
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    """Scan in tiny chunks so ordinary lines exercise the over-long line path."""
+    monkeypatch.setattr(logs, "_SCAN_CHUNK", 64)
+
+
+def test_small_log_is_returned_whole():
+    text = "boot\nTypeError: x is undefined\nshutdown\n"
+    excerpt = excerpt_text(text)
+    assert (excerpt.text, excerpt.truncated, excerpt.error_lines, excerpt.patterns) == (text, False, 1, 1)
+
+
+def test_large_log_keeps_first_and_last_occurrences(tmp_path):
+    lines = [f"2024-05-01T10:00:{i % 60:02d} INFO request {i} served" for i in range(20_000)]
+    lines[5_000] = "2024-05-01T10:00:00 ERROR Connection refused to db-7 after 3 attempts"
+    lines[15_000] = "2024-05-01T10:00:00 ERROR Connection refused to db-2 after 5 attempts"
+    lines[9_000] = "2024-05-01T10:00:00 FATAL out of memory"
+    path = tmp_path / "server.log"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    excerpt = excerpt_log(path, LogConfig(budget_bytes=8_000))
+
+    assert excerpt.truncated
+    assert (excerpt.error_lines, excerpt.patterns) == (3, 2)
+    assert len(excerpt.text) <= 8_000 + 200  # Budget plus the summary line
+    assert "--- line 5001 (first of 2) ---" in excerpt.text
+    assert "--- line 15001 (last) ---" in excerpt.text
+    assert "--- line 9001 (once) ---" in excerpt.text
+    assert lines[4_999] in excerpt.text  # Context before the first occurrence
+
+
+def test_error_lines_longer_than_a_chunk(tmp_path, small_chunks):
+    path = tmp_path / "app.log"
+    path.write_text(f"start\n{MINIFIED}\nnonfatal{'x' * 500}\nend\n", encoding="utf-8")
+
+    excerpt = excerpt_log(path, LogConfig(budget_bytes=2_000, max_line_bytes=100))
+
+    assert (excerpt.error_lines, excerpt.patterns) == (1, 1)
+    assert "--- line 2 (once) ---" in excerpt.text
+    assert MINIFIED[:100] in excerpt.text
+    assert MINIFIED[:101] not in excerpt.text  # Cut at max_line_bytes
+
+
+@pytest.mark.parametrize("chunk", [24, 40, 64, 1 << 20])
+def test_chunk_size_does_not_change_the_scan(monkeypatch, chunk):
+    text = "\n".join([MINIFIED, "ok " * 50 + "request failed", "TypeErrors " * 30, "terror", "fine"])
+    config = LogConfig(max_line_bytes=80)
+    expected = logs._scan(text.encode(), config)
+
+    monkeypatch.setattr(logs, "_SCAN_CHUNK", chunk)
+    patterns, error_lines = logs._scan(text.encode(), config)
+
+    assert error_lines == expected[1] == 4
+    assert {key: vars(p) for key, p in patterns.items()} == {key: vars(p) for key, p in expected[0].items()}
@@ -0,0 +1,24 @@
+"""
+Mock LLM server response chunking.
+"""
+import pytest
+
+from benchmarks.mock_server import MockLLMServer, MockServerConfig
+
+
+@pytest.mark.parametrize("words_per_chunk", [1, 3])
+@pytest.mark.parametrize("text", [
+    "## Plan\n\n1. First step  \n2. Second step\n\n",
+    "  leading and trailing whitespace \t\n",
+    '{"title": "Login"}\n{"title": "Logout"}\n',
+    "\n\n",
+    "",
+])
+def test_chunks_concatenate_to_the_response(text, words_per_chunk):
+    server = MockLLMServer(MockServerConfig(words_per_chunk=words_per_chunk))
+    assert "".join(server._chunks(text)) == text
+
+
+def test_chunks_split_on_words():
+    server = MockLLMServer(MockServerConfig(words_per_chunk=2))
+    assert server._chunks("one two three\n") == ["one two", " three\n"]
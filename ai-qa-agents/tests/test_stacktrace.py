@@ -0,0 +1,106 @@
+"""
+Stack trace parsing and fingerprint fixtures.
+
+The fingerprints below are persisted in crash-buckets.json indexes; a change
+that alters them must bump stacktrace.INDEX_VERSION.
+"""
+import pytest
+
+from analysis.stacktrace import CrashBucketIndex, normalize_path, parse_stack_trace
+
+NODE_TRACE = """TypeError: Cannot read properties of undefined (reading 'total')
+    at applyCoupon (/srv/app/src/checkout/cart.ts:42:17)
+    at async CheckoutService.submit (/srv/app/src/checkout/service.ts:88:5)
+    at process.processTicksAndRejections (node:internal/process/task_queues:95:5)
+    at Router.handle (/srv/app/node_modules/express/lib/router/index.js:284:9)
+"""
+
+# Same crash from another build: async scheduling frame first, shifted lines
+NODE_TRACE_ASYNC_FIRST = """TypeError: Cannot read properties of undefined (reading 'total')
+    at process.processTicksAndRejections (node:internal/process/task_queues:95:5)
+    at applyCoupon (/srv/app/src/checkout/cart.ts:44:3)
+    at async CheckoutService.submit (/srv/app/src/checkout/service.ts:90:5)
+    at Router.handle (/srv/app/node_modules/express/lib/router/index.js:284:9)
+"""
+
+# Same crash without Node's async scheduling frames
+NODE_TRACE_SYNC = """TypeError: Cannot read properties of undefined (reading 'total')
+    at applyCoupon (/srv/app/src/checkout/cart.ts:42:17)
+    at async CheckoutService.submit (/srv/app/src/checkout/service.ts:88:5)
+    at Router.handle (/srv/app/node_modules/express/lib/router/index.js:284:9)
+"""
+
+PYTHON_TRACE = """Traceback (most recent call last):
+  File "/app/services/billing/charge.py", line 57, in charge_card
+    result = gateway.capture(order.id)
+  File "/usr/lib/python3.11/site-packages/stripe/api.py", line 120, in capture
+    raise CardError(msg)
+stripe.error.CardError: Card 4242 declined
+"""
+
+JAVA_TRACE = """java.lang.NullPointerException: Cannot invoke "String.length()" because "name" is null
+\tat com.acme.orders.OrderService.validate(OrderService.java:118)
+\tat com.acme.orders.OrderController.create(OrderController.java:52)
+\tat org.springframework.web.servlet.FrameworkServlet.service(FrameworkServlet.java:897)
+"""
+
+DOTNET_TRACE = """System.InvalidOperationException: Sequence contains no elements
+   at System.Linq.ThrowHelper.ThrowNoElementsException()
+   at Acme.Inventory.StockService.Reserve(Int32 sku) in C:\\src\\Inventory\\StockService.cs:line 31
+   at Acme.Inventory.Api.OrdersController.Post(OrderDto dto) in C:\\src\\Inventory\\Api\\OrdersController.cs:line 22
+"""
+
+
+@pytest.mark.parametrize("text, language, exception_type, fingerprint, top_frame", [
+    (NODE_TRACE, "javascript", "TypeError", "9d27d25d6eb12cc9", "checkout/cart.ts:applyCoupon"),
+    (PYTHON_TRACE, "python", "stripe.error.CardError", "28a484505e87158f", "billing/charge.py:charge_card"),
+    (JAVA_TRACE, "java", "java.lang.NullPointerException", "346be75f5636ed0d",
+     "com.acme.orders.OrderService:validate"),
+    (DOTNET_TRACE, "dotnet", "System.InvalidOperationException", "2177a1fef8d7664e",
+     "Acme.Inventory.StockService:Reserve"),
+])
+def test_fingerprint_fixtures(text, language, exception_type, fingerprint, top_frame):
+    trace = parse_stack_trace(text)
+    assert trace.language == language
+    assert trace.exception_type == exception_type
+    assert trace.fingerprint == fingerprint
+    assert trace.top_frame.signature == top_frame
+
+
+def test_node_runtime_frames_do_not_change_fingerprint():
+    traces = [parse_stack_trace(text) for text in (NODE_TRACE, NODE_TRACE_ASYNC_FIRST, NODE_TRACE_SYNC)]
+    assert {trace.fingerprint for trace in traces} == {"9d27d25d6eb12cc9"}
+    assert all(trace.top_frame.module == "checkout/cart.ts" for trace in traces)
+
+
+@pytest.mark.parametrize("path, expected", [
+    ("node:internal/process/task_queues", ("node:internal", False)),
+    ("node:fs", ("node:fs", False)),
+    ("internal/modules/cjs/loader.js", ("internal", False)),
+    ("<anonymous>", ("<anonymous>", False)),
+    ("/srv/app/node_modules/@scope/pkg/lib/index.js", ("node_modules/@scope/pkg", False)),
+    ("/usr/lib/python3.11/json/decoder.py", ("python/json/decoder.py", False)),
+    ("webpack:///src/components/Cart.tsx", ("components/Cart.tsx", True)),
+    ("https://cdn.example.com/static/js/main.3f2a9c1b.js?v=2", ("js/main.js", True)),
+])
+def test_normalize_path(path, expected):
+    assert normalize_path(path) == expected
+
+
+def test_dotnet_frames_without_symbols_are_kept():
+    trace = parse_stack_trace(DOTNET_TRACE)
+    library = trace.frames[0]
+    assert (library.module, library.function, library.in_app) == ("System.Linq.ThrowHelper", "ThrowNoElementsException", False)
+
+
+def test_bucket_index_groups_to_known_bugs():
+    index = CrashBucketIndex()
+    index.link(parse_stack_trace(NODE_TRACE), "BUG-101")
+
+    groups = index.group([NODE_TRACE_ASYNC_FIRST, JAVA_TRACE, NODE_TRACE_SYNC])
+
+    assert [(group.count, group.indices, group.bug_ids) for group in groups] == [
+        (2, [0, 2], ["BUG-101"]),
+        (1, [1], []),
+    ]
+    assert groups[1].is_new
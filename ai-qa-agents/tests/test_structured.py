@@ -0,0 +1,61 @@
+"""
+Incremental JSON extraction from streamed model output.
+"""
+import json
+
+import pytest
+
+pytest.importorskip("agent_framework")
+
+from agents.structured import JsonObjectScanner, extract_json, unwrap_items
+
+CASES = [
+    {"title": "Valid login", "steps": ["Open the page", "Sign in"], "notes": "uses a {brace}"},
+    {"title": "Locked account", "steps": [], "notes": 'quote \\" and ] inside'},
+    {"title": "Expired session", "steps": [{"action": "Wait", "expected": "Logged out"}]},
+]
+
+
+def _feed_in_chunks(text, size):
+    scanner = JsonObjectScanner()
+    emitted = []  # (characters fed so far, object)
+    for start in range(0, len(text), size):
+        emitted += [(start + size, obj) for obj in scanner.feed(text[start:start + size])]
+    return emitted
+
+
+@pytest.mark.parametrize("size", [1, 7, 10_000])
+@pytest.mark.parametrize("document", [
+    json.dumps(CASES),
+    "Here you go:\n```json\n" + json.dumps(CASES, indent=2) + "\n```",
+    "\n".join(json.dumps(case) for case in CASES),
+    json.dumps({"test_cases": CASES}),
+    json.dumps({"test_cases": CASES, "summary": "three cases"}, indent=2),
+])
+def test_scanner_extracts_each_object(document, size):
+    assert [obj for _, obj in _feed_in_chunks(document, size)] == CASES
+
+
+def test_wrapped_array_items_stream_before_the_wrapper_closes():
+    document = json.dumps({"test_cases": CASES})
+    first_close = document.index(json.dumps(CASES[0])) + len(json.dumps(CASES[0]))
+
+    emitted = _feed_in_chunks(document, 1)
+
+    assert emitted[0] == (first_close, CASES[0])
+    assert emitted[-1][0] < len(document)
+
+
+@pytest.mark.parametrize("document, expected", [
+    # A single object whose first value is a list of strings is not a wrapper
+    ('{"steps": ["a", "b"], "title": "Steps first"}', [{"steps": ["a", "b"], "title": "Steps first"}]),
+    ('{"title": "Only", "steps": [{"action": "x"}]}', [{"title": "Only", "steps": [{"action": "x"}]}]),
+    ('{"test_cases": []}', []),
+])
+def test_scanner_keeps_objects_that_are_not_wrappers(document, expected):
+    assert JsonObjectScanner().feed(document) == expected
+
+
+def test_extract_json_tolerates_fences_and_prose():
+    text = "Sure!\n```json\n" + json.dumps({"test_cases": CASES}) + "\n```\nLet me know."
+    assert unwrap_items(extract_json(text)) == CASES
@@ -0,0 +1,98 @@
+"""
+Local triage engine: precomputed naive Bayes and its escalation calibration.
+"""
+import math
+
+import pytest
+
+from analysis.corpus import iter_bug_files, load_bug_reports, resolve_repo_path
+from analysis.triage import DEFAULT_MIN_CONFIDENCE, NaiveBayesClassifier, TriageEngine, extract_features
+from config import QAConfig
+
+# Hand-labelled one-line reports the default threshold is calibrated on: (text, severity, category)
+LABELLED_REPORTS = [
+    ("App crashes when uploading a 2GB file", "Critical", "functional"),
+    ("Payment double-charged when the user clicks Pay twice", "Critical", "functional"),
+    ("Login page shows a blank screen on Safari", "High", "functional"),
+    ("Typo in the footer copyright text", "Low", "usability"),
+    ("SQL injection in the search box exposes the user table", "Critical", "security"),
+    ("Checkout page takes 30 seconds to load under peak load", "High", "performance"),
+    ("Button misaligned on mobile", "Low", "usability"),
+    ("Session token is not invalidated after logout", "Critical", "security"),
+    ("XSS in the comment field allows script execution", "Critical", "security"),
+    ("Search returns no results for exact product names", "High", "functional"),
+    ("API returns 500 when the webhook payload is empty", "High", "integration"),
+    ("Database connection pool exhausted under concurrent load", "Critical", "performance"),
+    ("Response time of the orders API exceeds 5 seconds", "High", "performance"),
+    ("Screen reader cannot reach the navigation menu", "Medium", "usability"),
+    ("Error message is unclear when the password is too short", "Low", "usability"),
+    ("Cannot create a new project from the dashboard", "High", "functional"),
+    ("Update profile form does not save the phone number", "Medium", "functional"),
+    ("Third-party shipping API timeout breaks order sync", "High", "integration"),
+    ("Users lose unsaved drafts when the page reloads, data loss", "Critical", "functional"),
+    ("Delete button removes the wrong item in the list", "High", "functional"),
+    ("Minor UI glitch in the settings page header", "Low", "usability"),
+    ("Documentation link points to an old version", "Low", "usability"),
+    ("Authentication bypass via crafted JWT header", "Critical", "security"),
+    ("Dashboard is slow under stress test with 1000 users", "High", "performance"),
+]
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return TriageEngine.from_corpus()
+
+
+def test_default_threshold_escalates_a_minority(engine):
+    results = [(engine.triage(text), severity, category) for text, severity, category in LABELLED_REPORTS]
+    kept = [(r, severity, category) for r, severity, category in results if not r.needs_escalation]
+
+    assert engine.min_confidence == DEFAULT_MIN_CONFIDENCE
+    assert len(kept) >= len(results) / 2
+    correct = sum(r.severity == severity and r.category == category for r, severity, category in kept)
+    assert correct >= 0.7 * len(kept)
+
+
+def test_labelled_corpus_reports_are_not_escalated(engine):
+    directory = resolve_repo_path(QAConfig.bug_reports_dir)
+    for record in load_bug_reports(str(directory)):
+        result = engine.triage(record.text, record.bug_id)
+        assert result.severity == record.severity
+        assert not result.needs_escalation
+
+
+def test_long_reports_are_classified_by_their_head(engine):
+    path = iter_bug_files(str(resolve_repo_path(QAConfig.bug_reports_dir)))[0]
+    text = path.read_text(encoding="utf-8")
+    padded = text[:engine.max_chars] + "\nSQL injection XSS token " * 500
+
+    assert engine.triage(padded) == engine.triage(text)
+
+
+def test_precomputed_posterior_matches_naive_bayes():
+    documents = [
+        ("checkout total is wrong after coupon", "High"),
+        ("typo on the checkout page", "Low"),
+        ("checkout crashes and loses the order", "Critical"),
+        ("coupon applied twice", "High"),
+    ]
+    model = NaiveBayesClassifier(alpha=0.5).fit(documents)
+    text = "checkout crashes when a coupon is applied"
+
+    # Straightforward multinomial naive Bayes over the same features
+    features_by_label = {}
+    for doc, label in documents:
+        features_by_label.setdefault(label, []).extend(extract_features(doc))
+    vocabulary = {f for features in features_by_label.values() for f in features}
+    matched = [f for f in extract_features(text) if f in vocabulary]
+    temperature = max(1.0, len(matched) / 10)
+    scores = {}
+    for label, features in features_by_label.items():
+        prior = math.log(sum(1 for _, l in documents if l == label) / len(documents))
+        denominator = len(features) + 0.5 * len(vocabulary)
+        likelihood = sum(math.log((features.count(f) + 0.5) / denominator) for f in matched)
+        scores[label] = prior + likelihood / temperature
+    total = sum(math.exp(score) for score in scores.values())
+    expected = {label: math.exp(score) / total for label, score in scores.items()}
+
+    assert model.predict_proba(text) == pytest.approx(expected)
@@ -0,0 +1,69 @@
+"""
+Vector index: compaction through meta.json generations and positive-only matches.
+"""
+import json
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from analysis.vectors import META_FILENAME, VectorIndex
+
+DOCUMENTS = [
+    ("a.md", "BUG-1", "Login fails with a 500 error after password reset"),
+    ("b.md", "BUG-2", "Checkout total is wrong after applying a coupon"),
+    ("c.md", "BUG-3", "Dashboard charts render slowly with many widgets"),
+]
+
+
+def _data_files(directory):
+    return sorted(path.name for path in directory.iterdir() if path.name != META_FILENAME)
+
+
+def test_compact_keeps_ids_and_removes_old_generation(tmp_path):
+    index = VectorIndex(str(tmp_path))
+    index.add(DOCUMENTS)
+    index.add([("b.md", "BUG-2", "Coupon applied twice doubles the checkout discount")])
+    index.remove(["c.md"])
+    before = index.search(["coupon checkout discount"], k=1)[0]
+
+    index.compact()
+
+    assert (len(index), index.dead_rows) == (2, 0)
+    assert json.loads((tmp_path / META_FILENAME).read_text())["generation"] == 1
+    assert _data_files(tmp_path) == ["ids-1.jsonl", "vectors-1.f32"]
+    assert index.search(["coupon checkout discount"], k=1)[0] == before
+
+    reopened = VectorIndex(str(tmp_path))
+    assert sorted(reopened._records) == ["a.md", "b.md"]
+    assert reopened.search(["coupon checkout discount"], k=1)[0] == before
+
+
+def test_interrupted_compaction_leaves_the_index_intact(tmp_path, monkeypatch):
+    index = VectorIndex(str(tmp_path))
+    index.add(DOCUMENTS)
+    index.remove(["a.md"])
+
+    def crash(generation):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(index, "_write_meta", crash)
+    with pytest.raises(OSError):
+        index.compact()
+
+    # Neither the in-memory state nor the committed generation changed
+    assert (len(index), index.dead_rows) == (2, 1)
+    reopened = VectorIndex(str(tmp_path))
+    assert (len(reopened), reopened.dead_rows) == (2, 1)
+    assert _data_files(tmp_path) == ["ids-0.jsonl", "vectors-0.f32"]
+    assert [m.doc_id for m in reopened.search(["checkout coupon"], k=1)[0]] == ["BUG-2"]
+
+
+def test_search_returns_only_positive_similarities(tmp_path):
+    index = VectorIndex(str(tmp_path))
+    index.add(DOCUMENTS)
+    query = index.vectorizer.transform(["checkout coupon total"])
+
+    matches = index.search_vectors(-query, k=3)[0]
+    assert matches == []
+    assert all(m.score > 0 for m in index.search_vectors(query, k=3)[0])